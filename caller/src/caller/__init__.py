@@ -1,8 +1,36 @@
 """Caller package (src layout). Expose public API here."""
 from .app import Application
+from .async_app import AsyncApplication
+from .async_pdf_uploader import AsyncPdfUploader
+from .async_query_client import AsyncQueryClient
+from .async_transport import AsyncTransport
 from .config import default_config, CallerConfig
+from .dedup import ContentHashIndex
+from .defaults import ModelDefaultsCache
+from .instrumentation import RequestMetrics
+from .metrics_exporter import MetricsExporter
 from .pdf_uploader import PdfUploader
+from .poller import StatusPoller
 from .query_client import QueryClient
+from .tracing import JsonFileExporter
+from .transport import Transport
 
-__all__ = ["Application", "default_config", "CallerConfig", "PdfUploader", "QueryClient"]
+__all__ = [
+    "Application",
+    "AsyncApplication",
+    "AsyncPdfUploader",
+    "AsyncQueryClient",
+    "AsyncTransport",
+    "default_config",
+    "CallerConfig",
+    "ContentHashIndex",
+    "JsonFileExporter",
+    "MetricsExporter",
+    "ModelDefaultsCache",
+    "PdfUploader",
+    "RequestMetrics",
+    "QueryClient",
+    "StatusPoller",
+    "Transport",
+]
 __version__ = "0.1"
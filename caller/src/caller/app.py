@@ -1,9 +1,15 @@
 import logging
 from typing import List, Optional
 
+from . import tracing
 from .config import default_config
+from .evaluate import evaluate_matrix, Questions
+from .ingest import ingest_tree, DEFAULT_PATTERN
+from .metrics_exporter import MetricsExporter
 from .pdf_uploader import PdfUploader
+from .poller import StatusPoller
 from .query_client import QueryClient
+from .transport import Transport
 
 
 logger = logging.getLogger("caller.app")
@@ -20,12 +26,70 @@ class Application:
     - register_and_process_file: upload or reference file, optionally embed
     - trigger_embedding_for_source: call /commands/jobs to submit 'vectorize_source' or 'embed_single_item'
     - ask_with_sources: send prompt and list of source IDs to use as context
+    - ingest_tree: bulk-upload a directory tree concurrently with a resumable manifest
+    - evaluate_matrix: run a battery of questions against many sources concurrently, resumably
+
+    With config.metrics_port set, client metrics are served as OpenMetrics on that port (see
+    caller.metrics_exporter). With config.trace_path set, trace spans for every stage and HTTP
+    request are appended to that file (see caller.tracing).
+
+    All components share one pooled Transport. Call close() when done, or use the
+    application as a context manager:
+
+        with Application() as app:
+            app.register_and_process_file(local_path="plans.pdf")
     """
 
-    def __init__(self, config=default_config):
+    def __init__(self, config=default_config, transport: Optional[Transport] = None):
         self.config = config
-        self.uploader = PdfUploader(config)
-        self.qc = QueryClient(config)
+        self._owns_transport = transport is None
+        self.transport = transport or Transport(config)
+        self.uploader = PdfUploader(config, transport=self.transport)
+        self.qc = QueryClient(config, transport=self.transport)
+        self._poller: Optional[StatusPoller] = None
+        self.exporter: Optional[MetricsExporter] = None
+        self.span_exporter: Optional[tracing.JsonFileExporter] = None
+        try:
+            # the trace file first: a bad trace_path then fails before the metrics thread and port exist
+            if config.trace_path is not None:
+                self.span_exporter = tracing.JsonFileExporter(config.trace_path)
+                tracing.configure(self.span_exporter)
+            if config.metrics_port is not None:
+                self.exporter = MetricsExporter(port=config.metrics_port).register_application(self).start()
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def poller(self) -> StatusPoller:
+        """Shared background StatusPoller (created on first use)."""
+        if self._poller is None:
+            self._poller = StatusPoller(self.uploader, config=self.config)
+        return self._poller
+
+    def close(self) -> None:
+        """Stop the status poller, delete pooled notebooks and release pooled connections.
+
+        The transport is only closed if it was created here.
+        """
+        if self.exporter is not None:
+            self.exporter.close()
+        if self._poller is not None:
+            self._poller.close()
+        self.qc.close()
+        self.uploader.close()
+        if self._owns_transport:
+            self.transport.close()
+        if self.span_exporter is not None:
+            if tracing.get_exporter() is self.span_exporter:
+                tracing.configure(None)
+            self.span_exporter.close()
+
+    def __enter__(self) -> "Application":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
     def register_and_process_file(self, local_path: Optional[str] = None, server_path: Optional[str] = None, title: Optional[str] = None, notebooks: Optional[List[str]] = None, embed: bool = True, async_processing: bool = True) -> dict:
         """If local_path provided, upload; if server_path provided, register existing file on server.
@@ -43,14 +107,41 @@ class Application:
 
         raise ValueError("Either local_path or server_path must be provided")
 
+    def ingest_tree(self, root: str, pattern: str = DEFAULT_PATTERN, workers: int = 4, manifest_path: Optional[str] = None, notebooks: Optional[List[str]] = None, embed: bool = True, async_processing: bool = True, wait_for_processing: bool = False) -> dict:
+        """Upload every PDF under `root` with `workers` concurrent uploads; reruns skip completed files.
+
+        With wait_for_processing=True every uploaded source is handed to the shared StatusPoller and each
+        per-file result gains a "processing_status" once the backend finishes.
+
+        See caller.ingest.ingest_tree for the manifest format and the returned results/summary dict.
+        """
+        if workers > self.config.pool_maxsize:
+            logger.warning(f"workers={workers} exceeds pool_maxsize={self.config.pool_maxsize}; extra connections will not be reused")
+        poller = self.poller if wait_for_processing else None
+        with tracing.span("ingest_tree", root=root, workers=workers):
+            return ingest_tree(self.uploader, root, pattern=pattern, workers=workers, manifest_path=manifest_path, notebooks=notebooks, embed=embed, async_processing=async_processing, poller=poller)
+
+    def evaluate_matrix(self, questions: Questions, source_ids: List[str], concurrency: int = 4, results_path: Optional[str] = None, model_override: Optional[str] = None) -> dict:
+        """Ask every question against every source via notebook_ask, `concurrency` pairs at a time.
+
+        Every pair gets a fresh chat session. With config.notebook_pool a source's notebook is reused
+        across its questions, and with context_cache_size set its /chat/context is built once rather
+        than per question. Each result is appended to the JSONL file at `results_path` as it finishes,
+        and a rerun skips pairs already answered. Each result carries the parsed YES/NO "verdict".
+
+        See caller.evaluate.evaluate_matrix for the record format and the returned results/summary dict.
+        """
+        if concurrency > self.config.pool_maxsize:
+            logger.warning(f"concurrency={concurrency} exceeds pool_maxsize={self.config.pool_maxsize}; extra connections will not be reused")
+        with tracing.span("evaluate_matrix", sources=len(source_ids), concurrency=concurrency):
+            return evaluate_matrix(self.qc, questions, source_ids, concurrency=concurrency, results_path=results_path, model_override=model_override)
+
     def trigger_embedding_for_source(self, source_id: str, mode: str = "vectorize_source") -> dict:
         """Trigger embedding for an already-registered source by submitting a command job.
 
         mode can be 'vectorize_source' (orchestrates chunk jobs) or 'embed_single_item' (embeds single item).
         Returns job response from /commands/jobs endpoint.
         """
-        import requests
-
         url = f"{self.config.api_base_url.rstrip('/')}/commands/jobs"
         if mode == "vectorize_source":
             cmd = "vectorize_source"
@@ -61,13 +152,17 @@ class Application:
             payload = {"command": cmd, "app": "open_notebook", "input": {"item_id": source_id, "item_type": "source"}}
 
         logger.info(f"Submitting command {cmd} for source {source_id}")
-        resp = requests.post(url, json=payload, timeout=self.config.timeout_seconds)
+        resp = self.transport.post(url, json=payload, timeout=self.config.timeout_seconds)
         resp.raise_for_status()
         return resp.json()
 
-    def ask_with_sources(self, prompt: str, source_ids: Optional[List[str]] = None, model_override: Optional[str] = None, limit: int = 20) -> dict:
-        """Ask a question and provide a list of source IDs to be used as context (embedding must exist)."""
-        return self.qc.ask(prompt, source_ids=source_ids, model_override=model_override, limit=limit)
+    def ask_with_sources(self, prompt: str, source_ids: Optional[List[str]] = None, model_override: Optional[str] = None, limit: int = 20, fan_out: bool = False, concurrency: int = 8) -> dict:
+        """Ask a question and provide a list of source IDs to be used as context (embedding must exist).
+
+        With fan_out=True every source is asked concurrently and per-source answers are returned (see QueryClient.ask_many).
+        """
+        with tracing.span("ask_with_sources", sources=len(source_ids or []), fan_out=fan_out):
+            return self.qc.ask(prompt, source_ids=source_ids, model_override=model_override, limit=limit, fan_out=fan_out, concurrency=concurrency)
 
     def notebook_ask_with_source(self, source_id: str, message: str, model_override: Optional[str] = None, notebook_id: Optional[str] = None, session_id: Optional[str] = None) -> dict:
         """
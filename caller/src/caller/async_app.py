@@ -0,0 +1,107 @@
+import logging
+from typing import List, Optional
+
+from .async_pdf_uploader import AsyncPdfUploader
+from .async_query_client import AsyncQueryClient
+from . import tracing
+from .async_transport import AsyncTransport
+from .config import default_config
+from .metrics_exporter import MetricsExporter
+
+
+logger = logging.getLogger("caller.async_app")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s"))
+logger.addHandler(handler)
+
+
+class AsyncApplication:
+    """asyncio counterpart of `Application` sharing one AsyncTransport.
+
+    Usage:
+        async with AsyncApplication() as app:
+            answers = await asyncio.gather(*(app.notebook_ask_with_source(s, q) for s in source_ids))
+    """
+
+    def __init__(self, config=default_config, transport: Optional[AsyncTransport] = None):
+        self.config = config
+        self._owns_transport = transport is None
+        self.transport = transport or AsyncTransport(config)
+        self.uploader = AsyncPdfUploader(config, transport=self.transport)
+        self.qc = AsyncQueryClient(config, transport=self.transport)
+        self.exporter: Optional[MetricsExporter] = None
+        self.span_exporter: Optional[tracing.JsonFileExporter] = None
+        try:
+            # the trace file first: a bad trace_path then fails before the metrics thread and port exist
+            if config.trace_path is not None:
+                self.span_exporter = tracing.JsonFileExporter(config.trace_path)
+                tracing.configure(self.span_exporter)
+            if config.metrics_port is not None:
+                self.exporter = MetricsExporter(port=config.metrics_port).register_application(self).start()
+        except BaseException:
+            # close() is a coroutine; starting the metrics exporter is the last step, so only tracing needs undoing
+            if self.span_exporter is not None:
+                if tracing.get_exporter() is self.span_exporter:
+                    tracing.configure(None)
+                self.span_exporter.close()
+            raise
+
+    async def close(self) -> None:
+        """Stop the metrics exporter, close the clients' caches and release pooled connections.
+
+        The transport is only closed if it was created here.
+        """
+        if self.exporter is not None:
+            self.exporter.close()
+        await self.qc.close()
+        await self.uploader.close()
+        if self._owns_transport:
+            await self.transport.close()
+        if self.span_exporter is not None:
+            if tracing.get_exporter() is self.span_exporter:
+                tracing.configure(None)
+            self.span_exporter.close()
+
+    async def __aenter__(self) -> "AsyncApplication":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def register_and_process_file(self, local_path: Optional[str] = None, server_path: Optional[str] = None, title: Optional[str] = None, notebooks: Optional[List[str]] = None, embed: bool = True, async_processing: bool = True) -> dict:
+        """If local_path provided, upload; if server_path provided, register existing file on server."""
+        if local_path and server_path:
+            raise ValueError("Provide either local_path or server_path, not both")
+
+        if local_path:
+            return await self.uploader.upload_file_and_process(local_path, title=title, notebooks=notebooks, embed=embed, async_processing=async_processing)
+
+        if server_path:
+            return await self.uploader.reference_existing_file(server_path, title=title, notebooks=notebooks, embed=embed, async_processing=async_processing)
+
+        raise ValueError("Either local_path or server_path must be provided")
+
+    async def trigger_embedding_for_source(self, source_id: str, mode: str = "vectorize_source") -> dict:
+        """Trigger embedding for an already-registered source by submitting a command job."""
+        url = f"{self.config.api_base_url.rstrip('/')}/commands/jobs"
+        if mode == "vectorize_source":
+            cmd = "vectorize_source"
+            payload = {"command": cmd, "app": "open_notebook", "input": {"source_id": source_id}}
+        else:
+            cmd = "embed_single_item"
+            payload = {"command": cmd, "app": "open_notebook", "input": {"item_id": source_id, "item_type": "source"}}
+
+        logger.info(f"Submitting command {cmd} for source {source_id}")
+        resp = await self.transport.post(url, json=payload, timeout=self.config.timeout_seconds)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def ask_with_sources(self, prompt: str, source_ids: Optional[List[str]] = None, model_override: Optional[str] = None, limit: int = 20, fan_out: bool = False, concurrency: int = 8) -> dict:
+        """Ask a question and provide a list of source IDs to be used as context (embedding must exist)."""
+        with tracing.span("ask_with_sources", sources=len(source_ids or []), fan_out=fan_out):
+            return await self.qc.ask(prompt, source_ids=source_ids, model_override=model_override, limit=limit, fan_out=fan_out, concurrency=concurrency)
+
+    async def notebook_ask_with_source(self, source_id: str, message: str, model_override: Optional[str] = None, notebook_id: Optional[str] = None, session_id: Optional[str] = None) -> dict:
+        """Run the notebook (search->transform->chat) pipeline scoped to a single source."""
+        return await self.qc.notebook_ask(source_id=source_id, message=message, model_override=model_override, notebook_id=notebook_id, session_id=session_id)
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+from . import tracing
+from .async_transport import AsyncTransport
+from .config import default_config
+from .dedup import ContentHashIndex
+from .multipart import MultipartFileEncoder, ProgressCallback
+from .pdf_uploader import PdfUploader
+
+logger = logging.getLogger("caller.async_pdf_uploader")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+
+class AsyncPdfUploader:
+    """asyncio counterpart of `PdfUploader`.
+
+    Same methods and return shapes as the blocking uploader, but every call is a coroutine
+    so many uploads and status polls can share one event loop:
+
+        async with AsyncApplication() as app:
+            results = await asyncio.gather(*(app.uploader.poll_source_status(s) for s in ids))
+    """
+
+    # Response normalization is pure and shared with the blocking uploader
+    _normalize_source_item = PdfUploader._normalize_source_item
+    _normalize_sources = PdfUploader._normalize_sources
+    _match_source = PdfUploader._match_source
+    _lookup_content_hash = PdfUploader._lookup_content_hash
+    _record_content_hash = PdfUploader._record_content_hash
+
+    def __init__(self, config=default_config, transport: Optional[AsyncTransport] = None, hash_index: Optional[ContentHashIndex] = None):
+        self.base = config.api_base_url.rstrip("/")
+        self.timeout = config.timeout_seconds
+        self.upload_chunk_size = config.upload_chunk_size
+        self._owns_transport = transport is None
+        self.transport = transport or AsyncTransport(config)
+        self._owns_hash_index = hash_index is None and bool(config.hash_index_path)
+        if self._owns_hash_index:
+            hash_index = ContentHashIndex(config.hash_index_path)
+        self.hash_index = hash_index
+        self.debug_candidates = False
+
+    async def close(self) -> None:
+        """Close the content-hash index and the transport if this uploader created them."""
+        if self._owns_hash_index:
+            self.hash_index.close()
+        if self._owns_transport:
+            await self.transport.close()
+
+    def _wrap_response(self, resp) -> Dict[str, Any]:
+        """Normalize an httpx.Response into the same dict shape as PdfUploader._wrap_response."""
+        out = {
+            "ok": False,
+            "status_code": getattr(resp, "status_code", None),
+            "data": None,
+            "text": None,
+            "error": None,
+        }
+        try:
+            out["text"] = resp.text
+            if resp.text:
+                try:
+                    out["data"] = resp.json()
+                except Exception:
+                    out["data"] = resp.text
+        except Exception as e:
+            out["error"] = str(e)
+        out["ok"] = bool(getattr(resp, "is_success", False))
+        return out
+
+    # ---- Public methods ----
+    async def source_exists(self, filename: str) -> bool:
+        """Check if a source with the given filename already exists."""
+        found = await self.find_source_for_file(filename)
+        return found is not None
+
+    async def get_source_id(self, filename: str) -> Optional[str]:
+        """Return id of best-matching source or None."""
+        src = await self.find_source_for_file(filename)
+        return src.get("id") if src else None
+
+    async def upload_file_and_process(
+        self,
+        file_path: str,
+        title: Optional[str] = None,
+        notebooks: Optional[list] = None,
+        embed: bool = True,
+        async_processing: bool = True,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """Upload a local PDF (streamed, bounded memory) and request processing. Same return shape as PdfUploader."""
+        with tracing.span("upload_file", file_path=file_path) as span:
+            filename = title or Path(file_path).name
+
+            digest = None
+            if self.hash_index is not None:
+                # hashing and SQLite are blocking; keep them off the event loop
+                digest, existing = await asyncio.to_thread(self._lookup_content_hash, file_path)
+            else:
+                existing = await self.find_source_for_file(filename)
+            if existing:
+                logger.info(f"File '{filename}' already exists on server, skipping upload")
+                span.set_attributes({"caller.deduplicated": True, "caller.source_id": existing.get("id")})
+                return {"ok": True, "status_code": 200, "sources": [existing], "raw": None}
+
+            url = f"{self.base}/sources"
+            data = {
+                "type": "upload",
+                "title": filename,
+                "embed": str(embed).lower(),
+                "async_processing": str(async_processing).lower(),
+            }
+            if notebooks:
+                data["notebooks"] = json.dumps(notebooks)
+            logger.info(f"Uploading {file_path} to {url} (async={async_processing})")
+            with MultipartFileEncoder(file_path, fields=data, chunk_size=self.upload_chunk_size, progress=progress) as body:
+                resp = await self.transport.post(url, content=body.aiter_chunks(), headers=body.headers, timeout=self.timeout)
+            span.set_attributes({"caller.upload_mode": "single", "caller.bytes_sent": body.bytes_sent})
+            wrapped = self._wrap_response(resp)
+            if not wrapped["ok"]:
+                logger.error(f"Upload failed ({wrapped['status_code']}): {wrapped['text']}")
+                span.set_status("ERROR", f"HTTP {wrapped['status_code']}")
+                wrapped.update({"sources": []})
+                return wrapped
+
+            sources = self._normalize_sources(wrapped["data"])
+            if digest is not None:
+                await asyncio.to_thread(self._record_content_hash, digest, sources, file_path, filename)
+            span.set_attribute("caller.source_id", sources[0].get("id") if sources else None)
+            return {"ok": True, "status_code": wrapped["status_code"], "sources": sources, "raw": wrapped["data"]}
+
+    async def reference_existing_file(
+        self,
+        server_file_path: str,
+        title: Optional[str] = None,
+        notebooks: Optional[list] = None,
+        embed: bool = True,
+        async_processing: bool = True,
+    ) -> Dict[str, Any]:
+        """Create a Source record pointing to a file already present on the server uploads folder."""
+        with tracing.span("register_file", file_path=server_file_path) as span:
+            url = f"{self.base}/sources"
+            payload = {
+                "type": "upload",
+                "title": title or Path(server_file_path).name,
+                "file_path": server_file_path,
+                "embed": embed,
+                "async_processing": async_processing,
+            }
+            if notebooks:
+                payload["notebooks"] = notebooks
+
+            logger.info(f"Registering server file {server_file_path} with backend (async={async_processing})")
+            resp = await self.transport.post(url, json=payload, timeout=self.timeout)
+            wrapped = self._wrap_response(resp)
+            if not wrapped["ok"]:
+                logger.error(f"Registering file failed ({wrapped['status_code']}): {wrapped['text']}")
+                span.set_status("ERROR", f"HTTP {wrapped['status_code']}")
+                wrapped.update({"sources": []})
+                return wrapped
+
+            sources = self._normalize_sources(wrapped["data"])
+            span.set_attribute("caller.source_id", sources[0].get("id") if sources else None)
+            return {"ok": True, "status_code": wrapped["status_code"], "sources": sources, "raw": wrapped["data"]}
+
+    async def poll_source_status(self, source_id: str, poll_interval: float = 2.0, timeout: float = 600.0) -> Dict[str, Any]:
+        """Poll `/sources/{id}/status` until completed/failed or timeout (awaits between polls)."""
+        with tracing.span("poll_source_status", source_id=source_id) as span:
+            url = f"{self.base}/sources/{source_id}/status"
+            start = time.time()
+            logger.info(f"Polling status for source {source_id} at {url}")
+            polls = 0
+            while True:
+                resp = await self.transport.get(url, timeout=self.timeout)
+                polls += 1
+                wrapped = self._wrap_response(resp)
+                if wrapped["ok"]:
+                    data = wrapped["data"] or {}
+                    status = data.get("status")
+                    logger.info(f"Status for {source_id}: {status}")
+                    if status in ("completed", "failed"):
+                        span.set_attributes({"caller.status": status, "caller.polls": polls})
+                        return {
+                            "ok": True,
+                            "status_code": wrapped["status_code"],
+                            "status": status,
+                            "processing_info": data.get("processing_info"),
+                            "raw": data,
+                        }
+                else:
+                    logger.warning(f"Status endpoint returned {wrapped['status_code']}: {wrapped.get('text')}")
+                if time.time() - start > timeout:
+                    raise TimeoutError(f"Timed out waiting for source {source_id} status")
+                await asyncio.sleep(poll_interval)
+
+    async def find_source_for_file(self, filename_or_path: str, notebook_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Find best-matching source record for a server file path or filename (see PdfUploader)."""
+        params = {}
+        if notebook_id:
+            params["notebook_id"] = notebook_id
+
+        url = f"{self.base}/sources"
+        resp = await self.transport.get(url, params=params, timeout=self.timeout)
+        wrapped = self._wrap_response(resp)
+        if not wrapped["ok"]:
+            logger.error(f"Error listing sources: {wrapped.get('text')}")
+            return None
+
+        candidates: List[Dict[str, Any]] = self._normalize_sources(wrapped["data"])
+        return self._match_source(candidates, filename_or_path)
@@ -0,0 +1,422 @@
+import asyncio
+import logging
+from typing import List, Optional, Dict, Any
+from time import time, perf_counter
+
+from . import tracing
+from .async_transport import AsyncTransport
+from .config import default_config
+from .context_cache import ContextCache
+from .search_cache import SearchCache
+from .defaults import ModelDefaultsCache, defaults_cache_for, config_models, REQUIRED_FIELDS
+from .sse import AsyncSSEStream
+from .streaming import AsyncAskStream
+from .verdict import VerdictDetector, parse_verdict
+from .query_client import _search_results, _rrf_merge, _source_id_set, _ai_content, _ask_simple_payload, _last_ai_answer, _fan_out_result
+
+logger = logging.getLogger("caller.async_query_client")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+
+class _CheckedStream:
+    """Wraps AsyncTransport.stream() so that entering it raises on an error status."""
+
+    def __init__(self, cm):
+        self._cm = cm
+
+    async def __aenter__(self):
+        r = await self._cm.__aenter__()
+        if r.is_error:
+            await r.aread()
+            logger.error("Streaming request failed: %s %s", r.status_code, r.text)
+            try:
+                r.raise_for_status()
+            finally:
+                await self._cm.__aexit__(None, None, None)
+        return r
+
+    async def __aexit__(self, *exc):
+        return await self._cm.__aexit__(*exc)
+
+
+class AsyncQueryClient:
+    """asyncio counterpart of `QueryClient` (same methods and return shapes, all coroutines)."""
+
+    def __init__(self, config=default_config, transport: Optional[AsyncTransport] = None, defaults_cache: Optional[ModelDefaultsCache] = None):
+        self.base = config.api_base_url.rstrip("/")
+        self.timeout = config.timeout_seconds
+        self._owns_transport = transport is None
+        self.transport = transport or AsyncTransport(config)
+        # shares the process-wide /models/defaults cache with the blocking QueryClient
+        self.defaults_cache = defaults_cache or defaults_cache_for(self.base, ttl_seconds=config.defaults_ttl_seconds)
+        self._config_models = config_models(config)
+        self.overfetch_factor = max(2, config.search_overfetch_factor)
+        self.search_max_limit = config.search_max_limit
+        self.search_round_trips: Dict[int, int] = {}
+        # cached /search results keyed by normalized query + parameters (None disables)
+        self.search_cache: Optional[SearchCache] = None
+        if config.search_cache_size > 0 or config.search_cache_path:
+            self.search_cache = SearchCache(self.base, config.search_cache_size, ttl_seconds=config.search_cache_ttl_seconds, path=config.search_cache_path)
+        self.context_cache: Optional[ContextCache] = None
+        if config.context_cache_size > 0 or config.context_cache_path:
+            self.context_cache = ContextCache(config.context_cache_size, ttl_seconds=config.context_cache_ttl_seconds, path=config.context_cache_path)
+
+    async def close(self) -> None:
+        """Close the context/search caches and the transport if this client created it."""
+        if self.context_cache is not None:
+            self.context_cache.close()
+        if self.search_cache is not None:
+            self.search_cache.close()
+        if self._owns_transport:
+            await self.transport.close()
+
+    async def _get_defaults(self) -> Dict[str, Any]:
+        """Config model ids over cached /models/defaults (see ModelDefaultsCache.aget; {} if never fetched)."""
+        if all(f in self._config_models for f in REQUIRED_FIELDS):
+            return dict(self._config_models)
+
+        async def fetch() -> Dict[str, Any]:
+            durl = f"{self.base}/models/defaults"
+            logger.info("Fetching default models from %s", durl)
+            dresp = await self.transport.get(durl, timeout=self.timeout)
+            dresp.raise_for_status()
+            return dresp.json() or {}
+
+        defaults = await self.defaults_cache.aget(fetch)
+        defaults.update(self._config_models)
+        return defaults
+
+    async def _source_version(self, source_id: str) -> Optional[str]:
+        url = f"{self.base}/sources/{source_id}"
+        try:
+            resp = await self.transport.get(url, timeout=self.timeout)
+            resp.raise_for_status()
+            data = resp.json() or {}
+        except Exception as e:
+            logger.warning("Unable to fetch source %s for context cache: %s", source_id, e)
+            return None
+        version = data.get("updated") or data.get("created")
+        return str(version) if version else None
+
+    async def _build_context(self, notebook_id: str, context_config: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /chat/context through the context cache (see QueryClient._build_context)."""
+        versions = None
+        if self.context_cache is not None:
+            versions = {sid: await self._source_version(sid) for sid in context_config.get("sources", {})}
+            if all(versions.values()):
+                cached = self.context_cache.get(context_config, versions)
+                if cached is not None:
+                    return cached
+            else:
+                versions = None
+
+        ctx_url = f"{self.base}/chat/context"
+        ctx_payload = {"notebook_id": notebook_id, "context_config": context_config}
+        logger.info("Building notebook context: POST %s", ctx_url)
+        ctx_resp = await self.transport.post(ctx_url, json=ctx_payload, timeout=max(30, self.timeout))
+        ctx_resp.raise_for_status()
+        context_data = ctx_resp.json()
+        if versions is not None:
+            self.context_cache.put(context_config, versions, context_data)
+        return context_data
+
+    async def _search(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if self.search_cache is not None:
+            cached = self.search_cache.get(payload)
+            if cached is not None:
+                return cached
+        url = f"{self.base}/search"
+        resp = await self.transport.post(url, json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        hits = _search_results(resp.json())
+        if self.search_cache is not None:
+            self.search_cache.put(payload, hits)
+        return hits
+
+    async def vector_search(self, query: str, results: int = 10, minimum_score: float = 0.2, source_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Call the backend vector search via the generic /search endpoint (see QueryClient.vector_search)."""
+        payload = {
+            "query": query,
+            "type": "vector",
+            "limit": results,
+            "search_sources": True,
+            "search_notes": False,
+            "minimum_score": minimum_score,
+        }
+        logger.info("Running vector search (via /search) for: %s", query)
+        if not source_ids:
+            return await self._search(payload)
+
+        wanted = _source_id_set(source_ids)
+        limit = min(max(results * self.overfetch_factor, results), self.search_max_limit)
+        round_trips = 0
+        while True:
+            hits = await self._search(dict(payload, limit=limit))
+            round_trips += 1
+            matched = [h for h in hits if h.get("parent_id") in wanted or h.get("id") in wanted]
+            if len(matched) >= results or len(hits) < limit or limit >= self.search_max_limit:
+                break
+            limit = min(limit * self.overfetch_factor, self.search_max_limit)
+        self.search_round_trips[round_trips] = self.search_round_trips.get(round_trips, 0) + 1
+        return matched[:results]
+
+    async def text_search(self, query: str, results: int = 10) -> List[Dict[str, Any]]:
+        payload = {
+            "query": query,
+            "type": "text",
+            "limit": results,
+            "search_sources": True,
+            "search_notes": False,
+        }
+        logger.info("Running text search (via /search) for: %s", query)
+        return await self._search(payload)
+
+    async def hybrid_search(self, query: str, results: int = 10, minimum_score: float = 0.2, candidates: Optional[int] = None, k: int = 60) -> List[Dict[str, Any]]:
+        """Concurrent vector + text search merged with reciprocal rank fusion (see QueryClient.hybrid_search)."""
+        fetch = candidates or results * 2
+        text_task = asyncio.create_task(self.text_search(query, results=fetch))
+        try:
+            vector_hits = await self.vector_search(query, results=fetch, minimum_score=minimum_score)
+        except BaseException:
+            # as in QueryClient: surface the vector error and stop the text query
+            text_task.cancel()
+            raise
+        text_hits = await text_task
+        return _rrf_merge({"vector": vector_hits, "text": text_hits}, k=k)[:results]
+
+    async def ask(self, prompt: str, source_ids: Optional[List[str]] = None, model_override: Optional[str] = None, limit: int = 20, fan_out: bool = False, concurrency: int = 8) -> Dict[str, Any]:
+        """High-level ask helper (see QueryClient.ask)."""
+        if source_ids and fan_out:
+            return await self.ask_many(prompt, source_ids, model_override=model_override, concurrency=concurrency)
+        if source_ids:
+            async with self.ask_stream(prompt, source_ids, model_override=model_override) as stream:
+                async for _ in stream:
+                    pass
+            return {"search_results": [], "total": len(stream.chunks), "answer": stream.answer, "events": stream.events, "stream_stats": stream.stats()}
+
+        defaults = await self._get_defaults()
+        ask_url = f"{self.base}/search/ask/simple"
+        ask_payload = _ask_simple_payload(prompt, defaults, model_override)
+        logger.info("Sending ask/simple request to backend (strategy=%s)", ask_payload.get("strategy_model"))
+        resp = await self.transport.post(ask_url, json=ask_payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def _open_source_stream(self, prompt: str, source_id: str, model_override: Optional[str]):
+        defaults = await self._get_defaults()
+        strategy_model = model_override or defaults.get("default_transformation_model") or defaults.get("default_chat_model")
+
+        create_url = f"{self.base}/sources/{source_id}/chat/sessions"
+        payload = {"source_id": source_id, "title": f"query-{int(time())}", "model_override": strategy_model}
+        logger.info("Creating source chat session: %s -> %s", create_url, payload)
+        cresp = await self.transport.post(create_url, json=payload, timeout=self.timeout)
+        cresp.raise_for_status()
+        session_id = cresp.json().get("id")
+
+        stream_url = f"{self.base}/sources/{source_id}/chat/sessions/{session_id}/messages"
+        stream_payload = {"message": prompt}
+        if strategy_model:
+            stream_payload["model_override"] = strategy_model
+
+        async def connect(headers: Dict[str, str]):
+            logger.info("Posting message (stream) to %s", stream_url)
+            metrics = getattr(self.transport, "metrics", None)
+            if metrics is not None and "Last-Event-ID" in headers:
+                metrics.record_retry("POST", stream_url)
+            return _CheckedStream(self.transport.stream("POST", stream_url, json=stream_payload, headers=headers, timeout=max(60, self.timeout)))
+
+        return AsyncSSEStream(connect)
+
+    def ask_stream(self, prompt: str, source_ids: List[str], model_override: Optional[str] = None) -> AsyncAskStream:
+        """Async iterator over `ai_message` chunks (see QueryClient.ask_stream):
+
+            async with aqc.ask_stream(question, [source_id]) as stream:
+                async for chunk in stream:
+                    ...
+        """
+        if not source_ids:
+            raise ValueError("ask_stream requires at least one source id")
+        src = source_ids[0]
+        source_id = src if str(src).startswith("source:") else f"{src}"
+        return AsyncAskStream(lambda: self._open_source_stream(prompt, source_id, model_override), _ai_content)
+
+    async def ask_many(self, prompt: str, source_ids: List[str], model_override: Optional[str] = None, concurrency: int = 8) -> Dict[str, Any]:
+        """Ask every source concurrently, at most `concurrency` streams at once (see QueryClient.ask_many)."""
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(source_id: str) -> Dict[str, Any]:
+            result: Dict[str, Any] = {"source_id": source_id, "ok": False, "answer": "", "verdict": None, "stream_stats": None, "error": None}
+            async with sem:
+                with tracing.span("ask_source", source_id=source_id) as span:
+                    try:
+                        async with self.ask_stream(prompt, [source_id], model_override=model_override) as stream:
+                            async for _ in stream:
+                                pass
+                        result.update(ok=True, answer=stream.answer, verdict=parse_verdict(stream.answer), stream_stats=stream.stats())
+                    except Exception as e:
+                        logger.warning("Ask on %s failed: %s", source_id, e)
+                        result["error"] = str(e)
+                        span.set_status("ERROR", str(e))
+            return result
+
+        start = perf_counter()
+        answers = await asyncio.gather(*(one(sid) for sid in dict.fromkeys(source_ids)))
+        return _fan_out_result(list(answers), perf_counter() - start)
+
+    async def ask_verdict(self, prompt: str, source_ids: List[str], model_override: Optional[str] = None, keep_reading: bool = False) -> Dict[str, Any]:
+        """Return as soon as the streamed answer's YES/NO verdict is known (see QueryClient.ask_verdict).
+
+        With keep_reading=True, `full_answer` is an asyncio.Task resolving to the complete answer.
+        """
+        stream = self.ask_stream(prompt, source_ids, model_override=model_override)
+        detector = VerdictDetector()
+        verdict_at = None
+        try:
+            async for chunk in stream:
+                if detector.feed(chunk) is not None:
+                    verdict_at = perf_counter()
+                    break
+            else:
+                if detector.finish() is not None:
+                    verdict_at = perf_counter()
+        except BaseException:
+            await stream.aclose()
+            raise
+
+        complete = stream.finished_at is not None
+        verdict_s = round(verdict_at - stream.started_at, 4) if verdict_at is not None else None
+        full_answer = None
+        if not complete and keep_reading:
+
+            async def drain() -> str:
+                try:
+                    async for _ in stream:
+                        pass
+                    return stream.answer
+                finally:
+                    await stream.aclose()
+
+            full_answer = asyncio.ensure_future(drain())
+        elif not complete:
+            await stream.aclose()
+        return {
+            "verdict": detector.verdict,
+            "answer": stream.answer,
+            "verdict_s": verdict_s,
+            "complete": complete,
+            "stream_stats": stream.stats(),
+            "full_answer": full_answer,
+        }
+
+    async def _discard_session(self, session_task: "asyncio.Future[str]") -> None:
+        session_id = None
+        try:
+            session_id = await session_task
+            resp = await self.transport.delete(f"{self.base}/chat/sessions/{session_id}", timeout=self.timeout)
+            if resp.is_error and resp.status_code != 404:
+                logger.warning("Cleanup DELETE of session %s returned %s", session_id, resp.status_code)
+        except Exception as e:
+            logger.warning("Cleanup of notebook_ask session %s failed: %s", session_id, e)
+
+    async def _create_session(self, notebook_id: str) -> str:
+        sess_url = f"{self.base}/chat/sessions"
+        sess_payload = {"notebook_id": notebook_id, "title": f"nb-session-{int(time())}"}
+        logger.info("Creating notebook session: POST %s", sess_url)
+        sresp = await self.transport.post(sess_url, json=sess_payload, timeout=self.timeout)
+        sresp.raise_for_status()
+        return sresp.json().get("id")
+
+    async def notebook_ask(self, source_id: str, message: str, model_override: Optional[str] = None, notebook_id: Optional[str] = None, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Run the notebook (search->transform->chat) pipeline scoped to a single source (see QueryClient.notebook_ask).
+
+        Unlike QueryClient there is no notebook pool (config.notebook_pool is ignored): without a
+        notebook_id every call creates its own temp notebook and chat session.
+        """
+        with tracing.span("notebook_ask", source_id=source_id):
+            return await self._notebook_ask(source_id, message, model_override, notebook_id, session_id)
+
+    async def _notebook_ask(self, source_id: str, message: str, model_override: Optional[str], notebook_id: Optional[str], session_id: Optional[str]) -> Dict[str, Any]:
+        timings: Dict[str, float] = {}
+        started = perf_counter()
+
+        async def timed(stage: str, coro):
+            # tasks copy the current context, so stage spans nest under notebook_ask
+            t0 = perf_counter()
+            try:
+                with tracing.span(f"notebook_ask.{stage}"):
+                    return await coro
+            finally:
+                timings[stage] = round(perf_counter() - t0, 4)
+
+        defaults_task = asyncio.ensure_future(timed("defaults", self._get_defaults()))
+        session_task = None
+        try:
+            if not notebook_id:
+                nb_url = f"{self.base}/notebooks"
+                nb_payload = {"name": f"temp-notebook-{int(time())}", "description": "Temporary notebook for source-scoped query"}
+                logger.info("Creating notebook: POST %s", nb_url)
+                t0 = perf_counter()
+                with tracing.span("notebook_ask.notebook"):
+                    nb_resp = await self.transport.post(nb_url, json=nb_payload, timeout=self.timeout)
+                    nb_resp.raise_for_status()
+                    notebook_id = nb_resp.json().get("id")
+                timings["notebook"] = round(perf_counter() - t0, 4)
+
+            if not session_id:
+                session_task = asyncio.ensure_future(timed("session", self._create_session(notebook_id)))
+
+            link_url = f"{self.base}/notebooks/{notebook_id}/sources/{source_id}"
+            logger.info("Linking source to notebook: POST %s", link_url)
+            t0 = perf_counter()
+            with tracing.span("notebook_ask.link"):
+                lresp = await self.transport.post(link_url, timeout=self.timeout)
+                lresp.raise_for_status()
+            timings["link"] = round(perf_counter() - t0, 4)
+
+            context_config = {"sources": {source_id: "full content"}, "notes": {}}
+            context_data = await timed("context", self._build_context(notebook_id, context_config))
+            built_context = context_data.get("context")
+
+            defaults = await defaults_task
+            if session_task is not None:
+                session_id = await session_task
+        except BaseException as e:
+            if not defaults_task.done():
+                defaults_task.cancel()
+            if session_task is not None:
+                if isinstance(e, asyncio.CancelledError):
+                    session_task.cancel()
+                else:
+                    # let a session creation in flight finish and delete it rather than orphan it
+                    await self._discard_session(session_task)
+            raise
+
+        exec_url = f"{self.base}/chat/execute"
+        exec_payload = {
+            "session_id": session_id,
+            "message": message,
+            "context": built_context,
+            "model_override": model_override or defaults.get("default_chat_model"),
+        }
+        logger.info("Executing chat (POST %s) with chat_model=%s", exec_url, exec_payload.get("model_override"))
+        t0 = perf_counter()
+        with tracing.span("notebook_ask.execute"):
+            exec_resp = await self.transport.post(exec_url, json=exec_payload, timeout=max(60, self.timeout))
+            exec_resp.raise_for_status()
+            msgs = exec_resp.json().get("messages", [])
+        timings["execute"] = round(perf_counter() - t0, 4)
+        timings["total"] = round(perf_counter() - started, 4)
+
+        return {
+            "notebook_id": notebook_id,
+            "session_id": session_id,
+            "messages": msgs,
+            "ai_answer": _last_ai_answer(msgs),
+            "timings": timings,
+        }
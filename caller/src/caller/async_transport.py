@@ -0,0 +1,171 @@
+import logging
+import time
+from typing import Any, Optional, Dict
+
+from .config import default_config
+from . import tracing
+from .instrumentation import RequestMetrics, RequestTiming
+
+logger = logging.getLogger("caller.async_transport")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+
+class AsyncTransport:
+    """asyncio counterpart of `Transport`, backed by a single `httpx.AsyncClient`.
+
+    Requires the optional `httpx` dependency (`pip install caller[async]`).
+    Connection limits come from CallerConfig:
+    - async_max_connections: total concurrent connections (each streaming ask holds one)
+    - pool_maxsize: keep-alive connections retained between requests
+    - keep_alive: when False no connections are kept between requests
+    - request_metrics / request_metrics_log_seconds: per-request timing, as for `Transport`
+
+    Requests are traced (CLIENT span + `traceparent` header) as for `Transport`.
+    """
+
+    def __init__(self, config=default_config, metrics: Optional[RequestMetrics] = None):
+        try:
+            import httpx
+        except ImportError as e:  # pragma: no cover - depends on environment
+            raise ImportError("AsyncTransport requires httpx; install with `pip install caller[async]`") from e
+        self.config = config
+        self.timeout = config.timeout_seconds
+        limits = httpx.Limits(
+            max_connections=config.async_max_connections,
+            max_keepalive_connections=config.pool_maxsize if config.keep_alive else 0,
+        )
+        transport = httpx.AsyncHTTPTransport(limits=limits, retries=config.max_retries)
+        self.client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+        self.metrics = metrics if metrics is not None else (RequestMetrics() if config.request_metrics else None)
+        self._owns_metrics_log = False
+        if self.metrics is not None and config.request_metrics_log_seconds and metrics is None:
+            self.metrics.start_summary_log(config.request_metrics_log_seconds)
+            self._owns_metrics_log = True
+        self.closed = False
+
+    async def request(self, method: str, url: str, **kwargs: Any):
+        """Send a request through the pooled client (default timeout from config)."""
+        kwargs.setdefault("timeout", self.timeout)
+        begun = self._begin(method, url, kwargs)
+        if begun is None:
+            return await self.client.request(method, url, **kwargs)
+        timing, span = begun
+        response = await self._send(timing, span, method, url, kwargs)
+        try:
+            await response.aread()
+        except Exception as e:
+            await response.aclose()
+            self._finish(timing, span, response, type(e).__name__)
+            raise
+        self._finish(timing, span, response)
+        return response
+
+    def _begin(self, method: str, url: str, kwargs: Dict[str, Any]):
+        """(timing, span) for a request, or None when neither metrics nor tracing is on; adds the traceparent."""
+        span = tracing.start_http_span(method, url)
+        if span.recording:
+            kwargs["headers"] = tracing.inject(kwargs.get("headers"), span)
+        elif self.metrics is None:
+            return None
+        timing = self.metrics.begin(method, url) if self.metrics is not None else RequestTiming(method, url)
+        return timing, span
+
+    def _record(self, timing: RequestTiming, span) -> None:
+        if self.metrics is not None:
+            self.metrics.record(timing)
+        tracing.end_http_span(span, timing)
+
+    async def _send(self, timing: RequestTiming, span, method: str, url: str, kwargs: Dict[str, Any]):
+        """Send with stream=True and record TTFB/connect time (records and re-raises on failure)."""
+        send_kwargs = {k: kwargs.pop(k) for k in ("auth", "follow_redirects") if k in kwargs}
+        connect: Dict[str, float] = {}
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            # httpcore trace events: connection.connect_tcp.*, connection.start_tls.*
+            if event == "connection.connect_tcp.started":
+                connect["start"] = time.perf_counter()
+            elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete") and "start" in connect:
+                connect["seconds"] = time.perf_counter() - connect["start"]
+
+        kwargs["extensions"] = dict(kwargs.get("extensions") or {}, trace=trace)
+        try:
+            request = self.client.build_request(method, url, **kwargs)
+            response = await self.client.send(request, stream=True, **send_kwargs)
+        except Exception as e:
+            timing.connect_s = connect.get("seconds")
+            timing.error = type(e).__name__
+            timing.total_s = timing.elapsed()
+            self._record(timing, span)
+            raise
+        timing.ttfb_s = timing.elapsed()
+        timing.connect_s = connect.get("seconds")
+        timing.status = response.status_code
+        length = request.headers.get("Content-Length")
+        timing.bytes_out = int(length) if length and length.isdigit() else 0
+        return response
+
+    def _finish(self, timing: RequestTiming, span, response, error: Optional[str] = None) -> None:
+        timing.total_s = timing.elapsed()
+        timing.read_s = timing.total_s - timing.ttfb_s
+        timing.bytes_in = response.num_bytes_downloaded
+        timing.error = error
+        self._record(timing, span)
+
+    async def get(self, url: str, **kwargs: Any):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any):
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any):
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any):
+        return await self.request("DELETE", url, **kwargs)
+
+    def stream(self, method: str, url: str, **kwargs: Any):
+        """Return an async context manager yielding a streaming response."""
+        kwargs.setdefault("timeout", self.timeout)
+        begun = self._begin(method, url, kwargs)
+        if begun is None:
+            return self.client.stream(method, url, **kwargs)
+        return _TimedStream(self, begun, method, url, kwargs)
+
+    async def close(self) -> None:
+        """Close all pooled connections. Safe to call more than once."""
+        if not self.closed:
+            logger.info("Closing pooled async HTTP transport")
+            if self._owns_metrics_log:
+                self.metrics.stop_summary_log()
+            await self.client.aclose()
+            self.closed = True
+
+    async def __aenter__(self) -> "AsyncTransport":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+class _TimedStream:
+    """AsyncTransport.stream() with timing/tracing: recorded when the response context is exited."""
+
+    def __init__(self, transport: AsyncTransport, begun, method: str, url: str, kwargs: Dict[str, Any]):
+        self._transport = transport
+        self._timing, self._span = begun
+        self._args = (method, url, kwargs)
+        self._response = None
+
+    async def __aenter__(self):
+        self._response = await self._transport._send(self._timing, self._span, *self._args)
+        return self._response
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            await self._response.aclose()
+        finally:
+            self._transport._finish(self._timing, self._span, self._response, exc_type.__name__ if exc_type else None)
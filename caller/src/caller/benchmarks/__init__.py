@@ -0,0 +1 @@
+"""Microbenchmarks for the caller client; run a module with `python -m caller.benchmarks.<name>`."""
@@ -0,0 +1,117 @@
+"""Throughput of the SSE decoder on a synthetic chat stream.
+
+    python -m caller.benchmarks.bench_sse [--events 200000] [--read-size 1460] [--repeat 5]
+
+Compares, in events/s:
+  - line_json: the previous approach (split into text lines, strip "data:", json.loads each line)
+  - sse_framing: SSEDecoder.feed() only, payloads left undecoded (lazy JSON)
+  - sse_as_dict: SSEDecoder.feed() + SSEEvent.as_dict() on every event
+"""
+import argparse
+import io
+import json
+import time
+from typing import List, Dict, Any, Callable
+
+from ..sse import SSEDecoder
+
+
+def make_stream(events: int) -> bytes:
+    """An open-notebook style source-chat stream of ai_message chunks."""
+    out = io.BytesIO()
+    for i in range(events):
+        ev = {"type": "ai_message", "content": f" token{i % 97}", "index": i}
+        out.write(b"data: ")
+        out.write(json.dumps(ev).encode("utf-8"))
+        out.write(b"\n\n")
+    out.write(b'data: {"type": "complete"}\n\n')
+    return out.getvalue()
+
+
+def split_reads(blob: bytes, read_size: int) -> List[bytes]:
+    return [blob[i:i + read_size] for i in range(0, len(blob), read_size)]
+
+
+def line_json(reads: List[bytes]) -> int:
+    """Baseline: what requests.iter_lines + per-line json.loads did."""
+    n = 0
+    pending = b""
+    for chunk in reads:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for raw in lines:
+            line = raw.decode("utf-8").strip()
+            if not line:
+                continue
+            body = line[len("data:"):].strip() if line.startswith("data:") else line
+            try:
+                json.loads(body)
+            except Exception:
+                pass
+            n += 1
+    return n
+
+
+def sse_framing(reads: List[bytes]) -> int:
+    decoder = SSEDecoder()
+    n = 0
+    for chunk in reads:
+        n += len(decoder.feed(chunk))
+    return n + len(decoder.flush())
+
+
+def sse_as_dict(reads: List[bytes]) -> int:
+    decoder = SSEDecoder()
+    n = 0
+    for chunk in reads:
+        for ev in decoder.feed(chunk):
+            ev.as_dict()
+            n += 1
+    for ev in decoder.flush():
+        ev.as_dict()
+        n += 1
+    return n
+
+
+CASES: Dict[str, Callable[[List[bytes]], int]] = {
+    "line_json": line_json,
+    "sse_framing": sse_framing,
+    "sse_as_dict": sse_as_dict,
+}
+
+
+def run(events: int = 200_000, read_size: int = 1460, repeat: int = 5) -> Dict[str, Any]:
+    """Best-of-`repeat` events/s for each case."""
+    blob = make_stream(events)
+    reads = split_reads(blob, read_size)
+    results: Dict[str, Any] = {"events": events + 1, "bytes": len(blob), "read_size": read_size, "cases": {}}
+    for name, fn in CASES.items():
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            count = fn(reads)
+            best = min(best, time.perf_counter() - t0)
+        if count != events + 1:
+            raise AssertionError(f"{name} decoded {count} events, expected {events + 1}")
+        results["cases"][name] = {"seconds": round(best, 4), "events_per_s": round(count / best), "mb_per_s": round(len(blob) / best / 1e6, 1)}
+    return results
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--events", type=int, default=200_000)
+    ap.add_argument("--read-size", type=int, default=1460, help="bytes per socket read (default: one TCP segment)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args(argv)
+    results = run(args.events, args.read_size, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['events']} events, {results['bytes'] / 1e6:.1f} MB, {args.read_size}-byte reads")
+    for name, r in results["cases"].items():
+        print(f"  {name:<12} {r['events_per_s']:>12,} events/s  {r['mb_per_s']:>7} MB/s  ({r['seconds']}s)")
+
+
+if __name__ == "__main__":
+    main()
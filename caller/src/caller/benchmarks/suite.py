@@ -0,0 +1,305 @@
+"""End-to-end client benchmarks against the in-process fake backend (caller.fake_backend).
+
+    python -m caller.benchmarks.suite [--only upload,lookup,search,sse,notebook_ask] [--quick]
+                                      [--save results.json] [--compare baseline.json] [--threshold 0.15]
+
+Measures:
+  - upload: single-shot multipart and resumable chunked upload throughput (MB/s)
+  - lookup: find_source_for_file latency with 1k/10k/100k sources on the server
+            (cold = first lookup, which lists the catalog; p50/p99 of cached lookups after it)
+  - search: vector_search queries/s from concurrent threads, with and without the search cache
+  - sse: answer chunks/s through ask_stream on an unpaced stream, and the decoder alone
+  - notebook_ask: end-to-end p50/p99 with backend latencies on the context/execute stages,
+                  cold (no notebook pool or context cache) and warm (defaults)
+
+--save writes the metrics as a JSON baseline. --compare re-checks every metric against a
+baseline and exits with status 1 if any moved the wrong way by more than --threshold;
+with --results the comparison uses a saved results file instead of running the suite.
+Absolute numbers depend on the machine, so compare runs from the same host.
+"""
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Callable
+
+from ..config import default_config
+from ..fake_backend import FakeBackend, FakeBackendConfig
+from ..pdf_uploader import PdfUploader
+from ..query_client import QueryClient
+from . import bench_sse
+
+# metric suffix -> whether bigger numbers are better (anything else is a latency: smaller is better)
+HIGHER_IS_BETTER = ("mb_per_s", "qps", "events_per_s", "asks_per_s")
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith(HIGHER_IS_BETTER)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `values` (pct in 0..100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def _quiet() -> None:
+    # per-request INFO logs would dominate the timings
+    for name in list(logging.root.manager.loggerDict):
+        if name == "caller" or name.startswith("caller."):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def _config(backend: FakeBackend, state_dir: str, **overrides: Any):
+    return dataclasses.replace(default_config, api_base_url=backend.url, upload_state_dir=state_dir, **overrides)
+
+
+def _in_threads(concurrency: int, items: List[Any], fn: Callable[[Any], None]) -> float:
+    """Run fn over items from `concurrency` threads; returns elapsed seconds."""
+    lock = threading.Lock()
+    it = iter(items)
+
+    def worker() -> None:
+        while True:
+            with lock:
+                item = next(it, None)
+            if item is None:
+                return
+            fn(item)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def bench_upload(quick: bool, state_dir: str) -> Dict[str, float]:
+    size = (8 if quick else 64) << 20
+    repeat = 2 if quick else 3
+    path = os.path.join(state_dir, "upload.pdf")
+    with open(path, "wb") as f:
+        block = os.urandom(1 << 20)
+        for _ in range(size >> 20):
+            f.write(block)
+    metrics: Dict[str, float] = {}
+    with FakeBackend() as backend:
+        uploader = PdfUploader(_config(backend, state_dir))
+        try:
+            for mode, chunked in (("single", False), ("chunked", True)):
+                best = float("inf")
+                for i in range(repeat):
+                    # a fresh title each time, so the existing-source check does not skip the upload
+                    start = time.perf_counter()
+                    resp = uploader.upload_file_and_process(path, title=f"bench-{mode}-{i}.pdf", chunked=chunked)
+                    best = min(best, time.perf_counter() - start)
+                    if not resp["ok"]:
+                        raise RuntimeError(f"{mode} upload failed: {resp.get('text')}")
+                metrics[f"upload.{mode}.mb_per_s"] = round(size / best / 1e6, 1)
+        finally:
+            uploader.close()
+    return metrics
+
+
+def bench_lookup(quick: bool, state_dir: str) -> Dict[str, float]:
+    sizes = (1000, 10000) if quick else (1000, 10000, 100000)
+    lookups = 2000
+    metrics: Dict[str, float] = {}
+    rng = random.Random(0)
+    for n in sizes:
+        with FakeBackend() as backend:
+            backend.add_sources(n)
+            uploader = PdfUploader(_config(backend, state_dir))
+            try:
+                start = time.perf_counter()
+                if uploader.find_source_for_file("document-000000.pdf") is None:
+                    raise RuntimeError("seeded source not found")
+                metrics[f"lookup.{n}.cold_ms"] = round((time.perf_counter() - start) * 1e3, 2)
+                names = [f"C:\\plans\\document-{rng.randrange(n):06d} (2).pdf" for _ in range(lookups)]
+                timings = []
+                for name in names:
+                    t0 = time.perf_counter()
+                    uploader.find_source_for_file(name)
+                    timings.append((time.perf_counter() - t0) * 1e6)
+                metrics[f"lookup.{n}.p50_us"] = round(percentile(timings, 50), 1)
+                metrics[f"lookup.{n}.p99_us"] = round(percentile(timings, 99), 1)
+            finally:
+                uploader.close()
+    return metrics
+
+
+def bench_search(quick: bool, state_dir: str) -> Dict[str, float]:
+    queries = [f"soakage pit detail {i}" for i in range(500 if quick else 2000)]
+    concurrency = 8
+    metrics: Dict[str, float] = {}
+    with FakeBackend() as backend:
+        backend.add_sources(200)
+        for label, cache_size in (("uncached", 0), ("cached", 4096)):
+            qc = QueryClient(_config(backend, state_dir, search_cache_size=cache_size, pool_maxsize=concurrency))
+            try:
+                if cache_size:
+                    for q in queries:
+                        qc.vector_search(q, results=10)
+                elapsed = _in_threads(concurrency, queries, lambda q: qc.vector_search(q, results=10))
+                metrics[f"search.{label}.qps"] = round(len(queries) / elapsed, 1)
+            finally:
+                qc.close()
+    return metrics
+
+
+def bench_sse_stream(quick: bool, state_dir: str) -> Dict[str, float]:
+    tokens = 5000 if quick else 20000
+    answer = "YES - " + "".join(f"token{i % 97} " for i in range(tokens))
+    metrics: Dict[str, float] = {}
+    with FakeBackend(FakeBackendConfig(answer=answer)) as backend:
+        source_id = backend.add_sources(1)[0]
+        qc = QueryClient(_config(backend, state_dir))
+        try:
+            best, stats = float("inf"), {}
+            for _ in range(3):
+                start = time.perf_counter()
+                with qc.ask_stream("Are soakage pits shown?", [source_id]) as stream:
+                    for _ in stream:
+                        pass
+                elapsed = time.perf_counter() - start
+                if stream.answer != answer:
+                    raise RuntimeError("streamed answer does not match")
+                if elapsed < best:
+                    best, stats = elapsed, stream.stats()
+            metrics["sse.stream.events_per_s"] = round(stats["events"] / best)
+            metrics["sse.stream.ttft_ms"] = round(stats["ttft_s"] * 1e3, 2)
+        finally:
+            qc.close()
+    decoder = bench_sse.run(events=50_000 if quick else 200_000, repeat=3)
+    metrics["sse.decoder.events_per_s"] = decoder["cases"]["sse_as_dict"]["events_per_s"]
+    return metrics
+
+
+def bench_notebook_ask(quick: bool, state_dir: str) -> Dict[str, float]:
+    asks = 40 if quick else 200
+    concurrency = 4
+    backend_config = FakeBackendConfig(latency_ms=2, endpoint_latency_ms={"/chat/context": 30, "/chat/execute": 60})
+    metrics: Dict[str, float] = {}
+    with FakeBackend(backend_config) as backend:
+        source_ids = backend.add_sources(8)
+        for label, overrides in (("cold", {"notebook_pool": False, "context_cache_size": 0}), ("warm", {"notebook_pool": True, "context_cache_size": 32})):
+            qc = QueryClient(_config(backend, state_dir, **overrides))
+            timings: List[float] = []
+            lock = threading.Lock()
+
+            def ask(i: int) -> None:
+                t0 = time.perf_counter()
+                qc.notebook_ask(source_id=source_ids[i % len(source_ids)], message="Are soakage pits shown?")
+                with lock:
+                    timings.append((time.perf_counter() - t0) * 1e3)
+
+            try:
+                elapsed = _in_threads(concurrency, list(range(asks)), ask)
+            finally:
+                qc.close()
+            metrics[f"notebook_ask.{label}.p50_ms"] = round(percentile(timings, 50), 2)
+            metrics[f"notebook_ask.{label}.p99_ms"] = round(percentile(timings, 99), 2)
+            metrics[f"notebook_ask.{label}.asks_per_s"] = round(asks / elapsed, 1)
+    return metrics
+
+
+BENCHMARKS: Dict[str, Callable[[bool, str], Dict[str, float]]] = {
+    "upload": bench_upload,
+    "lookup": bench_lookup,
+    "search": bench_search,
+    "sse": bench_sse_stream,
+    "notebook_ask": bench_notebook_ask,
+}
+
+
+def run(only: Optional[List[str]] = None, quick: bool = False) -> Dict[str, Any]:
+    """Run the selected benchmarks; returns {"created", "host", "quick", "metrics": {name: value}}."""
+    names = only or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"unknown benchmark(s): {', '.join(unknown)}")
+    _quiet()
+    metrics: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="caller-bench-") as state_dir:
+        for name in names:
+            start = time.perf_counter()
+            metrics.update(BENCHMARKS[name](quick, state_dir))
+            print(f"  {name} done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "quick": quick,
+        "metrics": metrics,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.15) -> List[Dict[str, Any]]:
+    """One row per metric present in both runs: {metric, baseline, current, change, regression}.
+
+    `change` is the relative difference (current / baseline - 1); a regression is a move in the
+    bad direction by more than `threshold`.
+    """
+    rows = []
+    current, base = results["metrics"], baseline["metrics"]
+    for metric in sorted(set(current) & set(base)):
+        old, new = base[metric], current[metric]
+        change = (new / old - 1.0) if old else 0.0
+        worse = -change if higher_is_better(metric) else change
+        rows.append({"metric": metric, "baseline": old, "current": new, "change": round(change, 4), "regression": worse > threshold})
+    return rows
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--only", help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    ap.add_argument("--quick", action="store_true", help="smaller sizes (no 100k lookup), for CI smoke runs")
+    ap.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    ap.add_argument("--compare", metavar="BASELINE", help="compare against a saved baseline; exit 1 on regression")
+    ap.add_argument("--results", metavar="PATH", help="with --compare: use saved results instead of running")
+    ap.add_argument("--threshold", type=float, default=0.15, help="relative change counted as a regression (default 0.15)")
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args(argv)
+
+    if args.results:
+        with open(args.results, "r", encoding="utf-8") as f:
+            results = json.load(f)
+    else:
+        results = run(args.only.split(",") if args.only else None, quick=args.quick)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+    elif not args.compare:
+        for metric, value in results["metrics"].items():
+            print(f"  {metric:<36} {value:>14,}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        for r in rows:
+            flag = "REGRESSION" if r["regression"] else ""
+            print(f"  {r['metric']:<36} {r['baseline']:>14,} -> {r['current']:>14,}  {r['change']:+7.1%}  {flag}")
+        regressions = [r["metric"] for r in rows if r["regression"]]
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} ({len(rows)} metrics compared)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+
+# returned by tiers on a miss so that cached None/falsy values stay distinguishable
+MISSING = object()
+
+
+def make_key(*parts: Any) -> str:
+    """Stable cache key: SHA-256 of the canonical JSON encoding of `parts`."""
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded in-memory LRU with an optional per-entry TTL."""
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISSING
+            stored_at, value = item
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, age: float = 0.0) -> None:
+        """Store `value`; `age` seconds already elapsed count toward its TTL (e.g. when promoted from disk)."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() - age, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class SqliteCache:
+    """JSON values in a SQLite table, shareable between processes (WAL mode).
+
+    Each `namespace` gets its own table so several caches can live in one file.
+    Entries older than `ttl_seconds` are ignored on read and pruned on write.
+    """
+
+    def __init__(self, path: str, namespace: str, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        if not namespace.isidentifier():
+            raise ValueError(f"namespace must be an identifier, got {namespace!r}")
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = f"cache_{namespace}"
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)")
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_stored ON {self.table}(stored_at)")
+
+    def get(self, key: str) -> Any:
+        return self.get_with_age(key)[0]
+
+    def get_with_age(self, key: str) -> Tuple[Any, float]:
+        """(value, seconds since it was stored), or (MISSING, 0.0)."""
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return MISSING, 0.0
+        value, stored_at = row
+        age = max(0.0, time.time() - stored_at)
+        if self.ttl_seconds is not None and age > self.ttl_seconds:
+            return MISSING, 0.0
+        return json.loads(value), age
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=str), now),
+            )
+            if self.ttl_seconds is not None:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE stored_at < ?", (now - self.ttl_seconds,))
+            if self.max_entries:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """In-memory LRU in front of an optional SqliteCache, with hit/miss counters.
+
+    Disk hits are promoted into memory with their original age, so promotion never extends an
+    entry past its TTL; writes go to both tiers.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[SqliteCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not MISSING:
+            with self._lock:
+                self.hits += 1
+                self.memory_hits += 1
+            return value
+        if self.disk is not None:
+            value, age = self.disk.get_with_age(key)
+            if value is not MISSING:
+                self.memory.set(key, value, age=age)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return MISSING
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "entries": len(self.memory),
+                "evictions": self.memory.evictions,
+            }
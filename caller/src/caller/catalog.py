@@ -0,0 +1,248 @@
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterable
+
+logger = logging.getLogger("caller.catalog")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+
+def normalize_filename(fname: str) -> str:
+    """Strip suffix patterns like ' (5)' before extension.
+    Example: 'file (5).PDF' -> 'file.pdf'
+    """
+    # Extract basename if path provided
+    base = Path(fname).name
+    # Split extension
+    if '.' in base:
+        name_part, ext = base.rsplit('.', 1)
+        # Remove patterns like " (5)" at end of name
+        name_part = re.sub(r'\s*\(\d+\)\s*$', '', name_part).strip()
+        return f"{name_part}.{ext}".lower()
+    return base.lower()
+
+
+def _recency(src: Dict[str, Any]) -> str:
+    return str(src.get("updated") or src.get("created") or "")
+
+
+class SourceCatalog:
+    """Cached, indexed view of the backend `/sources` listing.
+
+    Keeps three hash indexes over normalized source dicts so filename lookups are O(1):
+    - by exact asset file path
+    - by lower-cased basename (asset file path basename and title)
+    - by normalized title (server suffixes like " (5)" stripped, see normalize_filename)
+
+    Refresh policy:
+    - entries are served from memory for `ttl_seconds`
+    - once stale, an incremental refresh pages `/sources` newest-first (sort_by=updated) and stops at the
+      `updated` watermark of the previous refresh; servers that ignore paging or the sort order (pages not
+      newest-first) get a full reload, as does a failed incremental listing
+    - a full reload also happens every `full_refresh_seconds` so server-side deletions are noticed
+    - ttl_seconds <= 0 disables caching (every lookup lists /sources, the legacy behaviour)
+    - if the catalog cannot be refreshed, find() falls back to a live listing and match (as before the
+      catalog existed) rather than reporting "not found", which would make callers upload duplicates
+    """
+
+    def __init__(self, uploader, ttl_seconds: float = 30.0, full_refresh_seconds: float = 600.0, page_size: int = 500):
+        self.uploader = uploader
+        self.ttl_seconds = ttl_seconds
+        self.full_refresh_seconds = full_refresh_seconds
+        self.page_size = page_size
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_path: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_basename: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_normalized: Dict[str, List[Dict[str, Any]]] = {}
+        self._watermark: str = ""
+        self._refreshed_at = 0.0
+        self._full_refreshed_at = 0.0
+        self.refresh_count = 0
+
+    # ---- index maintenance ----
+    def _keys(self, src: Dict[str, Any]):
+        file_path = src.get("asset_file_path") or ""
+        title = src.get("title") or ""
+        basenames = set()
+        if file_path:
+            basenames.add(Path(file_path).name.lower())
+        if title:
+            basenames.add(title.lower())
+        return file_path, basenames, (normalize_filename(title) if title else "")
+
+    def _index(self, src: Dict[str, Any]) -> None:
+        file_path, basenames, normalized = self._keys(src)
+        if file_path:
+            self._by_path.setdefault(file_path, []).append(src)
+        for b in basenames:
+            self._by_basename.setdefault(b, []).append(src)
+        if normalized:
+            self._by_normalized.setdefault(normalized, []).append(src)
+
+    def _unindex(self, src: Dict[str, Any]) -> None:
+        file_path, basenames, normalized = self._keys(src)
+        for idx, keys in ((self._by_path, [file_path]), (self._by_basename, basenames), (self._by_normalized, [normalized])):
+            for k in keys:
+                bucket = idx.get(k)
+                if bucket is None:
+                    continue
+                bucket[:] = [s for s in bucket if s.get("id") != src.get("id")]
+                if not bucket:
+                    del idx[k]
+
+    def upsert(self, src: Dict[str, Any]) -> None:
+        """Add or replace one normalized source (e.g. right after an upload)."""
+        sid = src.get("id")
+        if not sid:
+            return
+        with self._lock:
+            old = self._by_id.get(sid)
+            if old is not None:
+                self._unindex(old)
+            self._by_id[sid] = src
+            self._index(src)
+            if _recency(src) > self._watermark:
+                self._watermark = _recency(src)
+
+    def remove(self, source_id: str) -> None:
+        with self._lock:
+            old = self._by_id.pop(source_id, None)
+            if old is not None:
+                self._unindex(old)
+
+    def _replace_all(self, sources: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._by_id.clear()
+            self._by_path.clear()
+            self._by_basename.clear()
+            self._by_normalized.clear()
+            self._watermark = ""
+            for s in sources:
+                self.upsert(s)
+
+    def invalidate(self) -> None:
+        """Force a full reload on the next lookup."""
+        with self._lock:
+            self._refreshed_at = 0.0
+            self._full_refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._by_id)
+
+    # ---- refresh ----
+    def _is_fresh(self) -> bool:
+        return self.ttl_seconds > 0 and (time.monotonic() - self._refreshed_at) < self.ttl_seconds
+
+    def refresh(self, force_full: bool = False) -> bool:
+        """Bring the catalog up to date. Returns False if listing /sources failed."""
+        with self._refresh_lock:
+            if not force_full and self._is_fresh():
+                return True
+            now = time.monotonic()
+            full = (
+                force_full
+                or self.ttl_seconds <= 0
+                or not self._watermark
+                or (now - self._full_refreshed_at) >= self.full_refresh_seconds
+            )
+            ok = self._full_refresh() if full else self._incremental_refresh()
+            if not ok and not full:
+                logger.warning("Incremental source catalog refresh failed; trying a full reload")
+                ok = self._full_refresh()
+            if ok:
+                self._refreshed_at = time.monotonic()
+                self.refresh_count += 1
+            return ok
+
+    def _full_refresh(self) -> bool:
+        sources = self.uploader.list_sources()
+        if sources is None:
+            return False
+        self._replace_all(sources)
+        self._full_refreshed_at = time.monotonic()
+        logger.info(f"Source catalog reloaded: {len(sources)} sources")
+        return True
+
+    def _incremental_refresh(self) -> bool:
+        watermark = self._watermark
+        offset = 0
+        seen = 0
+        previous: Optional[str] = None
+        while True:
+            page = self.uploader.list_sources(limit=self.page_size, offset=offset, sort_by="updated", sort_order="desc")
+            if page is None:
+                return False
+            if len(page) > self.page_size:
+                # server ignored paging and returned everything: treat as a full listing
+                self._replace_all(page)
+                self._full_refreshed_at = time.monotonic()
+                return True
+            recency = [_recency(s) for s in page]
+            if previous is not None:
+                recency.insert(0, previous)
+            if any(a < b for a, b in zip(recency, recency[1:])):
+                # server ignored sort_by/sort_order: stopping at the watermark could miss new sources
+                logger.warning("Source listing is not sorted newest-first; falling back to a full reload")
+                return self._full_refresh()
+            if recency:
+                previous = recency[-1]
+            for s in page:
+                self.upsert(s)
+            seen += len(page)
+            if len(page) < self.page_size or not page or min(_recency(s) for s in page) <= watermark:
+                break
+            offset += self.page_size
+        logger.info(f"Source catalog incremental refresh: {seen} recent sources since {watermark or 'start'}")
+        return True
+
+    # ---- lookups ----
+    def _lookup(self, filename_or_path: str) -> Optional[Dict[str, Any]]:
+        target = str(filename_or_path)
+        with self._lock:
+            results = (
+                self._by_path.get(target)
+                or self._by_basename.get(Path(target).name.lower())
+                or self._by_normalized.get(normalize_filename(target))
+                or []
+            )
+            if not results:
+                return None
+            return max(results, key=_recency)
+
+    def find(self, filename_or_path: str) -> Optional[Dict[str, Any]]:
+        """Return the best-matching source (most recently updated) or None."""
+        if not self.refresh():
+            return self._live_lookup(filename_or_path)
+        found = self._lookup(filename_or_path)
+        if found:
+            logger.info(f"Selected source: {found.get('title')} (id: {found.get('id')})")
+        else:
+            logger.info(f"No matching source found for: {filename_or_path}")
+        return found
+
+    def find_many(self, names: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Resolve many filenames against a single refresh of the catalog."""
+        names = list(names)
+        if not self.refresh():
+            sources = self.uploader.list_sources()
+            if sources is None:
+                return {n: None for n in names}
+            return {n: self.uploader._match_source(sources, n) for n in names}
+        return {n: self._lookup(n) for n in names}
+
+    def _live_lookup(self, filename_or_path: str) -> Optional[Dict[str, Any]]:
+        """Uncached lookup used when the catalog cannot be refreshed: list /sources once and match."""
+        logger.warning(f"Source catalog unavailable; looking up {filename_or_path} with a live listing")
+        sources = self.uploader.list_sources()
+        if sources is None:
+            return None
+        return self.uploader._match_source(sources, filename_or_path)
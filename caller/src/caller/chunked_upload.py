@@ -0,0 +1,204 @@
+"""Resumable, chunked upload of large files.
+
+Wire contract (a backend or local stand-in server implements these four endpoints):
+
+    POST {base}/sources/uploads
+        JSON {"filename": str, "size": int}
+        -> 200/201 {"upload_id": str, "offset": int, "chunk_size": int (optional, server preference)}
+        -> 404/405/501 when chunked uploads are not supported (client falls back to POST /sources)
+
+    GET {base}/sources/uploads/{upload_id}
+        -> 200 {"upload_id": str, "offset": int, "size": int}   bytes committed so far
+        -> 404 if the session expired (client starts a new one)
+
+    PUT {base}/sources/uploads/{upload_id}
+        headers: Content-Range: bytes {start}-{end}/{size}   (end inclusive)
+        body: the raw chunk bytes
+        -> 200 {"offset": int}                                  new committed offset
+        -> 409 {"offset": int} if start != committed offset     (client resyncs and continues)
+
+    POST {base}/sources/uploads/{upload_id}/complete
+        JSON {"title", "embed", "async_processing", "notebooks"(optional)}
+        -> same response body as POST /sources (the created source)
+
+The client records {upload_id, offset} per local file in a small JSON state file, so an
+interrupted upload (crash, network loss) resumes from the last committed offset instead of
+restarting; a failed chunk is retried on its own.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+import requests
+
+from .multipart import ProgressCallback
+
+logger = logging.getLogger("caller.chunked_upload")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+UNSUPPORTED_STATUS = (404, 405, 501)
+
+
+class ChunkedUploadUnsupported(Exception):
+    """The backend does not implement the chunked upload endpoints."""
+
+
+class ChunkedUploadError(Exception):
+    """The backend's committed offset stopped advancing or went past the end of the file."""
+
+
+class ChunkedUploader:
+    """Client side of the resumable chunked upload contract described in this module."""
+
+    def __init__(self, transport, base: str, timeout: float, state_dir: str, chunk_size: int = 8 << 20, chunk_retries: int = 5):
+        if chunk_retries < 1:
+            raise ValueError("chunk_retries must be >= 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        self.transport = transport
+        self.base = base.rstrip("/")
+        self.timeout = timeout
+        self.state_dir = Path(state_dir).expanduser()
+        self.chunk_size = chunk_size
+        self.chunk_retries = chunk_retries
+
+    # ---- local resume state ----
+    def _state_path(self, file_path: str) -> Path:
+        st = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}|{st.st_size}|{st.st_mtime_ns}"
+        return self.state_dir / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _load_state(self, path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self, path: Path, state: Dict[str, Any]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, path)
+
+    # ---- protocol steps ----
+    def _start(self, filename: str, size: int) -> Dict[str, Any]:
+        resp = self.transport.post(f"{self.base}/sources/uploads", json={"filename": filename, "size": size}, timeout=self.timeout)
+        if resp.status_code in UNSUPPORTED_STATUS:
+            raise ChunkedUploadUnsupported(f"POST /sources/uploads returned {resp.status_code}")
+        resp.raise_for_status()
+        try:
+            started = resp.json()
+        except ValueError:
+            started = None
+        if not isinstance(started, dict) or not started.get("upload_id"):
+            raise ChunkedUploadUnsupported("POST /sources/uploads did not return an upload_id")
+        return started
+
+    def _server_offset(self, upload_id: str) -> Optional[int]:
+        resp = self.transport.get(f"{self.base}/sources/uploads/{upload_id}", timeout=self.timeout)
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return int(resp.json().get("offset", 0))
+
+    def _put_chunk(self, upload_id: str, fh, offset: int, size: int, chunk_size: int) -> int:
+        """Send one chunk starting at `offset` (retrying only this chunk); return the new committed offset."""
+        fh.seek(offset)
+        chunk = fh.read(min(chunk_size, size - offset))
+        end = offset + len(chunk) - 1
+        url = f"{self.base}/sources/uploads/{upload_id}"
+        headers = {"Content-Range": f"bytes {offset}-{end}/{size}", "Content-Type": "application/octet-stream"}
+        delay = 0.5
+        for attempt in range(1, self.chunk_retries + 1):
+            try:
+                resp = self.transport.put(url, data=chunk, headers=headers, timeout=self.timeout)
+                if resp.status_code == 409:
+                    # server committed a different offset (e.g. our previous ack was lost): resync
+                    return int(resp.json().get("offset", offset))
+                resp.raise_for_status()
+                return int(resp.json().get("offset", end + 1))
+            except (requests.RequestException, ValueError) as e:
+                if attempt == self.chunk_retries:
+                    raise
+                logger.warning(f"Chunk {offset}-{end} failed (attempt {attempt}/{self.chunk_retries}): {e}; retrying")
+                metrics = getattr(self.transport, "metrics", None)
+                if metrics is not None:
+                    metrics.record_retry("PUT", url)
+                time.sleep(delay)
+                delay = min(delay * 2, 10.0)
+                # the server may have committed the chunk before the connection dropped; if the
+                # resync fails too (connection still down) retry the same chunk on the next attempt
+                try:
+                    server = self._server_offset(upload_id)
+                except (requests.RequestException, ValueError) as resync_error:
+                    logger.warning(f"Could not resync offset of upload {upload_id}: {resync_error}")
+                    continue
+                if server is not None and server != offset:
+                    return server
+        return offset
+
+    def upload(self, file_path: str, fields: Dict[str, Any], progress: Optional[ProgressCallback] = None) -> requests.Response:
+        """Upload `file_path` in chunks, resuming a previous attempt if one was recorded.
+
+        `fields` are the /sources form fields (title, embed, async_processing, notebooks).
+        Returns the response of the complete call. Raises ChunkedUploadUnsupported if the backend
+        lacks the endpoints, and ChunkedUploadError if its committed offset stops advancing (for
+        chunk_retries attempts in a row) or runs past the file size.
+        """
+        size = os.path.getsize(file_path)
+        state_path = self._state_path(file_path)
+        state = self._load_state(state_path)
+
+        offset = None
+        if state:
+            offset = self._server_offset(state["upload_id"])
+            if offset is None:
+                logger.info(f"Upload session {state['upload_id']} expired; starting over")
+                state = None
+            else:
+                logger.info(f"Resuming upload {state['upload_id']} of {file_path} at byte {offset}/{size}")
+        if not state:
+            started = self._start(Path(file_path).name, size)
+            state = {"upload_id": started["upload_id"], "chunk_size": int(started.get("chunk_size") or self.chunk_size)}
+            offset = int(started.get("offset", 0))
+        state["offset"] = offset
+        self._save_state(state_path, state)
+
+        upload_id = state["upload_id"]
+        chunk_size = state["chunk_size"]
+        t0 = time.perf_counter()
+        sent = 0
+        stalled = 0
+        with open(file_path, "rb") as fh:
+            while offset < size:
+                new_offset = self._put_chunk(upload_id, fh, offset, size, chunk_size)
+                if new_offset > size:
+                    raise ChunkedUploadError(f"Upload {upload_id}: server committed offset {new_offset} past the file size {size}")
+                if new_offset <= offset:
+                    # e.g. a 409 naming the offset we sent from: re-sending is bounded by chunk_retries
+                    stalled += 1
+                    if stalled >= self.chunk_retries:
+                        raise ChunkedUploadError(f"Upload {upload_id}: no progress past byte {offset} after {stalled} attempts")
+                    logger.warning(f"Upload {upload_id}: server offset {new_offset} did not advance from {offset}; re-sending")
+                else:
+                    stalled = 0
+                sent += max(0, new_offset - offset)
+                offset = new_offset
+                state["offset"] = offset
+                self._save_state(state_path, state)
+                if progress is not None:
+                    elapsed = time.perf_counter() - t0
+                    progress(offset, size, sent / elapsed if elapsed > 0 else 0.0)
+
+        resp = self.transport.post(f"{self.base}/sources/uploads/{upload_id}/complete", json=fields, timeout=self.timeout)
+        if resp.ok:
+            state_path.unlink(missing_ok=True)
+        return resp
@@ -26,6 +26,60 @@ class CallerConfig:
     default_speech_to_text_model: Optional[str] = None
     default_tools_model: Optional[str] = None
     timeout_seconds: int = 60
+    # Shared HTTP connection pool (see transport.Transport)
+    pool_connections: int = 10  # number of per-host pools kept alive
+    pool_maxsize: int = 32  # max keep-alive connections per host
+    pool_block: bool = False  # if True, wait for a free connection instead of exceeding pool_maxsize
+    keep_alive: bool = True
+    max_retries: int = 0  # retries of failed connection attempts only (requests are never re-sent after a read error)
+    # SQLite file for the content-hash upload dedup index (see dedup.ContentHashIndex); None disables it
+    hash_index_path: Optional[str] = None
+    # How long the cached /sources catalog is trusted before an incremental refresh (<= 0 disables caching)
+    source_catalog_ttl_seconds: float = 30.0
+    # StatusPoller: per-source adaptive interval and a global cap on /sources/{id}/status requests
+    poll_initial_interval: float = 1.0
+    poll_max_interval: float = 30.0
+    poll_backoff: float = 1.5
+    poll_max_rate: float = 10.0  # requests per second across all tracked sources
+    # Upload progress is reported every this many bytes; the async client also sends in pieces of this size (see multipart.MultipartFileEncoder)
+    upload_chunk_size: int = 1 << 20
+    # Resumable chunked uploads (see chunked_upload): used for files >= threshold when the backend supports them
+    chunked_upload_threshold: int = 64 << 20
+    resumable_chunk_size: int = 8 << 20
+    resumable_chunk_retries: int = 5
+    upload_state_dir: str = "~/.caller/uploads"  # where in-progress upload offsets are recorded
+    # /models/defaults is cached process-wide for this long (refreshed in the background before expiry)
+    defaults_ttl_seconds: float = 300.0
+    # Reuse temp notebooks across notebook_ask calls (see notebook_pool.NotebookPool); opt-in, since
+    # pooled notebooks outlive the call (deleted after notebook_pool_idle_seconds or on close())
+    notebook_pool: bool = False
+    notebook_pool_idle_seconds: float = 900.0  # idle pooled notebooks are deleted on the server after this
+    # Also pool one chat session per notebook (saves a POST per ask, but later questions see earlier Q&A history)
+    notebook_pool_reuse_sessions: bool = False
+    # Built /chat/context responses, keyed by source version (see context_cache.ContextCache); 0 entries disables.
+    # Opt-in: each notebook_ask then spends a GET /sources/{id} on the version key to save a rebuild
+    context_cache_size: int = 0
+    context_cache_ttl_seconds: Optional[float] = None
+    context_cache_path: Optional[str] = None  # SQLite file for a disk tier shared across runs
+    # vector_search(source_ids=...) over-fetches by this factor per round trip, up to search_max_limit hits
+    search_overfetch_factor: int = 4
+    search_max_limit: int = 1000
+    # /search results cache (see search_cache.SearchCache); 0 entries disables, path adds a shared SQLite tier.
+    # Opt-in: cached results can be up to search_cache_ttl_seconds stale (newly embedded sources are missed)
+    search_cache_size: int = 0
+    search_cache_ttl_seconds: Optional[float] = 300.0
+    search_cache_path: Optional[str] = None
+    # Threads per QueryClient for notebook_ask stages that can overlap (defaults fetch, session creation)
+    notebook_ask_workers: int = 4
+    # Per-request timing histograms on the transports (see instrumentation.RequestMetrics); log a summary every N seconds if set
+    request_metrics: bool = True
+    request_metrics_log_seconds: Optional[float] = None
+    # Serve OpenMetrics on this local port from Application / AsyncApplication (see metrics_exporter.MetricsExporter)
+    metrics_port: Optional[int] = None
+    # Write trace spans as JSON lines to this file from Application / AsyncApplication (see tracing)
+    trace_path: Optional[str] = None
+    # asyncio clients (see async_transport.AsyncTransport); long-lived SSE asks each hold a connection
+    async_max_connections: int = 200
 
 
 default_config = CallerConfig()
@@ -0,0 +1,49 @@
+import logging
+from typing import Optional, Dict, Any
+
+from .cache import LRUCache, SqliteCache, TieredCache, make_key, MISSING
+
+logger = logging.getLogger("caller.context_cache")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+# fields of the POST /chat/context response that are kept
+CONTEXT_FIELDS = ("context", "token_count", "char_count")
+
+
+class ContextCache:
+    """Cache of built /chat/context responses, keyed by context_config and source versions.
+
+    The key is the canonical context_config plus each referenced source's `updated`
+    timestamp, so an edited or reprocessed source misses automatically. The notebook id
+    is not part of the key: the context is built only from the sources/notes the config
+    names, which lets pooled or fresh temp notebooks share one entry.
+    """
+
+    def __init__(self, max_entries: int = 32, ttl_seconds: Optional[float] = None, path: Optional[str] = None):
+        disk = SqliteCache(path, "chat_context", ttl_seconds=ttl_seconds) if path else None
+        self._cache = TieredCache(LRUCache(max_entries, ttl_seconds=ttl_seconds), disk)
+
+    @staticmethod
+    def key(context_config: Dict[str, Any], versions: Dict[str, Any]) -> str:
+        return make_key("chat-context", context_config, versions)
+
+    def get(self, context_config: Dict[str, Any], versions: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        value = self._cache.get(self.key(context_config, versions))
+        return None if value is MISSING else dict(value)
+
+    def put(self, context_config: Dict[str, Any], versions: Dict[str, Any], context_data: Dict[str, Any]) -> None:
+        value = {f: context_data.get(f) for f in CONTEXT_FIELDS}
+        self._cache.set(self.key(context_config, versions), value)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def close(self) -> None:
+        self._cache.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
@@ -0,0 +1,79 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+def file_sha256(file_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Return the hex SHA-256 of a file, read in fixed-size chunks (constant memory)."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ContentHashIndex:
+    """Local content-addressed index mapping SHA-256 of uploaded bytes to a backend source_id.
+
+    Persisted in a small SQLite database so it survives restarts and can be shared by several
+    processes. Lookups are a primary-key read; no `/sources` listing is needed, and identical
+    bytes uploaded under a different filename still resolve to the same source.
+
+    Usage:
+        index = ContentHashIndex("~/.caller/hashes.sqlite3")
+        uploader = PdfUploader(config, hash_index=index)
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS content_hashes ("
+                " sha256 TEXT PRIMARY KEY,"
+                " source_id TEXT NOT NULL,"
+                " title TEXT,"
+                " size INTEGER,"
+                " created REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_content_hashes_source ON content_hashes(source_id)")
+
+    def lookup(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """Return {"sha256", "source_id", "title", "size", "created"} or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, source_id, title, size, created FROM content_hashes WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        if not row:
+            return None
+        return dict(zip(("sha256", "source_id", "title", "size", "created"), row))
+
+    def record(self, sha256: str, source_id: str, title: Optional[str] = None, size: Optional[int] = None) -> None:
+        """Map a content hash to the source created for it (replaces any previous mapping)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO content_hashes (sha256, source_id, title, size, created) VALUES (?, ?, ?, ?, ?)",
+                (sha256, source_id, title, size, time.time()),
+            )
+
+    def forget(self, source_id: str) -> int:
+        """Drop every hash pointing at `source_id` (e.g. after the source was deleted). Returns rows removed."""
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM content_hashes WHERE source_id = ?", (source_id,))
+            return cur.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM content_hashes").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
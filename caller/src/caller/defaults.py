@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, Awaitable, Set, Tuple
+
+logger = logging.getLogger("caller.defaults")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+# CallerConfig fields that mirror keys of the /models/defaults response
+MODEL_FIELDS = (
+    "default_chat_model",
+    "default_transformation_model",
+    "large_context_model",
+    "default_text_to_speech_model",
+    "default_speech_to_text_model",
+    "default_embedding_model",
+    "default_tools_model",
+)
+# the clients only ever read these two; when both are configured /models/defaults is never fetched
+REQUIRED_FIELDS = ("default_chat_model", "default_transformation_model")
+
+
+def config_models(config) -> Dict[str, Any]:
+    """Model ids explicitly set on a CallerConfig (unset fields omitted)."""
+    return {f: getattr(config, f) for f in MODEL_FIELDS if getattr(config, f, None)}
+
+
+class ModelDefaultsCache:
+    """TTL cache for the `/models/defaults` response with refresh-ahead.
+
+    - a fresh value is returned without any request
+    - once older than `refresh_ahead * ttl_seconds` the cached value is still returned, and one
+      background thread refreshes it so callers never wait on the round trip
+    - an expired value is refetched synchronously (single-flight: concurrent callers wait for one request)
+    - if a fetch fails the last known value is served (or {} if there never was one), and for
+      `retry_after_seconds` no new fetch is tried: callers queued behind the failed request get the
+      last known value instead of each retrying in turn
+
+    aget() gives asyncio callers the same behaviour: the refresh-ahead runs as a background task and
+    concurrent callers on one event loop share a single fetch task.
+
+    One instance per API base URL and TTL is shared process-wide (see defaults_cache_for).
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, refresh_ahead: float = 0.8, retry_after_seconds: float = 5.0):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_ahead = refresh_ahead
+        self.retry_after_seconds = retry_after_seconds
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._value: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+        # monotonic time before which a failed fetch is not retried
+        self._retry_at = 0.0
+        self._refreshing = False
+        # asyncio single-flight: the fetch task in progress (bound to the loop that created it)
+        self._async_fetch: Optional["asyncio.Task[Dict[str, Any]]"] = None
+        self._async_refreshes: Set["asyncio.Task[None]"] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _age(self) -> float:
+        return time.monotonic() - self._fetched_at
+
+    def peek(self) -> Optional[Dict[str, Any]]:
+        """Return the cached value if it has not expired, else None (no I/O)."""
+        with self._lock:
+            if self._value is not None and self._age() < self.ttl_seconds:
+                return dict(self._value)
+        return None
+
+    def store(self, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._value = dict(value or {})
+            self._fetched_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._fetched_at = 0.0
+            self._retry_at = 0.0
+
+    def _backing_off(self) -> bool:
+        return time.monotonic() < self._retry_at
+
+    def _fetch_failed(self, e: Exception) -> Dict[str, Any]:
+        logger.warning("Unable to fetch /models/defaults (not retried for %.0fs): %s", self.retry_after_seconds, e)
+        with self._lock:
+            self._retry_at = time.monotonic() + self.retry_after_seconds
+            return dict(self._value or {})
+
+    def _stale(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._value or {})
+
+    def _fetch(self, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        if self._backing_off():
+            return self._stale()
+        with self._fetch_lock:
+            # another thread may have refreshed (or failed to) while we waited
+            fresh = self.peek()
+            if fresh is not None and self._age() < self.ttl_seconds * self.refresh_ahead:
+                return fresh
+            if self._backing_off():
+                return self._stale()
+            try:
+                value = fetch() or {}
+            except Exception as e:
+                return self._fetch_failed(e)
+            self.store(value)
+            logger.info("Server models: chat=%s, transformation=%s", value.get("default_chat_model"), value.get("default_transformation_model"))
+            return dict(value)
+
+    def _background_refresh(self, fetch: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            self._fetch(fetch)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def get(self, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return defaults, calling `fetch()` only when the cached value is missing, stale or expired."""
+        with self._lock:
+            value = self._value
+            age = self._age()
+            if value is not None and age < self.ttl_seconds:
+                self.hits += 1
+                if age >= self.ttl_seconds * self.refresh_ahead and not self._refreshing and not self._backing_off():
+                    self._refreshing = True
+                    threading.Thread(target=self._background_refresh, args=(fetch,), name="caller-defaults-refresh", daemon=True).start()
+                return dict(value)
+            self.misses += 1
+        return self._fetch(fetch)
+
+    async def _afetch(self, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        fresh = self.peek()
+        if fresh is not None and self._age() < self.ttl_seconds * self.refresh_ahead:
+            return fresh
+        if self._backing_off():
+            return self._stale()
+        try:
+            value = await fetch() or {}
+        except Exception as e:
+            return self._fetch_failed(e)
+        self.store(value)
+        logger.info("Server models: chat=%s, transformation=%s", value.get("default_chat_model"), value.get("default_transformation_model"))
+        return dict(value)
+
+    def _shared_afetch(self, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> "asyncio.Task[Dict[str, Any]]":
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._async_fetch
+            if task is None or task.done() or task.get_loop() is not loop:
+                task = self._async_fetch = loop.create_task(self._afetch(fetch))
+            return task
+
+    async def _abackground_refresh(self, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        try:
+            await self._shared_afetch(fetch)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    async def aget(self, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """asyncio counterpart of get(); `fetch` is a coroutine function."""
+        with self._lock:
+            value = self._value
+            age = self._age()
+            if value is not None and age < self.ttl_seconds:
+                self.hits += 1
+                if age >= self.ttl_seconds * self.refresh_ahead and not self._refreshing and not self._backing_off():
+                    self._refreshing = True
+                    task = asyncio.get_running_loop().create_task(self._abackground_refresh(fetch))
+                    # keep a reference until it finishes so the task is not garbage collected
+                    self._async_refreshes.add(task)
+                    task.add_done_callback(self._async_refreshes.discard)
+                return dict(value)
+            self.misses += 1
+        # shielded: a cancelled caller must not cancel the fetch other callers are waiting on
+        return dict(await asyncio.shield(self._shared_afetch(fetch)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters in the shape of the other caches' stats()."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "entries": 0 if self._value is None else 1,
+            }
+
+
+_caches: Dict[Tuple[str, float], ModelDefaultsCache] = {}
+_caches_lock = threading.Lock()
+
+
+def defaults_cache_for(base_url: str, ttl_seconds: float = 300.0) -> ModelDefaultsCache:
+    """Process-wide ModelDefaultsCache for an API base URL, one per distinct `ttl_seconds`."""
+    key = (base_url.rstrip("/"), ttl_seconds)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = ModelDefaultsCache(ttl_seconds=ttl_seconds)
+        return cache
@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional, List, Dict, Any, Union, Tuple, Deque
+
+from . import tracing
+from .manifest import Manifest
+from .verdict import parse_verdict
+
+logger = logging.getLogger("caller.evaluate")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+Questions = Union[List[str], Dict[str, str]]
+
+
+def question_ids(questions: Questions) -> Dict[str, str]:
+    """Map question id -> text. Lists get stable ids from the text, so reordering does not break resume."""
+    if isinstance(questions, dict):
+        return dict(questions)
+    return {hashlib.sha1(q.encode("utf-8")).hexdigest()[:12]: q for q in questions}
+
+
+def pair_key(source_id: str, question_id: str) -> str:
+    return f"{source_id}::{question_id}"
+
+
+class _Scheduler:
+    """Hands out pending (source, question) pairs, preferring the source with the fewest in flight.
+
+    With more sources than workers every source is worked on by one thread at a time, so its
+    pooled notebook is reused instead of a second one being created; with fewer sources
+    the extra workers double up on the least busy source.
+    """
+
+    def __init__(self, todo: List[Tuple[str, str]]):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Deque[str]] = {}
+        for source_id, qid in todo:
+            self._pending.setdefault(source_id, deque()).append(qid)
+        self._busy = {s: 0 for s in self._pending}
+
+    def take(self) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            candidates = [s for s, q in self._pending.items() if q]
+            if not candidates:
+                return None
+            source_id = min(candidates, key=lambda s: self._busy[s])
+            self._busy[source_id] += 1
+            return source_id, self._pending[source_id].popleft()
+
+    def done(self, source_id: str) -> None:
+        with self._lock:
+            self._busy[source_id] -= 1
+
+
+def _evaluate_one(qc, source_id: str, question_id: str, question: str, model_override: Optional[str]) -> Dict[str, Any]:
+    """Run one question against one source and return its result record (never raises)."""
+    result: Dict[str, Any] = {
+        "source_id": source_id,
+        "question_id": question_id,
+        "question": question,
+        "ok": False,
+        "verdict": None,
+        "answer": None,
+        "notebook_id": None,
+        "session_id": None,
+        "seconds": 0.0,
+        "timings": None,
+        "error": None,
+    }
+    start = time.perf_counter()
+    try:
+        # fresh session per cell even if the pool reuses sessions: answers must not see other questions
+        resp = qc.notebook_ask(source_id=source_id, message=question, model_override=model_override, new_session=True)
+        result.update(
+            ok=True,
+            verdict=parse_verdict(resp.get("ai_answer") or ""),
+            answer=resp.get("ai_answer"),
+            notebook_id=resp.get("notebook_id"),
+            session_id=resp.get("session_id"),
+            timings=resp.get("timings"),
+        )
+    except Exception as e:
+        logger.warning(f"Question {question_id} on {source_id} failed: {e}")
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def evaluate_matrix(
+    qc,
+    questions: Questions,
+    source_ids: List[str],
+    concurrency: int = 4,
+    results_path: Optional[str] = None,
+    model_override: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Ask every question against every source with up to `concurrency` pairs in flight.
+
+    `questions` is a list of question texts or a {question_id: text} dict. Each finished pair is
+    appended to the JSONL Manifest at `results_path` (keyed "<source_id>::<question_id>"), so an
+    interrupted run resumes where it stopped; failed pairs are retried on the next run. Without a
+    results_path nothing is written and every pair runs. Repeated source ids are asked once.
+
+    Returns:
+        {
+            "ok": bool (no failures),
+            "results": [per-pair dict: source_id, question_id, question, ok, verdict, answer,
+                        notebook_id, session_id, seconds, timings, error, skipped,
+                        manifest_error if the record could not be written],
+            "summary": {pairs, asked, skipped, failed, yes, no, undetermined, elapsed_s, pairs_per_s},
+        }
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    qids = question_ids(questions)
+    source_ids = list(dict.fromkeys(source_ids))
+    manifest = Manifest(results_path) if results_path else None
+    if manifest is not None:
+        manifest.compact()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    todo: List[Tuple[str, str]] = []
+    for source_id in source_ids:
+        for qid in qids:
+            key = pair_key(source_id, qid)
+            rec = manifest.get(key) if manifest is not None else None
+            if rec and rec.get("ok"):
+                results[key] = dict(rec, skipped=True)
+            else:
+                todo.append((source_id, qid))
+
+    pairs = len(source_ids) * len(qids)
+    logger.info(f"Evaluating {len(todo)} of {pairs} question x source pairs with concurrency {concurrency} ({pairs - len(todo)} already done)")
+    scheduler = _Scheduler(todo)
+    lock = threading.Lock()
+    finished = [0]
+
+    def worker() -> None:
+        while True:
+            pair = scheduler.take()
+            if pair is None:
+                return
+            source_id, qid = pair
+            try:
+                with tracing.span("evaluate_pair", source_id=source_id, question_id=qid) as span:
+                    res = _evaluate_one(qc, source_id, qid, qids[qid], model_override)
+                    span.set_attribute("caller.verdict", res["verdict"])
+                    if not res["ok"]:
+                        span.set_status("ERROR", res["error"])
+            finally:
+                scheduler.done(source_id)
+            key = pair_key(source_id, qid)
+            if manifest is not None:
+                try:
+                    manifest.put(key, res)
+                except Exception as e:
+                    # keep the answer; the pair is simply asked again on a rerun
+                    logger.warning(f"Could not record {key} in {results_path}: {e}")
+                    res["manifest_error"] = str(e)
+            with lock:
+                results[key] = dict(res, skipped=False)
+                finished[0] += 1
+                n = finished[0]
+            if n % 10 == 0 or n == len(todo):
+                logger.info(f"Evaluate progress: {n}/{len(todo)}")
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=tracing.wrap(worker), name=f"caller-evaluate-{i}", daemon=True) for i in range(min(concurrency, len(todo)))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ordered = [results[pair_key(s, q)] for s in source_ids for q in qids if pair_key(s, q) in results]
+    verdicts = [r.get("verdict") for r in ordered if r.get("ok")]
+    failed = sum(1 for r in ordered if not r.get("ok"))
+    summary = {
+        "pairs": pairs,
+        "asked": len(todo),
+        "skipped": pairs - len(todo),
+        "failed": failed,
+        "yes": verdicts.count("YES"),
+        "no": verdicts.count("NO"),
+        "undetermined": verdicts.count(None),
+        "elapsed_s": round(elapsed, 3),
+        "pairs_per_s": round(len(todo) / elapsed, 3) if elapsed > 0 else 0.0,
+    }
+    logger.info(f"Evaluate finished: {summary}")
+    return {"ok": failed == 0, "results": ordered, "summary": summary}
@@ -0,0 +1,843 @@
+"""In-process stand-in for the Open Notebook API, for benchmarks, CI and offline development.
+
+FakeBackend serves the endpoints the caller clients use from a stdlib ThreadingHTTPServer on
+a local port, with all state kept in memory:
+
+    GET/POST        /sources                       list (limit/offset/sort_by/sort_order) / create
+                                                   (multipart upload or JSON file_path reference)
+    GET/DELETE      /sources/{id}
+    GET             /sources/{id}/status           "running" for `processing_seconds`, then "completed"
+    POST/GET/PUT    /sources/uploads[/{id}[/complete]]   the chunked upload contract (caller.chunked_upload)
+    POST            /search                        deterministic hits over the stored sources
+    POST            /search/ask/simple
+    GET             /models/defaults
+    POST/DELETE     /notebooks[/{id}],  POST /notebooks/{id}/sources/{source_id}
+    POST            /chat/context
+    POST/DELETE     /chat/sessions[/{id}],  POST /chat/execute
+    POST            /sources/{id}/chat/sessions
+    POST            /sources/{id}/chat/sessions/{session_id}/messages   SSE answer stream
+    POST/GET        /commands/jobs[/{id}]
+
+FakeBackendConfig sets per-request latency (with jitter and per-endpoint extras), an injected
+error rate, a bandwidth cap on request and response bodies, a concurrency limit, and the pacing
+(and optional gzip encoding) of streamed answer tokens. Typical use:
+
+    with FakeBackend(FakeBackendConfig(latency_ms=20)) as backend:
+        backend.add_sources(1000)
+        app = Application(CallerConfig(api_base_url=backend.url))
+
+or from a shell, serving the default client URL:
+
+    python -m caller.fake_backend --port 5055 --latency-ms 20 --sources 1000
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List, Dict, Any, Callable, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger("caller.fake_backend")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+DEFAULT_ANSWER = "YES - the site plan shows two soakage pits draining the rear of the lot."
+
+
+@dataclass
+class FakeBackendConfig:
+    """Behaviour knobs of a FakeBackend (all defaults: as fast as possible, no errors)."""
+
+    # fixed delay added to every request, plus up to +/- jitter
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    # extra delay per endpoint template, e.g. {"/chat/context": 200, "/chat/execute": 500}
+    endpoint_latency_ms: Dict[str, float] = field(default_factory=dict)
+    # fraction of requests answered with `error_status` (optionally only these endpoint templates)
+    error_rate: float = 0.0
+    error_status: int = 503
+    error_endpoints: Optional[List[str]] = None
+    # cap on request/response body throughput per connection (None: unlimited)
+    bandwidth_bytes_per_s: Optional[float] = None
+    # requests handled at once; others queue (None: one thread per connection, unlimited)
+    max_concurrent_requests: Optional[int] = None
+    # answer streaming: delay before the first token and token rate after it (None: no pacing)
+    sse_first_token_ms: float = 0.0
+    sse_tokens_per_s: Optional[float] = None
+    sse_event_ids: bool = True
+    # drop a stream's connection after this many events (reconnects with Last-Event-ID are served in full)
+    sse_drop_after: Optional[int] = None
+    # send answer streams with Content-Encoding: gzip (flushed per event, as a compressing proxy would)
+    sse_gzip: bool = False
+    answer: str = DEFAULT_ANSWER
+    # seconds a new source reports "running" before "completed"
+    processing_seconds: float = 0.0
+    # serve the chunked upload endpoints (False: 404, clients fall back to POST /sources)
+    chunked_uploads: bool = True
+    upload_chunk_size: Optional[int] = None
+    # size of the text returned by /chat/context per source
+    context_chars: int = 2000
+    seed: Optional[int] = None
+
+
+class _Throttle:
+    """Sleeps so that bytes accounted on one connection do not exceed `rate` bytes/s."""
+
+    def __init__(self, rate: Optional[float]):
+        self.rate = rate
+        self.start = time.perf_counter()
+        self.bytes = 0
+
+    def account(self, n: int) -> None:
+        if not self.rate:
+            return
+        self.bytes += n
+        ahead = self.bytes / self.rate - (time.perf_counter() - self.start)
+        if ahead > 0:
+            time.sleep(ahead)
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _tokens(text: str) -> List[str]:
+    """Split an answer into stream tokens that concatenate back to the text."""
+    return re.findall(r"\S+\s*|\s+", text) or [text]
+
+
+def _parse_multipart(body: bytes, content_type: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """(form fields, {"filename", "size"} of the file part) of a multipart/form-data body."""
+    m = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not m:
+        raise _HTTPError(400, "multipart body without boundary")
+    delimiter = b"--" + m.group(1).encode("latin-1")
+    fields: Dict[str, str] = {}
+    upload: Dict[str, Any] = {"filename": None, "size": 0}
+    for part in body.split(delimiter)[1:]:
+        if part.startswith(b"--"):
+            break
+        head, sep, content = part.partition(b"\r\n\r\n")
+        if not sep:
+            continue
+        if content.endswith(b"\r\n"):
+            content = content[:-2]
+        disposition = head.decode("utf-8", errors="replace")
+        name = re.search(r'name="([^"]*)"', disposition)
+        filename = re.search(r'filename="([^"]*)"', disposition)
+        if filename:
+            upload = {"filename": filename.group(1), "size": len(content)}
+        elif name:
+            fields[name.group(1)] = content.decode("utf-8", errors="replace")
+    return fields, upload
+
+
+def _flag(value: Any, default: bool = True) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() not in ("false", "0", "no", "")
+    return bool(value)
+
+
+class FakeBackend:
+    """A local Open Notebook stand-in; see the module docstring for the endpoints served.
+
+    start()/stop() (or use as a context manager) run the server on a background thread; `url` is
+    the API base to put in CallerConfig.api_base_url. request_counts() reports requests served per
+    "METHOD /template" (e.g. "POST /chat/execute"). State is shared by all connections and guarded
+    by one lock.
+    """
+
+    def __init__(self, config: Optional[FakeBackendConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeBackendConfig()
+        self.host = host
+        self.port = port
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._slots = threading.BoundedSemaphore(self.config.max_concurrent_requests) if self.config.max_concurrent_requests else None
+        self._clock = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self._counts: Counter = Counter()
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.notebooks: Dict[str, Dict[str, Any]] = {}
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.uploads: Dict[str, Dict[str, Any]] = {}
+        self.commands: Dict[str, Dict[str, Any]] = {}
+        self.bytes_received = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._routes: List[Tuple[str, "re.Pattern[str]", str, Callable]] = []
+        for method, template, fn in (
+            ("GET", "/sources", self._list_sources),
+            ("POST", "/sources", self._create_source),
+            ("POST", "/sources/uploads", self._start_upload),
+            ("GET", "/sources/uploads/{id}", self._upload_status),
+            ("PUT", "/sources/uploads/{id}", self._upload_chunk),
+            ("POST", "/sources/uploads/{id}/complete", self._complete_upload),
+            ("GET", "/sources/{id}", self._get_source),
+            ("DELETE", "/sources/{id}", self._delete_source),
+            ("GET", "/sources/{id}/status", self._source_status),
+            ("POST", "/sources/{id}/chat/sessions", self._create_source_session),
+            ("POST", "/sources/{id}/chat/sessions/{session_id}/messages", self._stream_message),
+            ("POST", "/search", self._search),
+            ("POST", "/search/ask/simple", self._ask_simple),
+            ("GET", "/models/defaults", self._model_defaults),
+            ("POST", "/notebooks", self._create_notebook),
+            ("DELETE", "/notebooks/{id}", self._delete_notebook),
+            ("POST", "/notebooks/{id}/sources/{source_id}", self._link_source),
+            ("POST", "/chat/context", self._build_context),
+            ("POST", "/chat/sessions", self._create_session),
+            ("DELETE", "/chat/sessions/{id}", self._delete_session),
+            ("POST", "/chat/execute", self._execute),
+            ("POST", "/commands/jobs", self._submit_command),
+            ("GET", "/commands/jobs/{id}", self._command_status),
+        ):
+            pattern = re.compile("^" + re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(template)) + "$")
+            self._routes.append((method, pattern, template, fn))
+
+    # ---- lifecycle ----
+
+    @property
+    def url(self) -> str:
+        """API base URL (for CallerConfig.api_base_url)."""
+        return f"http://{self.host}:{self.port}/api"
+
+    def start(self) -> "FakeBackend":
+        if self._server is None:
+            backend = self
+
+            class Handler(_Handler):
+                pass
+
+            Handler.backend = backend
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            self._thread = threading.Thread(target=self._server.serve_forever, name="caller-fake-backend", daemon=True)
+            self._thread.start()
+            logger.info("Fake backend listening on %s", self.url)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self) -> "FakeBackend":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ---- state helpers ----
+
+    def request_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def _now(self) -> str:
+        # strictly increasing timestamps so sort_by=updated is a total order
+        # (caller must hold the lock)
+        self._clock = max(self._clock + timedelta(microseconds=1), datetime.now(timezone.utc))
+        return self._clock.isoformat()
+
+    def _new_id(self, table: str) -> str:
+        return f"{table}:{uuid.uuid4().hex[:20]}"
+
+    def _new_source(self, title: str, file_path: Optional[str], async_processing: bool, size: int = 0) -> Dict[str, Any]:
+        # caller must hold the lock
+        now = self._now()
+        source_id = self._new_id("source")
+        running = async_processing and self.config.processing_seconds > 0
+        command_id = self._new_id("command") if async_processing else None
+        record = {
+            "id": source_id,
+            "title": title,
+            "asset": {"file_path": file_path or f"/app/data/uploads/{title}", "url": None},
+            "embedded": not running,
+            "embedded_chunks": 0 if running else max(1, size // 4096),
+            "insights_count": 0,
+            "created": now,
+            "updated": now,
+            "file_available": True,
+            "command_id": command_id,
+            "status": "running" if running else "completed",
+            "_ready_at": time.monotonic() + (self.config.processing_seconds if running else 0.0),
+        }
+        self.sources[source_id] = record
+        if command_id:
+            self.commands[command_id] = {"job_id": command_id, "command": "process_source", "source_id": source_id, "_ready_at": record["_ready_at"]}
+        return record
+
+    def add_sources(self, count: int, prefix: str = "document") -> List[str]:
+        """Seed `count` processed sources titled "<prefix>-000000.pdf", ...; returns their ids."""
+        ids = []
+        with self._lock:
+            start = len(self.sources)
+            for i in range(start, start + count):
+                ids.append(self._new_source(f"{prefix}-{i:06d}.pdf", None, async_processing=False)["id"])
+        return ids
+
+    def _public(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        if record.get("_ready_at") is not None and record["status"] == "running" and time.monotonic() >= record["_ready_at"]:
+            record.update(status="completed", embedded=True, embedded_chunks=max(1, record["embedded_chunks"]), updated=self._now())
+        return {k: v for k, v in record.items() if not k.startswith("_")}
+
+    def _source(self, source_id: str) -> Dict[str, Any]:
+        record = self.sources.get(source_id)
+        if record is None:
+            raise _HTTPError(404, f"Source {source_id} not found")
+        return record
+
+    # ---- request plumbing (called from handler threads) ----
+
+    def _route(self, method: str, path: str) -> Tuple[Optional[Callable], str, Dict[str, str]]:
+        if path.startswith("/api/"):
+            path = path[4:]
+        path = path.rstrip("/") or "/"
+        allowed = False
+        for m, pattern, template, fn in self._routes:
+            match = pattern.match(path)
+            if match:
+                if m == method:
+                    return fn, template, match.groupdict()
+                allowed = True
+        if allowed:
+            raise _HTTPError(405, "Method Not Allowed")
+        raise _HTTPError(404, "Not Found")
+
+    def _delay(self, template: str) -> float:
+        cfg = self.config
+        delay = cfg.latency_ms + cfg.endpoint_latency_ms.get(template, 0.0)
+        if cfg.latency_jitter_ms:
+            with self._lock:
+                delay += self._rng.uniform(-cfg.latency_jitter_ms, cfg.latency_jitter_ms)
+        return max(0.0, delay) / 1000.0
+
+    def _inject_error(self, template: str) -> bool:
+        cfg = self.config
+        if not cfg.error_rate or (cfg.error_endpoints is not None and template not in cfg.error_endpoints):
+            return False
+        with self._lock:
+            return self._rng.random() < cfg.error_rate
+
+    # ---- sources and uploads ----
+
+    def _list_sources(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        query = req.query
+        sort_by = query.get("sort_by", "created")
+        if sort_by not in ("created", "updated", "title"):
+            raise _HTTPError(400, f"Invalid sort_by {sort_by}")
+        notebook_id = query.get("notebook_id")
+        with self._lock:
+            records = [self._public(r) for r in self.sources.values()]
+            if notebook_id:
+                linked = set(self.notebooks.get(notebook_id, {}).get("sources", ()))
+                records = [r for r in records if r["id"] in linked]
+        descending = query.get("sort_order", "desc").lower() == "desc"
+        if sort_by != "created" or not descending:
+            records.sort(key=lambda r: r.get(sort_by) or "", reverse=descending)
+        else:
+            records.reverse()  # insertion order is creation order
+        offset = int(query.get("offset", 0))
+        limit = query.get("limit")
+        return records[offset:offset + int(limit)] if limit is not None else records[offset:]
+
+    def _create_source(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        content_type = req.headers.get("Content-Type", "")
+        body = req.read_body()
+        if content_type.startswith("multipart/form-data"):
+            fields, upload = _parse_multipart(body, content_type)
+            if upload["filename"] is None:
+                raise _HTTPError(400, "multipart upload without a file part")
+            title = fields.get("title") or upload["filename"]
+            file_path, size = None, upload["size"]
+            async_processing = _flag(fields.get("async_processing"))
+        else:
+            payload = json.loads(body or b"{}")
+            if not payload.get("file_path") and not payload.get("url") and not payload.get("content"):
+                raise _HTTPError(400, "one of file_path, url or content is required")
+            title = payload.get("title") or payload.get("file_path") or "untitled"
+            file_path, size = payload.get("file_path"), len(payload.get("content") or "")
+            async_processing = _flag(payload.get("async_processing"))
+            fields = payload
+        with self._lock:
+            record = self._new_source(title, file_path, async_processing, size)
+            self._link_notebooks(record["id"], fields.get("notebooks"))
+            return self._public(record)
+
+    def _link_notebooks(self, source_id: str, notebooks: Any) -> None:
+        # caller must hold the lock
+        if isinstance(notebooks, str):
+            notebooks = json.loads(notebooks)
+        for notebook_id in notebooks or ():
+            if notebook_id in self.notebooks:
+                self.notebooks[notebook_id]["sources"].add(source_id)
+
+    def _get_source(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        with self._lock:
+            return self._public(self._source(params["id"]))
+
+    def _delete_source(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        with self._lock:
+            self._source(params["id"])
+            del self.sources[params["id"]]
+        return {"message": "Source deleted successfully"}
+
+    def _source_status(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        with self._lock:
+            record = self._public(self._source(params["id"]))
+        done = record["status"] == "completed"
+        return {
+            "status": record["status"],
+            "message": "Source processed successfully" if done else "Source is being processed",
+            "processing_info": {"command_id": record["command_id"], "embedded_chunks": record["embedded_chunks"]},
+        }
+
+    def _start_upload(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        if not self.config.chunked_uploads:
+            raise _HTTPError(404, "Not Found")
+        payload = req.read_json()
+        upload_id = uuid.uuid4().hex
+        upload = {"upload_id": upload_id, "filename": payload.get("filename"), "size": int(payload.get("size", 0)), "offset": 0}
+        with self._lock:
+            self.uploads[upload_id] = upload
+        resp = {"upload_id": upload_id, "offset": 0}
+        if self.config.upload_chunk_size:
+            resp["chunk_size"] = self.config.upload_chunk_size
+        return 201, resp
+
+    def _upload(self, upload_id: str) -> Dict[str, Any]:
+        if not self.config.chunked_uploads:
+            raise _HTTPError(404, "Not Found")
+        upload = self.uploads.get(upload_id)
+        if upload is None:
+            raise _HTTPError(404, f"Upload {upload_id} not found")
+        return upload
+
+    def _upload_status(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        with self._lock:
+            upload = self._upload(params["id"])
+            return {"upload_id": upload["upload_id"], "offset": upload["offset"], "size": upload["size"]}
+
+    def _upload_chunk(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        m = re.match(r"bytes (\d+)-(\d+)/(\d+)", req.headers.get("Content-Range", ""))
+        if not m:
+            raise _HTTPError(400, "Content-Range header required")
+        start, end = int(m.group(1)), int(m.group(2))
+        body = req.read_body()
+        if len(body) != end - start + 1:
+            raise _HTTPError(400, f"chunk is {len(body)} bytes, Content-Range says {end - start + 1}")
+        with self._lock:
+            upload = self._upload(params["id"])
+            if start != upload["offset"]:
+                return 409, {"offset": upload["offset"]}
+            upload["offset"] = end + 1
+            return {"offset": upload["offset"]}
+
+    def _complete_upload(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        fields = req.read_json()
+        with self._lock:
+            upload = self._upload(params["id"])
+            if upload["offset"] != upload["size"]:
+                return 409, {"offset": upload["offset"]}
+            del self.uploads[params["id"]]
+            record = self._new_source(fields.get("title") or upload["filename"], None, _flag(fields.get("async_processing")), upload["size"])
+            self._link_notebooks(record["id"], fields.get("notebooks"))
+            return self._public(record)
+
+    # ---- search and ask ----
+
+    def _search(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        payload = req.read_json()
+        query = payload.get("query") or ""
+        limit = int(payload.get("limit", 100))
+        minimum_score = float(payload.get("minimum_score") or 0.0)
+        with self._lock:
+            ids = list(self.sources) or [f"source:fake{i}" for i in range(5)]
+        # deterministic for a query: start at a query-dependent source, scores fall off linearly
+        first = sum(query.encode("utf-8")) % len(ids)
+        results = []
+        for rank in range(limit):
+            score = round(1.0 - rank / (limit + 1), 6)
+            if score < minimum_score:
+                break
+            parent_id = ids[(first + rank) % len(ids)]
+            results.append({
+                "id": f"source_embedding:{parent_id.split(':', 1)[-1]}_{rank}",
+                "parent_id": parent_id,
+                "title": f"match {rank} for {query[:40]}",
+                "similarity": score,
+                "relevance": score,
+                "matches": [query],
+            })
+        return {"results": results, "total_count": len(results), "search_type": payload.get("type", "text")}
+
+    def _ask_simple(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        payload = req.read_json()
+        return {"answer": self.config.answer, "question": payload.get("question")}
+
+    def _model_defaults(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        return {
+            "default_chat_model": "model:fake-chat",
+            "default_transformation_model": "model:fake-transformation",
+            "large_context_model": "model:fake-chat",
+            "default_embedding_model": "model:fake-embedding",
+        }
+
+    def _stream_message(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        req.read_json()
+        with self._lock:
+            self._source(params["id"])
+            if params["session_id"] not in self.sessions:
+                raise _HTTPError(404, f"Session {params['session_id']} not found")
+        last_id = req.headers.get("Last-Event-ID")
+        resume = int(last_id) if last_id and last_id.isdigit() else 0
+        cfg = self.config
+        events = [{"type": "ai_message", "content": tok} for tok in _tokens(cfg.answer)]
+        events.append({"type": "complete"})
+        req.start_stream("text/event-stream", gzip=cfg.sse_gzip)
+        interval = 1.0 / cfg.sse_tokens_per_s if cfg.sse_tokens_per_s else 0.0
+        if cfg.sse_first_token_ms and not resume:
+            time.sleep(cfg.sse_first_token_ms / 1000.0)
+        sent = 0
+        for n, ev in enumerate(events, 1):
+            if n <= resume:
+                continue
+            if sent and interval:
+                time.sleep(interval)
+            frame = f"id: {n}\n" if cfg.sse_event_ids else ""
+            req.write_chunk(f"{frame}data: {json.dumps(ev)}\n\n".encode("utf-8"))
+            sent += 1
+            if cfg.sse_drop_after is not None and not last_id and sent >= cfg.sse_drop_after and n < len(events):
+                req.drop_connection()
+                return None
+        req.end_stream()
+        return None
+
+    # ---- notebooks and chat ----
+
+    def _create_notebook(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        payload = req.read_json()
+        with self._lock:
+            notebook = {"id": self._new_id("notebook"), "name": payload.get("name"), "description": payload.get("description", ""), "created": self._now(), "sources": set()}
+            self.notebooks[notebook["id"]] = notebook
+        return {k: v for k, v in notebook.items() if k != "sources"}
+
+    def _delete_notebook(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        with self._lock:
+            if self.notebooks.pop(params["id"], None) is None:
+                raise _HTTPError(404, f"Notebook {params['id']} not found")
+        return {"message": "Notebook deleted successfully"}
+
+    def _link_source(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        with self._lock:
+            notebook = self.notebooks.get(params["id"])
+            if notebook is None:
+                raise _HTTPError(404, f"Notebook {params['id']} not found")
+            self._source(params["source_id"])
+            notebook["sources"].add(params["source_id"])
+        return {"message": "Source linked to notebook successfully"}
+
+    def _build_context(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        payload = req.read_json()
+        context_config = payload.get("context_config") or {}
+        with self._lock:
+            notebook = self.notebooks.get(payload.get("notebook_id"))
+            if notebook is None:
+                raise _HTTPError(404, f"Notebook {payload.get('notebook_id')} not found")
+            wanted = context_config.get("sources") or {s: "full content" for s in notebook["sources"]}
+            sources = [self._public(self._source(s)) for s in wanted if s in notebook["sources"]]
+        filler = (self.config.answer + " ") * (self.config.context_chars // (len(self.config.answer) + 1) + 1)
+        context = {"sources": [{"id": s["id"], "title": s["title"], "full_text": filler[:self.config.context_chars]} for s in sources], "notes": []}
+        char_count = sum(len(s["full_text"]) for s in context["sources"])
+        return {"context": context, "token_count": char_count // 4, "char_count": char_count}
+
+    def _new_session(self, title: Optional[str], notebook_id: Optional[str] = None, source_id: Optional[str] = None) -> Dict[str, Any]:
+        # caller must hold the lock
+        now = self._now()
+        session = {"id": self._new_id("chat_session"), "title": title, "notebook_id": notebook_id, "source_id": source_id, "created": now, "updated": now, "message_count": 0}
+        self.sessions[session["id"]] = session
+        return session
+
+    def _create_session(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        payload = req.read_json()
+        with self._lock:
+            if payload.get("notebook_id") not in self.notebooks:
+                raise _HTTPError(404, f"Notebook {payload.get('notebook_id')} not found")
+            return dict(self._new_session(payload.get("title"), notebook_id=payload["notebook_id"]))
+
+    def _create_source_session(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        payload = req.read_json()
+        with self._lock:
+            self._source(params["id"])
+            return dict(self._new_session(payload.get("title"), source_id=params["id"]))
+
+    def _delete_session(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        with self._lock:
+            if self.sessions.pop(params["id"], None) is None:
+                raise _HTTPError(404, f"Session {params['id']} not found")
+        return {"message": "Session deleted successfully"}
+
+    def _execute(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        payload = req.read_json()
+        with self._lock:
+            session = self.sessions.get(payload.get("session_id"))
+            if session is None:
+                raise _HTTPError(404, f"Session {payload.get('session_id')} not found")
+            session["message_count"] += 2
+            session_id = session["id"]
+        messages = [
+            {"id": uuid.uuid4().hex, "type": "human", "content": payload.get("message", "")},
+            {"id": uuid.uuid4().hex, "type": "ai", "content": self.config.answer},
+        ]
+        return {"session_id": session_id, "messages": messages}
+
+    # ---- commands ----
+
+    def _submit_command(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        payload = req.read_json()
+        if not payload.get("command"):
+            raise _HTTPError(400, "command is required")
+        with self._lock:
+            job_id = self._new_id("command")
+            self.commands[job_id] = {"job_id": job_id, "command": payload["command"], "input": payload.get("input"), "_ready_at": time.monotonic() + self.config.processing_seconds}
+        return {"job_id": job_id, "status": "submitted", "message": f"Command '{payload['command']}' submitted successfully"}
+
+    def _command_status(self, req: "_Handler", params: Dict[str, str]) -> Any:
+        with self._lock:
+            job = self.commands.get(params["id"])
+            if job is None:
+                raise _HTTPError(404, f"Job {params['id']} not found")
+        status = "completed" if time.monotonic() >= job["_ready_at"] else "running"
+        return {"job_id": job["job_id"], "status": status, "result": None, "error_message": None}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler bound to one FakeBackend (set as a class attribute by FakeBackend.start)."""
+
+    backend: FakeBackend
+    protocol_version = "HTTP/1.1"
+    _gzip = None
+
+    def setup(self) -> None:
+        super().setup()
+        # headers and body go out in separate writes; without this Nagle + delayed ACK add ~40ms
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PUT(self) -> None:
+        self._handle("PUT")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    # ---- body I/O (throttled to the configured bandwidth) ----
+
+    def read_body(self) -> bytes:
+        if self._body is not None:
+            return self._body
+        out = bytearray()
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                self._read_into(out, size)
+                self.rfile.readline()
+        else:
+            self._read_into(out, int(self.headers.get("Content-Length") or 0))
+        self._body = bytes(out)
+        with self.backend._lock:
+            self.backend.bytes_received += len(self._body)
+        return self._body
+
+    def _read_into(self, out: bytearray, size: int) -> None:
+        while size > 0:
+            data = self.rfile.read(min(size, 64 << 10))
+            if not data:
+                raise ConnectionError("client closed the connection mid-body")
+            out += data
+            size -= len(data)
+            self._throttle.account(len(data))
+
+    def read_json(self) -> Dict[str, Any]:
+        body = self.read_body()
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            raise _HTTPError(422, "request body is not valid JSON")
+        return payload if isinstance(payload, dict) else {}
+
+    def send_json(self, status: int, data: Any) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        for i in range(0, len(body), 64 << 10):
+            self.wfile.write(body[i:i + (64 << 10)])
+            self._throttle.account(min(64 << 10, len(body) - i))
+
+    def start_stream(self, content_type: str, gzip: bool = False) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-cache")
+        self._gzip = zlib.compressobj(wbits=31) if gzip else None
+        if gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.wfile.flush()
+
+    def write_chunk(self, data: bytes) -> None:
+        if self._gzip is not None:
+            data = self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+        self._throttle.account(len(data))
+
+    def end_stream(self) -> None:
+        if self._gzip is not None:
+            tail = self._gzip.flush()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(tail), tail))
+            self._gzip = None
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def drop_connection(self) -> None:
+        """Abort a streamed response without the terminating chunk (simulates a network drop)."""
+        self.wfile.flush()
+        self.close_connection = True
+
+    # ---- dispatch ----
+
+    def _handle(self, method: str) -> None:
+        backend = self.backend
+        self._body: Optional[bytes] = None
+        self._throttle = _Throttle(backend.config.bandwidth_bytes_per_s)
+        parts = urlsplit(self.path)
+        self.query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        slots = backend._slots
+        if slots is not None:
+            slots.acquire()
+        try:
+            try:
+                fn, template, params = backend._route(method, parts.path)
+                with backend._lock:
+                    backend._counts[f"{method} {template}"] += 1
+                delay = backend._delay(template)
+                if delay:
+                    time.sleep(delay)
+                if backend._inject_error(template):
+                    self.read_body()
+                    raise _HTTPError(backend.config.error_status, "injected error")
+                result = fn(self, params)
+            except _HTTPError as e:
+                if self._body is None and method in ("POST", "PUT"):
+                    self.read_body()  # keep the connection usable
+                self.send_json(e.status, {"detail": e.detail})
+                return
+            except (ConnectionError, BrokenPipeError):
+                self.close_connection = True
+                return
+            except Exception as e:
+                logger.exception("Fake backend error on %s %s", method, self.path)
+                self.send_json(500, {"detail": str(e)})
+                return
+            if result is None:
+                return  # streamed
+            status, data = result if isinstance(result, tuple) else (200, result)
+            self.send_json(status, data)
+        finally:
+            if slots is not None:
+                slots.release()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m caller.fake_backend", description="Serve a local stand-in for the Open Notebook API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--endpoint-latency", action="append", default=[], metavar="TEMPLATE=MS", help='extra latency for one endpoint, e.g. "/chat/execute=500" (repeatable)')
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--bandwidth-mbps", type=float, default=None, help="body throughput cap in MB/s per connection")
+    parser.add_argument("--max-concurrent", type=int, default=None)
+    parser.add_argument("--sse-tokens-per-s", type=float, default=None)
+    parser.add_argument("--sse-first-token-ms", type=float, default=0.0)
+    parser.add_argument("--sse-gzip", action="store_true", help="gzip-encode answer streams")
+    parser.add_argument("--processing-seconds", type=float, default=0.0)
+    parser.add_argument("--no-chunked-uploads", action="store_true")
+    parser.add_argument("--sources", type=int, default=0, help="seed this many processed sources")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    endpoint_latency = {}
+    for item in args.endpoint_latency:
+        template, _, ms = item.rpartition("=")
+        endpoint_latency[template] = float(ms)
+    config = FakeBackendConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        endpoint_latency_ms=endpoint_latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        bandwidth_bytes_per_s=args.bandwidth_mbps * 1e6 if args.bandwidth_mbps else None,
+        max_concurrent_requests=args.max_concurrent,
+        sse_tokens_per_s=args.sse_tokens_per_s,
+        sse_first_token_ms=args.sse_first_token_ms,
+        sse_gzip=args.sse_gzip,
+        processing_seconds=args.processing_seconds,
+        chunked_uploads=not args.no_chunked_uploads,
+        seed=args.seed,
+    )
+    backend = FakeBackend(config, host=args.host, port=args.port)
+    if args.sources:
+        backend.add_sources(args.sources)
+    backend.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import logging
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+from . import tracing
+from .manifest import Manifest
+
+logger = logging.getLogger("caller.ingest")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+DEFAULT_PATTERN = "**/*.[pP][dD][fF]"
+DEFAULT_MANIFEST_NAME = ".caller-ingest.jsonl"
+# manifest statuses that mean "nothing left to do for this file"
+DONE_STATUSES = ("uploaded", "exists")
+
+
+def _is_done(rec: Optional[Dict[str, Any]], size: int, mtime: float) -> bool:
+    """True if the manifest says this exact file (same size/mtime) was already ingested."""
+    if not rec or rec.get("status") not in DONE_STATUSES:
+        return False
+    return rec.get("size") == size and rec.get("mtime") == mtime
+
+
+def _ingest_one(uploader, path: Path, notebooks: Optional[List[str]], embed: bool, async_processing: bool) -> Dict[str, Any]:
+    """Upload a single file and return its per-file result dict (never raises)."""
+    result: Dict[str, Any] = {
+        "path": str(path),
+        "ok": False,
+        "status": "failed",
+        "source_id": None,
+        "size": 0,
+        "mtime": None,
+        "seconds": 0.0,
+        "error": None,
+    }
+    start = time.perf_counter()
+    try:
+        # the file may have been removed or become unreadable since the directory was listed
+        stat = path.stat()
+        result.update(size=stat.st_size, mtime=stat.st_mtime)
+        resp = uploader.upload_file_and_process(str(path), notebooks=notebooks, embed=embed, async_processing=async_processing)
+        if resp.get("ok"):
+            sources = resp.get("sources") or []
+            result["ok"] = True
+            # upload_file_and_process returns raw=None when the file was already on the server
+            result["status"] = "uploaded" if resp.get("raw") is not None else "exists"
+            result["source_id"] = sources[0].get("id") if sources else None
+        else:
+            result["error"] = resp.get("text") or resp.get("error") or f"HTTP {resp.get('status_code')}"
+    except Exception as e:
+        logger.warning(f"Ingest of {path} failed: {e}")
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def ingest_tree(
+    uploader,
+    root: str,
+    pattern: str = DEFAULT_PATTERN,
+    workers: int = 4,
+    manifest_path: Optional[str] = None,
+    notebooks: Optional[List[str]] = None,
+    embed: bool = True,
+    async_processing: bool = True,
+    poller=None,
+) -> Dict[str, Any]:
+    """Upload every file under `root` matching `pattern` with up to `workers` concurrent uploads.
+
+    Progress is recorded in a JSONL Manifest (default `<root>/.caller-ingest.jsonl`); a rerun skips
+    files whose last record is uploaded/exists with unchanged size and mtime, and retries failures.
+    If a StatusPoller is given, uploaded sources are tracked as they complete and the call waits for
+    all of them; each result then carries "processing_status" (completed/failed/timeout/cancelled/error).
+
+    Returns:
+        {
+            "ok": bool (no failures),
+            "results": [per-file dict: path, ok, status, source_id, size, seconds, error],
+            "summary": {files, uploaded, exists, failed, skipped, bytes, elapsed_s, files_per_s, mb_per_s},
+        }
+    """
+    root_path = Path(root)
+    if not root_path.is_dir():
+        raise ValueError(f"Not a directory: {root}")
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+
+    manifest = Manifest(manifest_path or str(root_path / DEFAULT_MANIFEST_NAME))
+    manifest.compact()
+
+    files = sorted(p for p in root_path.glob(pattern) if p.is_file() and p.name != DEFAULT_MANIFEST_NAME)
+    todo: List[Path] = []
+    results: List[Dict[str, Any]] = []
+    for p in files:
+        try:
+            stat = p.stat()
+        except OSError:
+            # removed or renamed since glob(): _ingest_one records it as failed
+            todo.append(p)
+            continue
+        rec = manifest.get(str(p.resolve()))
+        if _is_done(rec, stat.st_size, stat.st_mtime):
+            results.append({
+                "path": str(p),
+                "ok": True,
+                "status": "skipped",
+                "source_id": rec.get("source_id"),
+                "size": stat.st_size,
+                "seconds": 0.0,
+                "error": None,
+            })
+        else:
+            todo.append(p)
+
+    logger.info(f"Ingesting {len(todo)} of {len(files)} files under {root} with {workers} workers ({len(files) - len(todo)} already done)")
+    start = time.perf_counter()
+    status_futures: Dict[str, Any] = {}
+    # one span per file from submission until its upload (or, with a poller, its processing) finished
+    spans: Dict[str, Any] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="caller-ingest") as pool:
+        futures = {}
+        for p in todo:
+            spans[str(p)] = span = tracing.start_span("ingest_file", attributes={"path": str(p)})
+            with tracing.use_span(span):
+                futures[pool.submit(tracing.wrap(_ingest_one), uploader, p, notebooks, embed, async_processing)] = p
+        for n, fut in enumerate(as_completed(futures), 1):
+            res = fut.result()
+            manifest.put(str(futures[fut].resolve()), res)
+            results.append(res)
+            span = spans.pop(res["path"])
+            span.set_attributes({"caller.status": res["status"], "caller.source_id": res["source_id"]})
+            if res["error"] is not None:
+                span.set_status("ERROR", res["error"])
+            if poller is not None and res["status"] == "uploaded" and res["source_id"]:
+                with tracing.use_span(span):
+                    status_futures[res["path"]] = poller.track(res["source_id"], callback=lambda f, span=span: span.end())
+            else:
+                span.end()
+            if n % 50 == 0 or n == len(todo):
+                logger.info(f"Ingest progress: {n}/{len(todo)}")
+    for r in results:
+        fut = status_futures.get(r["path"])
+        if fut is None:
+            continue
+        try:
+            r["processing_status"] = fut.result().get("status")
+        except TimeoutError:
+            r["processing_status"] = "timeout"
+        except CancelledError:
+            # the poller was closed before the source finished processing
+            r["processing_status"] = "cancelled"
+        except Exception as e:
+            logger.warning(f"Status polling for {r['path']} failed: {e}")
+            r["processing_status"] = "error"
+    elapsed = time.perf_counter() - start
+
+    counts = {s: 0 for s in ("uploaded", "exists", "failed", "skipped")}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    uploaded_bytes = sum(r["size"] for r in results if r["status"] == "uploaded")
+    processed = len(todo)
+    summary = {
+        "files": len(files),
+        **counts,
+        "bytes": uploaded_bytes,
+        "elapsed_s": round(elapsed, 3),
+        "files_per_s": round(processed / elapsed, 3) if elapsed > 0 else 0.0,
+        "mb_per_s": round(uploaded_bytes / 1e6 / elapsed, 3) if elapsed > 0 else 0.0,
+    }
+    logger.info(f"Ingest finished: {summary}")
+    results.sort(key=lambda r: r["path"])
+    return {"ok": counts["failed"] == 0, "results": results, "summary": summary}
@@ -0,0 +1,379 @@
+"""Per-request timing for Transport and AsyncTransport.
+
+Every request through a transport produces a RequestTiming:
+
+    connect_s   time to open a new connection (TCP + TLS), None when a pooled one was reused
+    ttfb_s      request start until the response status line and headers arrived
+    read_s      headers until the body was fully read (for stream=True: until the response was closed)
+    total_s     request start until the body was read / the response was closed
+    bytes_out   request body size, bytes_in response body bytes off the wire
+    status      HTTP status, or None with `error` set when no response arrived
+
+RequestMetrics rolls timings up per endpoint ("POST /sources/{id}/status": ids in the path are
+templated) into HDR-style latency histograms, exposes them via snapshot()/summary(), can log the
+summary periodically, and passes each timing to listeners added with add_listener(). It also
+tracks requests in flight and retries reported by the clients (record_retry()).
+
+Blocking connect times come from urllib3 connection classes whose connect() is timed
+(TIMED_POOL_CLASSES, installed on the requests adapter); the async transport uses httpx's
+per-request "trace" extension instead.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple
+from urllib.parse import urlsplit
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger("caller.instrumentation")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+# path segments that are record ids: "source:abc", uuids, long hex/digit strings
+_ID_SEGMENT = re.compile(r"^(?:[A-Za-z_]+:.+|\d+|[0-9a-fA-F]{16,}|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27})$")
+
+
+def endpoint_template(url: str, strip_prefix: str = "/api") -> str:
+    """URL -> templated path, e.g. ".../api/sources/source:x1/status" -> "/sources/{id}/status"."""
+    path = urlsplit(url).path
+    if strip_prefix and (path == strip_prefix or path.startswith(strip_prefix + "/")):
+        path = path[len(strip_prefix):]
+    segments = ["{id}" if _ID_SEGMENT.match(s) else s for s in path.strip("/").split("/") if s]
+    return "/" + "/".join(segments)
+
+
+class RequestTiming:
+    """Timing of one HTTP request (see the module docstring for the fields)."""
+
+    __slots__ = ("method", "url", "endpoint", "status", "error", "connect_s", "ttfb_s", "read_s", "total_s", "bytes_out", "bytes_in", "started_at", "_t0", "_in_flight")
+
+    def __init__(self, method: str, url: str):
+        self.method = method.upper()
+        self.url = url
+        self.endpoint = f"{self.method} {endpoint_template(url)}"
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.connect_s: Optional[float] = None
+        self.ttfb_s: Optional[float] = None
+        self.read_s: Optional[float] = None
+        self.total_s: Optional[float] = None
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._in_flight = False
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__ if not k.startswith("_")}
+
+    def __repr__(self) -> str:
+        return f"RequestTiming({self.endpoint} status={self.status} total_s={self.total_s})"
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of durations with microsecond resolution.
+
+    Values below 2**sub_bucket_bits us are counted exactly; above that every power of two is split
+    into 2**(sub_bucket_bits - 1) buckets, so percentiles are within 1 / 2**(sub_bucket_bits - 1)
+    (default < 1%) of the true value whatever the range. Memory grows with the number of distinct
+    buckets used, not with the number of values.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 8):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._counts: Dict[Tuple[int, int], int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _key(self, us: int) -> Tuple[int, int]:
+        shift = max(0, us.bit_length() - self.sub_bucket_bits)
+        return shift, us >> shift
+
+    def record(self, seconds: float) -> None:
+        us = max(0, int(seconds * 1e6))
+        key = self._key(us)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("cannot merge histograms with different precision")
+        for key, n in other._counts.items():
+            self._counts[key] = self._counts.get(key, 0) + n
+        self.count += other.count
+        self.total += other.total
+        for v in (other.min, other.max):
+            if v is not None:
+                self.min = v if self.min is None else min(self.min, v)
+                self.max = v if self.max is None else max(self.max, v)
+
+    def buckets(self) -> Iterator[Tuple[float, int]]:
+        """(upper bound in seconds, count) of every non-empty bucket, in increasing order."""
+        for shift, mantissa in sorted(self._counts):
+            yield (((mantissa + 1) << shift) - 1) / 1e6, self._counts[(shift, mantissa)]
+
+    def percentile(self, pct: float) -> float:
+        """Value (seconds) at or below which `pct` percent of the recorded values fall."""
+        if not self.count:
+            return 0.0
+        target = max(1, round(pct / 100.0 * self.count + 0.5))
+        seen = 0
+        for upper, n in self.buckets():
+            seen += n
+            if seen >= target:
+                return min(upper, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        ms = lambda s: round((s or 0.0) * 1e3, 3)
+        return {
+            "count": self.count,
+            "min_ms": ms(self.min),
+            "mean_ms": ms(self.mean),
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+            "p999_ms": ms(self.percentile(99.9)),
+            "max_ms": ms(self.max),
+        }
+
+
+class _EndpointStats:
+    __slots__ = ("count", "errors", "statuses", "bytes_in", "bytes_out", "total", "connect", "ttfb", "read")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.statuses: Counter = Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.total = LatencyHistogram()
+        self.connect = LatencyHistogram()  # only requests that opened a connection
+        self.ttfb = LatencyHistogram()
+        self.read = LatencyHistogram()
+
+    def add(self, t: RequestTiming) -> None:
+        self.count += 1
+        if t.status is None or t.status >= 400:
+            self.errors += 1
+        self.statuses[t.status if t.status is not None else (t.error or "error")] += 1
+        self.bytes_in += t.bytes_in
+        self.bytes_out += t.bytes_out
+        for hist, value in ((self.total, t.total_s), (self.connect, t.connect_s), (self.ttfb, t.ttfb_s), (self.read, t.read_s)):
+            if value is not None:
+                hist.record(value)
+
+
+class RequestMetrics:
+    """Thread-safe per-endpoint roll-up of RequestTimings; shared by a Transport and its clients."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self._listeners: List[Callable[[RequestTiming], None]] = []
+        self._recorded = 0
+        self.in_flight = 0
+        self.retries: Counter = Counter()  # endpoint -> requests re-sent after a failure
+        self._log_thread: Optional[threading.Thread] = None
+        self._log_stop = threading.Event()
+
+    def add_listener(self, fn: Callable[[RequestTiming], None]) -> None:
+        """Call fn(timing) after every recorded request (from the requesting thread)."""
+        with self._lock:
+            self._listeners.append(fn)
+
+    def remove_listener(self, fn: Callable[[RequestTiming], None]) -> None:
+        with self._lock:
+            if fn in self._listeners:
+                self._listeners.remove(fn)
+
+    def begin(self, method: str, url: str) -> RequestTiming:
+        """Start timing a request; it counts as in flight until record() is called with it."""
+        timing = RequestTiming(method, url)
+        timing._in_flight = True
+        with self._lock:
+            self.in_flight += 1
+        return timing
+
+    def record_retry(self, method: str, url: str) -> None:
+        """Count a request that is being re-sent (chunk retry, SSE reconnect, ...)."""
+        endpoint = f"{method.upper()} {endpoint_template(url)}"
+        with self._lock:
+            self.retries[endpoint] += 1
+
+    def retry_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.retries)
+
+    def record(self, timing: RequestTiming) -> None:
+        with self._lock:
+            if timing._in_flight:
+                timing._in_flight = False
+                self.in_flight -= 1
+            stats = self._endpoints.get(timing.endpoint)
+            if stats is None:
+                stats = self._endpoints[timing.endpoint] = _EndpointStats()
+            stats.add(timing)
+            self._recorded += 1
+            listeners = list(self._listeners)
+        for fn in listeners:
+            try:
+                fn(timing)
+            except Exception:
+                logger.exception("Request metrics listener failed")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self.retries.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """{endpoint: {count, errors, statuses, bytes_in, bytes_out, total, connect, ttfb, read}};
+        the last four are LatencyHistogram.snapshot() dicts (milliseconds)."""
+        with self._lock:
+            return {
+                endpoint: {
+                    "count": s.count,
+                    "errors": s.errors,
+                    "statuses": dict(s.statuses),
+                    "bytes_in": s.bytes_in,
+                    "bytes_out": s.bytes_out,
+                    "total": s.total.snapshot(),
+                    "connect": s.connect.snapshot(),
+                    "ttfb": s.ttfb.snapshot(),
+                    "read": s.read.snapshot(),
+                }
+                for endpoint, s in self._endpoints.items()
+            }
+
+    def histograms(self) -> Dict[str, Dict[str, LatencyHistogram]]:
+        """Copies of the raw histograms: {endpoint: {"total"|"connect"|"ttfb"|"read": LatencyHistogram}}."""
+        out: Dict[str, Dict[str, LatencyHistogram]] = {}
+        with self._lock:
+            for endpoint, s in self._endpoints.items():
+                out[endpoint] = {}
+                for name in ("total", "connect", "ttfb", "read"):
+                    copy = LatencyHistogram(getattr(s, name).sub_bucket_bits)
+                    copy.merge(getattr(s, name))
+                    out[endpoint][name] = copy
+        return out
+
+    def summary(self) -> str:
+        """One line per endpoint, busiest (by total time) first."""
+        snap = self.snapshot()
+        if not snap:
+            return "no requests recorded"
+        lines = []
+        for endpoint, s in sorted(snap.items(), key=lambda kv: -kv[1]["total"]["mean_ms"] * kv[1]["count"]):
+            t, c = s["total"], s["connect"]
+            lines.append(
+                f"{endpoint}: n={s['count']} err={s['errors']} p50={t['p50_ms']:.1f}ms p99={t['p99_ms']:.1f}ms max={t['max_ms']:.1f}ms "
+                f"ttfb_p50={s['ttfb']['p50_ms']:.1f}ms read_p50={s['read']['p50_ms']:.1f}ms "
+                f"connects={c['count']} connect_p50={c['p50_ms']:.1f}ms in={s['bytes_in']}B out={s['bytes_out']}B"
+            )
+        return "\n".join(lines)
+
+    def start_summary_log(self, interval_seconds: float) -> None:
+        """Log summary() every `interval_seconds` (skipped when nothing was recorded since the last one)."""
+        if self._log_thread is not None:
+            return
+        self._log_stop.clear()
+
+        def run() -> None:
+            logged = 0
+            while not self._log_stop.wait(interval_seconds):
+                if self._recorded != logged:
+                    logged = self._recorded
+                    logger.info("Request timings:\n%s", self.summary())
+
+        self._log_thread = threading.Thread(target=run, name="caller-request-metrics", daemon=True)
+        self._log_thread.start()
+
+    def stop_summary_log(self) -> None:
+        if self._log_thread is not None:
+            self._log_stop.set()
+            self._log_thread.join()
+            self._log_thread = None
+
+
+# ---- blocking (requests/urllib3) connect timing ----
+
+_connect_local = threading.local()
+
+
+def reset_connect_time() -> None:
+    _connect_local.seconds = None
+
+
+def take_connect_time() -> Optional[float]:
+    """Seconds this thread spent opening connections since reset_connect_time() (None if none were opened)."""
+    seconds = getattr(_connect_local, "seconds", None)
+    _connect_local.seconds = None
+    return seconds
+
+
+def _add_connect_time(seconds: float) -> None:
+    _connect_local.seconds = (getattr(_connect_local, "seconds", None) or 0.0) + seconds
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - t0)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - t0)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+# for PoolManager.pool_classes_by_scheme
+TIMED_POOL_CLASSES = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+
+def body_size(body: Any) -> int:
+    """Best-effort size of a prepared request body (0 when unknown, e.g. a generator)."""
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    try:
+        return len(body)
+    except TypeError:
+        return 0
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+class Manifest:
+    """Crash-safe, append-only JSONL record store keyed by a string.
+
+    Every `put()` appends one line `{"key": ..., ...}` and fsyncs it, so a crash loses at most the
+    record being written. On load the file is folded key-by-key (last record wins) and a torn final
+    line is ignored. `compact()` rewrites the file with one line per key via an atomic rename.
+
+    Used by Application.ingest_tree (keyed by file path) and Application.evaluate_matrix.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    # torn write from an interrupted run
+                    continue
+                key = rec.get("key")
+                if key is not None:
+                    self._records[key] = rec
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._records.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._records
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def items(self) -> Iterator:
+        with self._lock:
+            return iter(list(self._records.items()))
+
+    def put(self, key: str, record: Dict[str, Any]) -> None:
+        """Append a record for `key` and flush it to disk before returning."""
+        rec = dict(record, key=key)
+        line = json.dumps(rec, ensure_ascii=False, default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+            self._records[key] = rec
+
+    def compact(self) -> None:
+        """Rewrite the file with only the latest record per key (atomic replace)."""
+        with self._lock:
+            if not self._records:
+                return
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as fh:
+                for rec in self._records.values():
+                    fh.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp, self.path)
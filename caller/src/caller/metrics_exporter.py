@@ -0,0 +1,264 @@
+"""OpenMetrics (Prometheus) exporter for client-side metrics.
+
+MetricsExporter serves `GET /metrics` from a stdlib HTTP server on a background thread. Every
+scrape reads the live objects it was given, so nothing is sampled or buffered in between:
+
+    caller_requests_total{method,endpoint,status}        counter    from RequestMetrics
+    caller_request_duration_seconds{method,endpoint}     histogram  request start -> body read
+    caller_request_ttfb_seconds{method,endpoint}         histogram  request start -> headers
+    caller_requests_in_flight                            gauge
+    caller_request_retries_total{method,endpoint}        counter    chunk retries, SSE reconnects
+    caller_upload_bytes_total                            counter    POST /sources + chunk PUT bodies
+    caller_cache_lookups_total{cache,result}             counter    result="hit"|"miss"
+    caller_cache_hit_ratio{cache}                        gauge
+    caller_cache_entries{cache}                          gauge
+    caller_poller_queue_depth                            gauge      sources a StatusPoller is tracking
+
+Application starts one when CallerConfig.metrics_port is set; otherwise:
+
+    exporter = MetricsExporter(port=9464).register_application(app).start()
+"""
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List, Dict, Any, Callable, Iterable, Tuple
+
+from .instrumentation import RequestMetrics, LatencyHistogram
+
+logger = logging.getLogger("caller.metrics_exporter")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# histogram bucket bounds (seconds) for request latencies
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# request bodies counted as uploaded file bytes
+UPLOAD_ENDPOINTS = ("POST /sources", "PUT /sources/uploads/{id}")
+
+Labels = Dict[str, str]
+# one metric family: (name, type, help, [(sample suffix, labels, value), ...])
+Family = Tuple[str, str, str, List[Tuple[str, Labels, float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def render(families: Iterable[Family]) -> str:
+    """OpenMetrics text for the given families (terminated by "# EOF")."""
+    lines: List[str] = []
+    for name, kind, help_text, samples in families:
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"# HELP {name} {help_text}")
+        for suffix, labels, value in samples:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}" if label_text else f"{name}{suffix} {_format_value(value)}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_samples(hist: LatencyHistogram, labels: Labels) -> List[Tuple[str, Labels, float]]:
+    samples = []
+    counts = list(hist.buckets())
+    i = seen = 0
+    for bound in LATENCY_BUCKETS:
+        while i < len(counts) and counts[i][0] <= bound:
+            seen += counts[i][1]
+            i += 1
+        samples.append(("_bucket", dict(labels, le=repr(bound)), seen))
+    samples.append(("_bucket", dict(labels, le="+Inf"), hist.count))
+    samples.append(("_count", labels, hist.count))
+    samples.append(("_sum", labels, hist.total))
+    return samples
+
+
+def request_families(metrics: RequestMetrics) -> List[Family]:
+    """Request counters, latency histograms, in-flight, retries and upload bytes of one RequestMetrics."""
+    snapshot = metrics.snapshot()
+    histograms = metrics.histograms()
+    requests, durations, ttfbs, retries = [], [], [], []
+    upload_bytes = 0
+    for endpoint, s in sorted(snapshot.items()):
+        method, _, path = endpoint.partition(" ")
+        labels = {"method": method, "endpoint": path}
+        for status, n in sorted(s["statuses"].items(), key=lambda kv: str(kv[0])):
+            requests.append(("_total", dict(labels, status=str(status)), n))
+        durations.extend(_histogram_samples(histograms[endpoint]["total"], labels))
+        ttfbs.extend(_histogram_samples(histograms[endpoint]["ttfb"], labels))
+        if endpoint in UPLOAD_ENDPOINTS:
+            upload_bytes += s["bytes_out"]
+    for endpoint, n in sorted(metrics.retry_counts().items()):
+        method, _, path = endpoint.partition(" ")
+        retries.append(("_total", {"method": method, "endpoint": path}, n))
+    return [
+        ("caller_requests", "counter", "HTTP requests completed, by templated endpoint and status (or exception name).", requests),
+        ("caller_request_duration_seconds", "histogram", "Request start until the response body was read.", durations),
+        ("caller_request_ttfb_seconds", "histogram", "Request start until the response headers arrived.", ttfbs),
+        ("caller_requests_in_flight", "gauge", "Requests sent and not yet completed.", [("", {}, metrics.in_flight)]),
+        ("caller_request_retries", "counter", "Requests re-sent after a failure (chunk retries, SSE reconnects).", retries),
+        ("caller_upload_bytes", "counter", "Request body bytes sent to the upload endpoints.", [("_total", {}, upload_bytes)]),
+    ]
+
+
+def cache_families(caches: Dict[str, Any]) -> List[Family]:
+    """Lookup counters, hit ratio and size of caches exposing stats() (hits, misses, hit_ratio, entries)."""
+    lookups, ratios, entries = [], [], []
+    for name, cache in sorted(caches.items()):
+        stats = cache.stats()
+        lookups.append(("_total", {"cache": name, "result": "hit"}, stats.get("hits", 0)))
+        lookups.append(("_total", {"cache": name, "result": "miss"}, stats.get("misses", 0)))
+        ratios.append(("", {"cache": name}, stats.get("hit_ratio", 0.0)))
+        entries.append(("", {"cache": name}, stats.get("entries", 0)))
+    return [
+        ("caller_cache_lookups", "counter", "Cache lookups by result.", lookups),
+        ("caller_cache_hit_ratio", "gauge", "Hits / lookups since the cache was created.", ratios),
+        ("caller_cache_entries", "gauge", "Entries currently held in memory.", entries),
+    ]
+
+
+class MetricsExporter:
+    """Serves registered client metrics as OpenMetrics text on http://host:port/metrics.
+
+    Register sources before or after start(); scrapes always see the current set:
+    - register_transport(): request counts/latencies/in-flight/retries/upload bytes
+    - register_cache(name, cache): anything with stats() (defaults, search and context caches)
+    - register_poller(): queue depth of a StatusPoller, or any callable returning it
+    - register_application(): all of the above for an Application / AsyncApplication
+    - add_collector(): a callable returning extra metric families
+    """
+
+    def __init__(self, port: int = 9464, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = port
+        self._lock = threading.Lock()
+        self._request_metrics: Optional[RequestMetrics] = None
+        self._caches: Dict[str, Any] = {}
+        self._pollers: List[Callable[[], Optional[int]]] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def register_transport(self, transport) -> "MetricsExporter":
+        """Export the RequestMetrics of a Transport/AsyncTransport (no-op if request_metrics is off).
+
+        One RequestMetrics per exporter; share it (Transport(config, metrics=...)) to export
+        several transports together.
+        """
+        metrics = transport if isinstance(transport, RequestMetrics) else getattr(transport, "metrics", None)
+        if metrics is not None:
+            with self._lock:
+                self._request_metrics = metrics
+        return self
+
+    def register_cache(self, name: str, cache) -> "MetricsExporter":
+        if cache is not None:
+            with self._lock:
+                self._caches[name] = cache
+        return self
+
+    def register_poller(self, poller) -> "MetricsExporter":
+        """`poller` is a StatusPoller or a callable returning the queue depth (None: not running)."""
+        depth = poller.pending if hasattr(poller, "pending") else poller
+        with self._lock:
+            self._pollers.append(depth)
+        return self
+
+    def register_application(self, app) -> "MetricsExporter":
+        self.register_transport(app.transport)
+        qc = app.qc
+        self.register_cache("defaults", getattr(qc, "defaults_cache", None))
+        self.register_cache("search", getattr(qc, "search_cache", None))
+        self.register_cache("context", getattr(qc, "context_cache", None))
+        if hasattr(app, "_poller"):
+            # the poller is created on first use; do not create it just to report an empty queue
+            self.register_poller(lambda: app._poller.pending() if app._poller is not None else 0)
+        return self
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]) -> "MetricsExporter":
+        with self._lock:
+            self._collectors.append(collector)
+        return self
+
+    def collect(self) -> List[Family]:
+        with self._lock:
+            request_metrics = self._request_metrics
+            caches = dict(self._caches)
+            pollers = list(self._pollers)
+            collectors = list(self._collectors)
+        families: List[Family] = []
+        if request_metrics is not None:
+            families.extend(request_families(request_metrics))
+        if caches:
+            families.extend(cache_families(caches))
+        if pollers:
+            depth = sum(d() or 0 for d in pollers)
+            families.append(("caller_poller_queue_depth", "gauge", "Sources being polled for processing status.", [("", {}, depth)]))
+        for collector in collectors:
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        return render(self.collect())
+
+    # ---- HTTP server ----
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self) -> "MetricsExporter":
+        if self._server is None:
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self) -> None:
+                    if self.path.split("?")[0] not in ("/metrics", "/"):
+                        self.send_error(404)
+                        return
+                    try:
+                        body = exporter.render().encode("utf-8")
+                    except Exception as e:
+                        logger.exception("Metrics collection failed")
+                        self.send_error(500, str(e))
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", CONTENT_TYPE)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format: str, *args: Any) -> None:
+                    logger.debug("%s - %s", self.address_string(), format % args)
+
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            self._thread = threading.Thread(target=self._server.serve_forever, name="caller-metrics-exporter", daemon=True)
+            self._thread.start()
+            logger.info("Serving metrics on %s", self.url)
+        return self
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self) -> "MetricsExporter":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,165 @@
+import asyncio
+import mimetypes
+import os
+import time
+import uuid
+from typing import Optional, Dict, Callable, Iterator, AsyncIterator
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# progress(bytes_sent, total_bytes, bytes_per_second)
+ProgressCallback = Callable[[int, int, float], None]
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\r", " ").replace("\n", " ")
+
+
+class MultipartFileEncoder:
+    """Streaming multipart/form-data body for one file plus plain form fields.
+
+    Memory use is bounded no matter how large the file is: the part headers are built up front,
+    the file is read in the pieces the transport asks for (requests pulls 16 KiB reads; __iter__ and
+    aiter_chunks yield `chunk_size` pieces), and the total length is known in advance so the request
+    carries a Content-Length (no chunked encoding).
+
+    `progress(bytes_sent, total_bytes, bytes_per_second)` is called each time another `chunk_size`
+    bytes have been read, and once at the end, whatever the size of the individual reads.
+
+    Works as a request body for both transports:
+    - requests: pass the encoder itself as `data=` (it is file-like, iterable and has __len__)
+    - httpx (async): pass `content=encoder.aiter_chunks()` and `encoder.headers`
+
+    The file handle is opened on first read and closed as soon as the last byte is sent, on
+    close(), or when leaving a `with` block.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        fields: Optional[Dict[str, str]] = None,
+        file_field: str = "file",
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        progress: Optional[ProgressCallback] = None,
+    ):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.boundary = uuid.uuid4().hex
+        filename = filename or os.path.basename(file_path)
+        content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+        head = []
+        for name, value in (fields or {}).items():
+            head.append(
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'
+                f"{value}\r\n"
+            )
+        head.append(
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{_quote(file_field)}"; filename="{_quote(filename)}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        )
+        self._head = "".join(head).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self.file_size = os.path.getsize(file_path)
+        self.total = len(self._head) + self.file_size + len(self._tail)
+
+        self._fh = None
+        self._pos = 0
+        self._reported = 0
+        self._started: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.closed = False
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Content-Type": self.content_type, "Content-Length": str(self.total)}
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._pos
+
+    @property
+    def bytes_per_second(self) -> float:
+        if self._started is None:
+            return 0.0
+        elapsed = (self.finished_at or time.perf_counter()) - self._started
+        return self._pos / elapsed if elapsed > 0 else 0.0
+
+    def __len__(self) -> int:
+        return self.total
+
+    def _read_file(self, size: int) -> bytes:
+        if self._fh is None:
+            self._fh = open(self.file_path, "rb")
+        data = self._fh.read(size)
+        if len(data) < size:
+            # EOF reached: release the handle immediately
+            self._fh.close()
+        return data
+
+    def read(self, size: int = -1) -> bytes:
+        """Return up to `size` bytes of the encoded body (`size` < 0 reads at most one chunk)."""
+        if self.closed or self._pos >= self.total:
+            return b""
+        if self._started is None:
+            self._started = time.perf_counter()
+        if size is None or size < 0:
+            size = self.chunk_size
+        out = bytearray()
+        head_len = len(self._head)
+        file_end = head_len + self.file_size
+        while len(out) < size and self._pos < self.total:
+            want = size - len(out)
+            if self._pos < head_len:
+                piece = self._head[self._pos:self._pos + want]
+            elif self._pos < file_end:
+                piece = self._read_file(min(want, file_end - self._pos))
+                if not piece:
+                    raise IOError(f"{self.file_path} shrank while uploading")
+            else:
+                start = self._pos - file_end
+                piece = self._tail[start:start + want]
+            out += piece
+            self._pos += len(piece)
+        if self._pos >= self.total:
+            self.finished_at = time.perf_counter()
+            self.close()
+        if self.progress is not None and (self._pos - self._reported >= self.chunk_size or self._pos >= self.total):
+            self._reported = self._pos
+            self.progress(self._pos, self.total, self.bytes_per_second)
+        return bytes(out)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    async def aiter_chunks(self) -> AsyncIterator[bytes]:
+        """Async iterator over the body; file reads run in a worker thread."""
+        while True:
+            chunk = await asyncio.to_thread(self.read, self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        if self._fh is not None and not self._fh.closed:
+            self._fh.close()
+        self.closed = True
+
+    def __enter__(self) -> "MultipartFileEncoder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
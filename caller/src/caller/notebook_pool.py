@@ -0,0 +1,217 @@
+import logging
+import threading
+import time
+from typing import Optional, List, Dict, Any, Iterable, FrozenSet, Set, Tuple
+
+logger = logging.getLogger("caller.notebook_pool")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+
+class NotebookLease:
+    """A pooled notebook + chat session with the given sources linked."""
+
+    __slots__ = ("key", "notebook_id", "session_id", "linked", "last_used", "in_use", "uses")
+
+    def __init__(self, key: FrozenSet[str], notebook_id: str):
+        self.key = key
+        self.notebook_id = notebook_id
+        # pooled chat session (only with reuse_sessions=True)
+        self.session_id: Optional[str] = None
+        self.linked: Set[str] = set()
+        self.last_used = time.monotonic()
+        self.in_use = False
+        self.uses = 0
+
+
+class NotebookPool:
+    """Reuses temp notebooks (and optionally chat sessions) across notebook_ask calls.
+
+    - leases are keyed by the set of source ids; acquire() hands out an idle lease for that set
+      or creates a notebook and links the sources
+    - a lease is used by one question at a time, so concurrent asks against the same sources
+      get separate notebooks/sessions and never interleave history
+    - links already made (pooled or explicitly passed notebooks) are remembered and skipped
+    - leases idle for more than `idle_seconds` are evicted by a background reaper, which deletes
+      the chat session and notebook on the server; close() evicts everything
+
+    By default (reuse_sessions=False) a lease carries no session: every ask opens its own, so answers
+    never see earlier questions, and the caller deletes it with retire_session() once the ask is done. reuse_sessions=True also pools one chat session per lease, saving that
+    POST, but every later question on the lease then sees the earlier Q&A history.
+    """
+
+    def __init__(self, transport, base: str, timeout: float, idle_seconds: float = 900.0, reuse_sessions: bool = False):
+        self.transport = transport
+        self.base = base.rstrip("/")
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self.reuse_sessions = reuse_sessions
+        self._lock = threading.Lock()
+        self._leases: Dict[FrozenSet[str], List[NotebookLease]] = {}
+        self._linked: Set[Tuple[str, str]] = set()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        self.created = 0
+        self.reused = 0
+
+    # ---- server calls ----
+    def _create_notebook(self) -> str:
+        nb_url = f"{self.base}/notebooks"
+        nb_payload = {"name": f"temp-notebook-{int(time.time())}", "description": "Temporary notebook for source-scoped query"}
+        logger.info("Creating notebook: POST %s", nb_url)
+        nb_resp = self.transport.post(nb_url, json=nb_payload, timeout=self.timeout)
+        nb_resp.raise_for_status()
+        return nb_resp.json().get("id")
+
+    def create_session(self, notebook_id: str) -> str:
+        sess_url = f"{self.base}/chat/sessions"
+        sess_payload = {"notebook_id": notebook_id, "title": f"nb-session-{int(time.time())}"}
+        logger.info("Creating notebook session: POST %s", sess_url)
+        sresp = self.transport.post(sess_url, json=sess_payload, timeout=self.timeout)
+        sresp.raise_for_status()
+        return sresp.json().get("id")
+
+    def link(self, notebook_id: str, source_id: str) -> bool:
+        """Link a source to a notebook unless this pool already did so. Returns True if a request was made."""
+        with self._lock:
+            if (notebook_id, source_id) in self._linked:
+                return False
+        link_url = f"{self.base}/notebooks/{notebook_id}/sources/{source_id}"
+        logger.info("Linking source to notebook: POST %s", link_url)
+        lresp = self.transport.post(link_url, timeout=self.timeout)
+        lresp.raise_for_status()
+        with self._lock:
+            self._linked.add((notebook_id, source_id))
+        return True
+
+    def _delete_url(self, url: str) -> None:
+        try:
+            resp = self.transport.delete(url, timeout=self.timeout)
+            if not resp.ok and resp.status_code != 404:
+                logger.warning("Cleanup DELETE %s returned %s", url, resp.status_code)
+        except Exception as e:
+            logger.warning("Cleanup DELETE %s failed: %s", url, e)
+
+    def _delete(self, lease: NotebookLease) -> None:
+        if lease.session_id:
+            self._delete_url(f"{self.base}/chat/sessions/{lease.session_id}")
+        self._delete_url(f"{self.base}/notebooks/{lease.notebook_id}")
+        with self._lock:
+            self._linked = {p for p in self._linked if p[0] != lease.notebook_id}
+
+    # ---- leasing ----
+    def acquire(self, source_ids: Iterable[str]) -> NotebookLease:
+        """Return an exclusive lease on a notebook linked to exactly `source_ids` (with a session if reuse_sessions)."""
+        key = frozenset(source_ids)
+        self._ensure_reaper()
+        lease = None
+        with self._lock:
+            for candidate in self._leases.get(key, []):
+                if not candidate.in_use:
+                    candidate.in_use = True
+                    lease = candidate
+                    self.reused += 1
+                    break
+        if lease is None:
+            lease = NotebookLease(key, self._create_notebook())
+            lease.in_use = True
+            with self._lock:
+                self._leases.setdefault(key, []).append(lease)
+                self.created += 1
+            logger.info("Created pooled notebook %s for %d source(s)", lease.notebook_id, len(key))
+        try:
+            for sid in sorted(key - lease.linked):
+                self.link(lease.notebook_id, sid)
+                lease.linked.add(sid)
+            if self.reuse_sessions and lease.session_id is None:
+                lease.session_id = self.create_session(lease.notebook_id)
+        except Exception:
+            self.release(lease)
+            raise
+        lease.uses += 1
+        return lease
+
+    def retire_session(self, lease: NotebookLease, session_id: Optional[str]) -> None:
+        """Delete (best effort) a per-ask session opened in the lease's notebook; the pooled one is kept."""
+        if session_id and session_id != lease.session_id:
+            self._delete_url(f"{self.base}/chat/sessions/{session_id}")
+
+    def release(self, lease: NotebookLease) -> None:
+        with self._lock:
+            lease.in_use = False
+            lease.last_used = time.monotonic()
+
+    def discard(self, lease: NotebookLease) -> None:
+        """Drop a lease that is known to be broken (e.g. the notebook was deleted server-side)."""
+        with self._lock:
+            bucket = self._leases.get(lease.key, [])
+            if lease in bucket:
+                bucket.remove(lease)
+            if not bucket:
+                self._leases.pop(lease.key, None)
+        self._delete(lease)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(b) for b in self._leases.values())
+
+    # ---- eviction ----
+    def evict_idle(self, max_idle: Optional[float] = None) -> int:
+        """Delete leases idle for longer than `max_idle` (default idle_seconds). Returns number evicted."""
+        max_idle = self.idle_seconds if max_idle is None else max_idle
+        now = time.monotonic()
+        victims: List[NotebookLease] = []
+        with self._lock:
+            for key in list(self._leases):
+                keep = []
+                for lease in self._leases[key]:
+                    if not lease.in_use and now - lease.last_used >= max_idle:
+                        victims.append(lease)
+                    else:
+                        keep.append(lease)
+                if keep:
+                    self._leases[key] = keep
+                else:
+                    del self._leases[key]
+        for lease in victims:
+            logger.info("Evicting idle notebook %s (session %s)", lease.notebook_id, lease.session_id)
+            self._delete(lease)
+        return len(victims)
+
+    def _ensure_reaper(self) -> None:
+        if self.idle_seconds <= 0 or (self._reaper is not None and self._reaper.is_alive()):
+            return
+        with self._lock:
+            if self._reaper is None or not self._reaper.is_alive():
+                self._stop.clear()
+                self._reaper = threading.Thread(target=self._reap, name="caller-notebook-reaper", daemon=True)
+                self._reaper.start()
+
+    def _reap(self) -> None:
+        interval = max(1.0, self.idle_seconds / 4)
+        while not self._stop.wait(interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.warning("Notebook pool eviction failed: %s", e)
+
+    def close(self) -> None:
+        """Stop the reaper and delete every pooled notebook/session on the server."""
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join(timeout=5)
+            self._reaper = None
+        with self._lock:
+            for bucket in self._leases.values():
+                for lease in bucket:
+                    lease.in_use = False
+        self.evict_idle(max_idle=0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_use = sum(1 for b in self._leases.values() for lease in b if lease.in_use)
+            total = sum(len(b) for b in self._leases.values())
+        return {"leases": total, "in_use": in_use, "created": self.created, "reused": self.reused}
@@ -2,11 +2,17 @@ import json
 import logging
 import time
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 import requests
 
+from .catalog import SourceCatalog, normalize_filename
+from .chunked_upload import ChunkedUploader, ChunkedUploadUnsupported
 from .config import default_config
+from .dedup import ContentHashIndex, file_sha256
+from . import tracing
+from .multipart import MultipartFileEncoder, ProgressCallback
+from .transport import Transport
 
 logger = logging.getLogger("caller.pdf_uploader")
 logger.setLevel(logging.INFO)
@@ -26,14 +32,46 @@ class PdfUploader:
     - reference_existing_file(source_file_path, title, notebooks=None, embed=True, async_processing=True)
       Tells backend to create a Source record referencing an existing file path already on the server
       (uses POST /api/sources with JSON payload pointing to file_path). This avoids re-upload.
+
+    When a ContentHashIndex is supplied (or `config.hash_index_path` is set) uploads are deduplicated
+    by the SHA-256 of the file bytes instead of by listing /sources and matching titles.
     """
 
-    def __init__(self, config=default_config):
+    def __init__(self, config=default_config, transport: Optional[Transport] = None, hash_index: Optional[ContentHashIndex] = None):
         self.base = config.api_base_url.rstrip("/")
         self.timeout = config.timeout_seconds
+        self.upload_chunk_size = config.upload_chunk_size
+        self.chunked_upload_threshold = config.chunked_upload_threshold
+        # shared pooled transport; create a private one when used standalone
+        self._owns_transport = transport is None
+        self.transport = transport or Transport(config)
+        # content-addressed dedup index (None -> fall back to title matching)
+        self._owns_hash_index = hash_index is None and bool(config.hash_index_path)
+        if self._owns_hash_index:
+            hash_index = ContentHashIndex(config.hash_index_path)
+        self.hash_index = hash_index
+        # indexed /sources cache used by find_source_for_file and friends
+        self.catalog = SourceCatalog(self, ttl_seconds=config.source_catalog_ttl_seconds)
+        # resumable chunked uploads for large files; disabled after the backend reports no support
+        self.chunked = ChunkedUploader(
+            self.transport,
+            self.base,
+            self.timeout,
+            state_dir=config.upload_state_dir,
+            chunk_size=config.resumable_chunk_size,
+            chunk_retries=config.resumable_chunk_retries,
+        )
+        self._chunked_supported: Optional[bool] = None
         # debug flag: when True, `find_source_for_file` will log candidate matches
         self.debug_candidates = False
 
+    def close(self) -> None:
+        """Close the content-hash index and the transport if this uploader created them."""
+        if self._owns_hash_index:
+            self.hash_index.close()
+        if self._owns_transport:
+            self.transport.close()
+
     # ---- Internal helpers for consistent responses ----
     def _wrap_response(self, resp: requests.Response) -> Dict[str, Any]:
         """Normalize requests.Response into a consistent dict."""
@@ -78,6 +116,19 @@ class PdfUploader:
         }
         return normalized
 
+    def _lookup_content_hash(self, file_path: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Hash `file_path` and return (sha256, normalized source or None) from the local index."""
+        digest = file_sha256(file_path)
+        hit = self.hash_index.lookup(digest)
+        if not hit:
+            return digest, None
+        return digest, self._normalize_source_item({"id": hit["source_id"], "title": hit["title"]})
+
+    def _record_content_hash(self, digest: str, sources: List[Dict[str, Any]], file_path: str, filename: str) -> None:
+        """Remember which source was created for these bytes."""
+        if sources and sources[0].get("id"):
+            self.hash_index.record(digest, sources[0]["id"], title=filename, size=Path(file_path).stat().st_size)
+
     def _normalize_sources(self, data: Any) -> List[Dict[str, Any]]:
         """Accept various server shapes and return a list of normalized source dicts."""
         if data is None:
@@ -116,6 +167,25 @@ class PdfUploader:
         src = self.find_source_for_file(filename)
         return src.get("id") if src else None
 
+    def find_sources_for_files(self, names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Resolve many filenames/paths to their best-matching source from a single /sources listing.
+
+        Returns {name: normalized_source_or_None}.
+        """
+        return self.catalog.find_many(names)
+
+    def list_sources(self, notebook_id: Optional[str] = None, **params: Any) -> Optional[List[Dict[str, Any]]]:
+        """GET /sources (optionally paged/sorted via params) and return normalized sources, or None on error."""
+        if notebook_id:
+            params["notebook_id"] = notebook_id
+        url = f"{self.base}/sources"
+        resp = self.transport.get(url, params=params, timeout=self.timeout)
+        wrapped = self._wrap_response(resp)
+        if not wrapped["ok"]:
+            logger.error(f"Error listing sources: {wrapped.get('text')}")
+            return None
+        return self._normalize_sources(wrapped["data"])
+
     def upload_file_and_process(
         self,
         file_path: str,
@@ -123,8 +193,19 @@ class PdfUploader:
         notebooks: Optional[list] = None,
         embed: bool = True,
         async_processing: bool = True,
+        progress: Optional[ProgressCallback] = None,
+        chunked: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """Upload a local PDF and request processing.
+
+        The multipart body is streamed from disk (bounded memory);
+        `progress(bytes_sent, total_bytes, bytes_per_second)` is called every `upload_chunk_size`
+        bytes and at the end (in resumable chunked mode, after every committed chunk).
+
+        Files of at least `chunked_upload_threshold` bytes (or any file with chunked=True) use the
+        resumable chunked mode (see caller.chunked_upload); if the backend lacks it the single-shot
+        upload is used instead. chunked=False forces single-shot.
+
         Returns a normalized response dict:
             {
                 "ok": bool,
@@ -134,34 +215,65 @@ class PdfUploader:
                 "error": optional error string
             }
         """
-        filename = title or Path(file_path).name
-
-        # If already exists, return the matched source without re-uploading
-        existing = self.find_source_for_file(filename)
-        if existing:
-            logger.info(f"File '{filename}' already exists on server, skipping upload")
-            return {"ok": True, "status_code": 200, "sources": [existing], "raw": None}
+        with tracing.span("upload_file", file_path=file_path) as span:
+            filename = title or Path(file_path).name
 
-        url = f"{self.base}/sources"
-        files = {"file": open(file_path, "rb")}
-        data = {
-            "type": "upload",
-            "title": filename,
-            "embed": str(embed).lower(),
-            "async_processing": str(async_processing).lower(),
-        }
-        if notebooks:
-            data["notebooks"] = json.dumps(notebooks)
-        logger.info(f"Uploading {file_path} to {url} (async={async_processing})")
-        resp = requests.post(url, files=files, data=data, timeout=self.timeout)
-        wrapped = self._wrap_response(resp)
-        if not wrapped["ok"]:
-            logger.error(f"Upload failed ({wrapped['status_code']}): {wrapped['text']}")
-            wrapped.update({"sources": []})
-            return wrapped
-
-        sources = self._normalize_sources(wrapped["data"])
-        return {"ok": True, "status_code": wrapped["status_code"], "sources": sources, "raw": wrapped["data"]}
+            # If already exists, return the matched source without re-uploading
+            digest = None
+            if self.hash_index is not None:
+                digest, existing = self._lookup_content_hash(file_path)
+            else:
+                existing = self.find_source_for_file(filename)
+            if existing:
+                logger.info(f"File '{filename}' already exists on server, skipping upload")
+                span.set_attributes({"caller.deduplicated": True, "caller.source_id": existing.get("id")})
+                return {"ok": True, "status_code": 200, "sources": [existing], "raw": None}
+
+            if chunked is None:
+                chunked = self._chunked_supported is not False and Path(file_path).stat().st_size >= self.chunked_upload_threshold
+            resp = None
+            if chunked:
+                fields = {"title": filename, "embed": embed, "async_processing": async_processing}
+                if notebooks:
+                    fields["notebooks"] = notebooks
+                logger.info(f"Uploading {file_path} in resumable chunks (async={async_processing})")
+                span.set_attribute("caller.upload_mode", "chunked")
+                try:
+                    resp = self.chunked.upload(file_path, fields, progress=progress)
+                    self._chunked_supported = True
+                except ChunkedUploadUnsupported as e:
+                    logger.info(f"Chunked upload not supported by backend ({e}); falling back to single upload")
+                    self._chunked_supported = False
+
+            if resp is None:
+                url = f"{self.base}/sources"
+                data = {
+                    "type": "upload",
+                    "title": filename,
+                    "embed": str(embed).lower(),
+                    "async_processing": str(async_processing).lower(),
+                }
+                if notebooks:
+                    data["notebooks"] = json.dumps(notebooks)
+                logger.info(f"Uploading {file_path} to {url} (async={async_processing})")
+                with MultipartFileEncoder(file_path, fields=data, chunk_size=self.upload_chunk_size, progress=progress) as body:
+                    resp = self.transport.post(url, data=body, headers={"Content-Type": body.content_type}, timeout=self.timeout)
+                logger.info(f"Uploaded {body.bytes_sent} bytes at {body.bytes_per_second / 1e6:.2f} MB/s")
+                span.set_attributes({"caller.upload_mode": "single", "caller.bytes_sent": body.bytes_sent})
+            wrapped = self._wrap_response(resp)
+            if not wrapped["ok"]:
+                logger.error(f"Upload failed ({wrapped['status_code']}): {wrapped['text']}")
+                span.set_status("ERROR", f"HTTP {wrapped['status_code']}")
+                wrapped.update({"sources": []})
+                return wrapped
+
+            sources = self._normalize_sources(wrapped["data"])
+            if digest is not None:
+                self._record_content_hash(digest, sources, file_path, filename)
+            for src in sources:
+                self.catalog.upsert(src)
+            span.set_attribute("caller.source_id", sources[0].get("id") if sources else None)
+            return {"ok": True, "status_code": wrapped["status_code"], "sources": sources, "raw": wrapped["data"]}
 
     def reference_existing_file(
         self,
@@ -175,32 +287,60 @@ class PdfUploader:
 
         Returns normalized response dict (same shape as upload_file_and_process).
         """
-        url = f"{self.base}/sources"
-        payload = {
-            "type": "upload",
-            "title": title or Path(server_file_path).name,
-            "file_path": server_file_path,
-            "embed": embed,
-            "async_processing": async_processing,
-        }
-        if notebooks:
-            payload["notebooks"] = notebooks
+        with tracing.span("register_file", file_path=server_file_path) as span:
+            url = f"{self.base}/sources"
+            payload = {
+                "type": "upload",
+                "title": title or Path(server_file_path).name,
+                "file_path": server_file_path,
+                "embed": embed,
+                "async_processing": async_processing,
+            }
+            if notebooks:
+                payload["notebooks"] = notebooks
 
-        headers = {"Content-Type": "application/json"}
-        logger.info(f"Registering server file {server_file_path} with backend (async={async_processing})")
-        resp = requests.post(url, json=payload, headers=headers, timeout=self.timeout)
+            headers = {"Content-Type": "application/json"}
+            logger.info(f"Registering server file {server_file_path} with backend (async={async_processing})")
+            resp = self.transport.post(url, json=payload, headers=headers, timeout=self.timeout)
+            wrapped = self._wrap_response(resp)
+            if not wrapped["ok"]:
+                logger.error(f"Registering file failed ({wrapped['status_code']}): {wrapped['text']}")
+                span.set_status("ERROR", f"HTTP {wrapped['status_code']}")
+                wrapped.update({"sources": []})
+                return wrapped
+
+            sources = self._normalize_sources(wrapped["data"])
+            for src in sources:
+                self.catalog.upsert(src)
+            span.set_attribute("caller.source_id", sources[0].get("id") if sources else None)
+            return {"ok": True, "status_code": wrapped["status_code"], "sources": sources, "raw": wrapped["data"]}
+
+    def check_source_status(self, source_id: str) -> Dict[str, Any]:
+        """Single GET of `/sources/{id}/status`.
+
+        Returns normalized dict (same shape as poll_source_status; "ok" False on HTTP error):
+            {"ok", "status_code", "status", "processing_info", "raw", "text"}
+        """
+        url = f"{self.base}/sources/{source_id}/status"
+        resp = self.transport.get(url, timeout=self.timeout)
         wrapped = self._wrap_response(resp)
-        if not wrapped["ok"]:
-            logger.error(f"Registering file failed ({wrapped['status_code']}): {wrapped['text']}")
-            wrapped.update({"sources": []})
-            return wrapped
-
-        sources = self._normalize_sources(wrapped["data"])
-        return {"ok": True, "status_code": wrapped["status_code"], "sources": sources, "raw": wrapped["data"]}
+        data = (wrapped["data"] if wrapped["ok"] else None) or {}
+        if not isinstance(data, dict):
+            data = {}
+        return {
+            "ok": wrapped["ok"],
+            "status_code": wrapped["status_code"],
+            "status": data.get("status"),
+            "processing_info": data.get("processing_info"),
+            "raw": data,
+            "text": wrapped.get("text"),
+        }
 
     def poll_source_status(self, source_id: str, poll_interval: float = 2.0, timeout: float = 600.0) -> Dict[str, Any]:
         """Poll `/sources/{id}/status` until completed/failed or timeout.
 
+        Blocks the calling thread; to wait on many sources at once use StatusPoller.
+
         Returns normalized dict:
             {
                 "ok": True/False,
@@ -210,29 +350,25 @@ class PdfUploader:
                 "raw": original_response_data
             }
         """
-        url = f"{self.base}/sources/{source_id}/status"
-        start = time.time()
-        logger.info(f"Polling status for source {source_id} at {url}")
-        while True:
-            resp = requests.get(url, timeout=self.timeout)
-            wrapped = self._wrap_response(resp)
-            if wrapped["ok"]:
-                data = wrapped["data"] or {}
-                status = data.get("status")
-                logger.info(f"Status for {source_id}: {status}")
-                if status in ("completed", "failed"):
-                    return {
-                        "ok": True,
-                        "status_code": wrapped["status_code"],
-                        "status": status,
-                        "processing_info": data.get("processing_info"),
-                        "raw": data,
-                    }
-            else:
-                logger.warning(f"Status endpoint returned {wrapped['status_code']}: {wrapped.get('text')}")
-            if time.time() - start > timeout:
-                raise TimeoutError(f"Timed out waiting for source {source_id} status")
-            time.sleep(poll_interval)
+        with tracing.span("poll_source_status", source_id=source_id) as span:
+            start = time.time()
+            logger.info(f"Polling status for source {source_id}")
+            polls = 0
+            while True:
+                result = self.check_source_status(source_id)
+                polls += 1
+                if result["ok"]:
+                    status = result["status"]
+                    logger.info(f"Status for {source_id}: {status}")
+                    if status in ("completed", "failed"):
+                        result.pop("text", None)
+                        span.set_attributes({"caller.status": status, "caller.polls": polls})
+                        return result
+                else:
+                    logger.warning(f"Status endpoint returned {result['status_code']}: {result.get('text')}")
+                if time.time() - start > timeout:
+                    raise TimeoutError(f"Timed out waiting for source {source_id} status")
+                time.sleep(poll_interval)
 
     def find_source_for_file(self, filename_or_path: str, notebook_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Find best-matching source record for a given server file path or filename.
@@ -242,37 +378,20 @@ class PdfUploader:
 
         Returns the normalized source dict or None if not found.
         If multiple matches exist the most-recently-updated is returned.
+
+        Lookups go through the cached SourceCatalog (hash indexes, TTL/incremental refresh),
+        so repeated calls do not re-list /sources.
         """
-        import re
-        
-        def normalize_filename(fname: str) -> str:
-            """Strip suffix patterns like ' (5)' before extension.
-            Example: 'file (5).PDF' -> 'file.pdf'
-            """
-            # Extract basename if path provided
-            base = Path(fname).name
-            # Split extension
-            if '.' in base:
-                name_part, ext = base.rsplit('.', 1)
-                # Remove patterns like " (5)" at end of name
-                name_part = re.sub(r'\s*\(\d+\)\s*$', '', name_part).strip()
-                return f"{name_part}.{ext}".lower()
-            return base.lower()
-        
-        params = {}
         if notebook_id:
-            params["notebook_id"] = notebook_id
-
-        url = f"{self.base}/sources"
-        resp = requests.get(url, params=params, timeout=self.timeout)
-        wrapped = self._wrap_response(resp)
-        if not wrapped["ok"]:
-            logger.error(f"Error listing sources: {wrapped.get('text')}")
-            return None
-
-        sources_raw = wrapped["data"]
-        candidates = self._normalize_sources(sources_raw)
-
+            # notebook-scoped lookups are not cached
+            candidates = self.list_sources(notebook_id=notebook_id)
+            if candidates is None:
+                return None
+            return self._match_source(candidates, filename_or_path)
+        return self.catalog.find(filename_or_path)
+
+    def _match_source(self, candidates: List[Dict[str, Any]], filename_or_path: str) -> Optional[Dict[str, Any]]:
+        """Pick the best match for `filename_or_path` from normalized source dicts (no I/O)."""
         target = str(filename_or_path)
         target_normalized = normalize_filename(target)
         target_basename = Path(target).name.lower()
@@ -0,0 +1,205 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Optional, Dict, Any, Callable, List
+
+from . import tracing
+from .config import default_config
+
+logger = logging.getLogger("caller.poller")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class _Tracked:
+    __slots__ = ("source_id", "future", "interval", "deadline", "last_status", "polls", "span")
+
+    def __init__(self, source_id: str, interval: float, deadline: float):
+        self.source_id = source_id
+        # track() -> terminal status, parented to the span that was current at track()
+        self.span = tracing.start_span("poll_source_status", attributes={"source_id": source_id})
+        self.future: Future = Future()
+        self.interval = interval
+        self.deadline = deadline
+        self.last_status: Optional[str] = None
+        self.polls = 0
+
+
+class StatusPoller:
+    """One background thread that polls `/sources/{id}/status` for many in-flight sources.
+
+    - track(source_id) returns a concurrent.futures.Future resolving to the same dict as
+      PdfUploader.poll_source_status once the source is completed/failed (TimeoutError on timeout)
+    - each source has its own interval: it starts at `initial_interval` and grows by `backoff`
+      (capped at `max_interval`) while the status is unchanged; a status change resets it
+    - total requests to the status endpoint never exceed `max_rate` per second
+
+    Usage:
+        with StatusPoller(app.uploader) as poller:
+            futures = [poller.track(sid) for sid in source_ids]
+            results = [f.result() for f in futures]
+    """
+
+    def __init__(
+        self,
+        uploader,
+        initial_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        backoff: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        timeout: float = 600.0,
+        config=default_config,
+    ):
+        self.uploader = uploader
+        self.initial_interval = initial_interval if initial_interval is not None else config.poll_initial_interval
+        self.max_interval = max_interval if max_interval is not None else config.poll_max_interval
+        self.backoff = backoff if backoff is not None else config.poll_backoff
+        self.max_rate = max_rate if max_rate is not None else config.poll_max_rate
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._heap: List = []
+        self._seq = itertools.count()
+        self._tracked: Dict[str, _Tracked] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._last_request = 0.0
+        self.requests_made = 0
+
+    # ---- lifecycle ----
+    def start(self) -> "StatusPoller":
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="caller-status-poller", daemon=True)
+                self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop the background thread; unresolved futures are cancelled."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._cond:
+            for t in self._tracked.values():
+                t.future.cancel()
+            self._tracked.clear()
+            self._heap.clear()
+
+    def __enter__(self) -> "StatusPoller":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- public API ----
+    def track(self, source_id: str, callback: Optional[Callable[[Future], None]] = None, timeout: Optional[float] = None) -> Future:
+        """Start tracking `source_id` and return its Future. Tracking the same id twice returns the same Future.
+
+        `callback`, if given, is attached with Future.add_done_callback.
+        """
+        with self._cond:
+            t = self._tracked.get(source_id)
+            if t is None:
+                now = time.monotonic()
+                t = _Tracked(source_id, self.initial_interval, now + (timeout if timeout is not None else self.timeout))
+                self._tracked[source_id] = t
+                heapq.heappush(self._heap, (now, next(self._seq), source_id))
+                self._cond.notify_all()
+        if callback is not None:
+            t.future.add_done_callback(callback)
+        self.start()
+        return t.future
+
+    def pending(self) -> int:
+        """Number of sources still being polled (queue depth)."""
+        with self._cond:
+            return len(self._tracked)
+
+    # ---- worker ----
+    def _next_due(self) -> Optional[str]:
+        """Block until a source is due and the rate limit allows a request; return its id (None to stop)."""
+        min_gap = 1.0 / self.max_rate if self.max_rate and self.max_rate > 0 else 0.0
+        with self._cond:
+            while not self._stopping:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, sid = self._heap[0]
+                now = time.monotonic()
+                ready_at = max(due, self._last_request + min_gap)
+                if ready_at > now:
+                    self._cond.wait(ready_at - now)
+                    continue
+                heapq.heappop(self._heap)
+                if sid not in self._tracked:
+                    continue
+                self._last_request = now
+                return sid
+        return None
+
+    def _reschedule(self, t: _Tracked, status: Optional[str]) -> None:
+        if status != t.last_status:
+            t.interval = self.initial_interval
+        else:
+            t.interval = min(t.interval * self.backoff, self.max_interval)
+        t.last_status = status
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + t.interval, next(self._seq), t.source_id))
+
+    def _finish(self, t: _Tracked, result: Optional[Dict[str, Any]] = None, exc: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self._tracked.pop(t.source_id, None)
+        t.span.set_attributes({"caller.status": t.last_status if result is None else result.get("status"), "caller.polls": t.polls})
+        if exc is not None:
+            t.span.record_exception(exc)
+        t.span.end()
+        try:
+            if exc is not None:
+                t.future.set_exception(exc)
+            else:
+                t.future.set_result(result)
+        except InvalidStateError:
+            # cancelled by the caller while the request was in flight
+            pass
+
+    def _run(self) -> None:
+        while True:
+            sid = self._next_due()
+            if sid is None:
+                return
+            with self._cond:
+                t = self._tracked.get(sid)
+            if t is None:
+                continue
+            if t.future.cancelled():
+                self._finish(t)
+                continue
+            t.polls += 1
+            self.requests_made += 1
+            try:
+                with tracing.use_span(t.span):
+                    result = self.uploader.check_source_status(sid)
+            except Exception as e:
+                logger.warning(f"Status request for {sid} failed: {e}")
+                result = {"ok": False, "status": None}
+            status = result.get("status") if result.get("ok") else None
+            if status in TERMINAL_STATUSES:
+                logger.info(f"Source {sid} {status} after {t.polls} polls")
+                result.pop("text", None)
+                self._finish(t, result=result)
+                continue
+            if time.monotonic() >= t.deadline:
+                self._finish(t, exc=TimeoutError(f"Timed out waiting for source {sid} status"))
+                continue
+            self._reschedule(t, status if result.get("ok") else t.last_status)
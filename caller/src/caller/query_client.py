@@ -1,11 +1,21 @@
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Optional, Dict, Any
 import json
-from time import time
+from time import time, perf_counter
 
-import requests
 
+from . import tracing
 from .config import default_config
+from .context_cache import ContextCache
+from .search_cache import SearchCache
+from .defaults import ModelDefaultsCache, defaults_cache_for, config_models, REQUIRED_FIELDS
+from .notebook_pool import NotebookPool
+from .sse import SSEStream
+from .streaming import AskStream
+from .verdict import VerdictDetector, parse_verdict
+from .transport import Transport
 
 logger = logging.getLogger("caller.query_client")
 logger.setLevel(logging.INFO)
@@ -15,16 +25,235 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 
 
+def _search_results(data: Any) -> List[Dict[str, Any]]:
+    """Unwrap a /search response into its list of hits."""
+    if isinstance(data, dict):
+        return data.get("results", [])
+    return data
+
+
+def _source_id_set(source_ids: List[str]) -> set:
+    """Source ids in both "source:<id>" and bare form, for matching search hits' parent_id."""
+    wanted = set()
+    for sid in source_ids:
+        sid = str(sid)
+        wanted.add(sid)
+        wanted.add(sid[len("source:"):] if sid.startswith("source:") else f"source:{sid}")
+    return wanted
+
+
+def _hit_key(hit: Dict[str, Any]) -> Any:
+    """Identity of a search hit: the chunk/record id within its parent source."""
+    return (hit.get("parent_id"), hit.get("id"))
+
+
+def _rrf_merge(ranked: Dict[str, List[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
+    """Reciprocal rank fusion of several ranked hit lists.
+
+    Each hit scores sum(1 / (k + rank)) over the lists it appears in (rank from 1; a duplicate
+    within one list counts at its best rank). Returns copies of the hits, best first, with
+    "rrf_score" and "<name>_rank" for every list that contained them.
+    """
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for name, hits in ranked.items():
+        seen = set()
+        for rank, hit in enumerate(hits, 1):
+            key = _hit_key(hit)
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = dict(hit, rrf_score=0.0)
+            entry["rrf_score"] += 1.0 / (k + rank)
+            entry[f"{name}_rank"] = rank
+    return sorted(fused.values(), key=lambda h: h["rrf_score"], reverse=True)
+
+
+def _ai_content(ev: Dict[str, Any]) -> Optional[str]:
+    """Return the text of an `ai_message` event, or None for any other event type."""
+    ev_type = ev.get("type") or ev.get("event") or "message"
+    if ev_type == "ai_message":
+        return ev.get("content") or ev.get("data") or ""
+    return None
+
+
+def _ask_simple_payload(prompt: str, defaults: Dict[str, Any], model_override: Optional[str] = None) -> Dict[str, Any]:
+    """Build the /search/ask/simple payload from server defaults and an optional override."""
+    strategy = defaults.get("default_transformation_model") or defaults.get("default_chat_model")
+    answer = defaults.get("default_chat_model")
+    final = defaults.get("default_chat_model")
+    ask_payload = {
+        "question": prompt,
+        "strategy_model": strategy,
+        "answer_model": answer,
+        "final_answer_model": final,
+    }
+    if model_override:
+        ask_payload["strategy_model"] = model_override
+        ask_payload["answer_model"] = model_override
+        ask_payload["final_answer_model"] = model_override
+    return ask_payload
+
+
+def _last_ai_answer(msgs: List[Dict[str, Any]]) -> str:
+    """Return the content of the last message if it came from the AI."""
+    if msgs:
+        last_msg = msgs[-1]
+        if last_msg.get("type") == "ai":
+            return last_msg.get("content", "")
+    return ""
+
+
+def _fan_out_result(answers: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """Merge per-source ask_many answers into the ask()-shaped result with a summary."""
+    ok = [a for a in answers if a["ok"]]
+    verdicts = [a["verdict"] for a in ok]
+    ttfts = [a["stream_stats"]["ttft_s"] for a in ok if a["stream_stats"]["ttft_s"] is not None]
+    summary = {
+        "sources": len(answers),
+        "ok": len(ok),
+        "failed": len(answers) - len(ok),
+        "yes": verdicts.count("YES"),
+        "no": verdicts.count("NO"),
+        "undetermined": verdicts.count(None),
+        "elapsed_s": round(elapsed, 3),
+        "ttft_s_min": min(ttfts) if ttfts else None,
+        "ttft_s_max": max(ttfts) if ttfts else None,
+    }
+    logger.info("Fan-out ask finished: %s", summary)
+    merged = "\n\n".join(f"### {a['source_id']}\n{a['answer']}" for a in ok)
+    return {"search_results": [], "total": len(ok), "answer": merged, "answers": answers, "summary": summary}
+
+
 class QueryClient:
     """Client to query the backend search/ask APIs using pre-embedded documents."""
 
-    def __init__(self, config=default_config):
+    def __init__(self, config=default_config, transport: Optional[Transport] = None, defaults_cache: Optional[ModelDefaultsCache] = None):
         self.base = config.api_base_url.rstrip("/")
         self.timeout = config.timeout_seconds
+        # shared pooled transport; create a private one when used standalone
+        self._owns_transport = transport is None
+        self.transport = transport or Transport(config)
+        # /models/defaults is cached process-wide; model ids set on the config take precedence
+        self.defaults_cache = defaults_cache or defaults_cache_for(self.base, ttl_seconds=config.defaults_ttl_seconds)
+        self._config_models = config_models(config)
+        # pooled notebooks/sessions for notebook_ask (None disables pooling)
+        self.notebook_pool: Optional[NotebookPool] = None
+        if config.notebook_pool:
+            self.notebook_pool = NotebookPool(self.transport, self.base, self.timeout, idle_seconds=config.notebook_pool_idle_seconds, reuse_sessions=config.notebook_pool_reuse_sessions)
+        # built /chat/context responses reused while the source is unchanged (None disables)
+        self.context_cache: Optional[ContextCache] = None
+        if config.context_cache_size > 0 or config.context_cache_path:
+            self.context_cache = ContextCache(config.context_cache_size, ttl_seconds=config.context_cache_ttl_seconds, path=config.context_cache_path)
+        # source-scoped vector_search over-fetch and a histogram of round trips per scoped query
+        self.overfetch_factor = max(2, config.search_overfetch_factor)
+        self.search_max_limit = config.search_max_limit
+        self.search_round_trips: Dict[int, int] = {}
+        # cached /search results keyed by normalized query + parameters (None disables)
+        self.search_cache: Optional[SearchCache] = None
+        if config.search_cache_size > 0 or config.search_cache_path:
+            self.search_cache = SearchCache(self.base, config.search_cache_size, ttl_seconds=config.search_cache_ttl_seconds, path=config.search_cache_path)
+        self._stats_lock = threading.Lock()
+        # independent notebook_ask stages (defaults, session creation) run on this pool, created on first use
+        self.stage_workers = config.notebook_ask_workers
+        self._stage_executor: Optional[ThreadPoolExecutor] = None
+        self._stage_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Delete pooled notebooks on the server and close the transport if this client created it."""
+        if self._stage_executor is not None:
+            self._stage_executor.shutdown(wait=True)
+            self._stage_executor = None
+        if self.notebook_pool is not None:
+            self.notebook_pool.close()
+        if self.context_cache is not None:
+            self.context_cache.close()
+        if self.search_cache is not None:
+            self.search_cache.close()
+        if self._owns_transport:
+            self.transport.close()
+
+    def _fetch_defaults(self) -> Dict[str, Any]:
+        durl = f"{self.base}/models/defaults"
+        logger.info("Fetching default models from %s", durl)
+        dresp = self.transport.get(durl, timeout=self.timeout)
+        dresp.raise_for_status()
+        return dresp.json() or {}
+
+    def get_defaults(self) -> Dict[str, Any]:
+        """Default model ids: config overrides on top of the cached /models/defaults response.
+
+        No request is made when the config sets both default_chat_model and default_transformation_model.
+        """
+        if all(f in self._config_models for f in REQUIRED_FIELDS):
+            return dict(self._config_models)
+        defaults = self.defaults_cache.get(self._fetch_defaults)
+        defaults.update(self._config_models)
+        return defaults
+
+    def _source_version(self, source_id: str) -> Optional[str]:
+        """The source's `updated` timestamp (None if it cannot be fetched)."""
+        url = f"{self.base}/sources/{source_id}"
+        try:
+            resp = self.transport.get(url, timeout=self.timeout)
+            resp.raise_for_status()
+            data = resp.json() or {}
+        except Exception as e:
+            logger.warning("Unable to fetch source %s for context cache: %s", source_id, e)
+            return None
+        version = data.get("updated") or data.get("created")
+        return str(version) if version else None
+
+    def _build_context(self, notebook_id: str, context_config: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /chat/context, served from the context cache while the referenced sources are unchanged."""
+        versions = None
+        if self.context_cache is not None:
+            versions = {sid: self._source_version(sid) for sid in context_config.get("sources", {})}
+            if all(versions.values()):
+                cached = self.context_cache.get(context_config, versions)
+                if cached is not None:
+                    logger.info("Context cache hit: token_count=%s char_count=%s", cached.get("token_count"), cached.get("char_count"))
+                    return cached
+            else:
+                versions = None
+
+        ctx_url = f"{self.base}/chat/context"
+        ctx_payload = {"notebook_id": notebook_id, "context_config": context_config}
+        logger.info("Building notebook context: POST %s", ctx_url)
+        ctx_resp = self.transport.post(ctx_url, json=ctx_payload, timeout=max(30, self.timeout))
+        ctx_resp.raise_for_status()
+        context_data = ctx_resp.json()
+        if versions is not None:
+            self.context_cache.put(context_config, versions, context_data)
+        return context_data
 
-    def vector_search(self, query: str, results: int = 10, minimum_score: float = 0.2) -> List[Dict[str, Any]]:
-        """Call the backend vector search via the generic /search endpoint. Returns list of hits."""
+    def _search(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """POST /search and return the list of hits (served from the search cache when enabled)."""
+        if self.search_cache is not None:
+            cached = self.search_cache.get(payload)
+            if cached is not None:
+                return cached
         url = f"{self.base}/search"
+        resp = self.transport.post(url, json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        hits = _search_results(resp.json())
+        if self.search_cache is not None:
+            self.search_cache.put(payload, hits)
+        return hits
+
+    def _record_round_trips(self, round_trips: int) -> None:
+        with self._stats_lock:
+            self.search_round_trips[round_trips] = self.search_round_trips.get(round_trips, 0) + 1
+
+    def vector_search(self, query: str, results: int = 10, minimum_score: float = 0.2, source_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Call the backend vector search via the generic /search endpoint. Returns list of hits.
+
+        With `source_ids` only hits from those sources are returned. /search cannot filter by source,
+        so the limit starts at results * search_overfetch_factor and grows by that factor until
+        `results` matching hits are found, the server runs out of hits, or search_max_limit is reached.
+        Round trips per scoped query are counted in `search_round_trips` ({round_trips: queries}).
+        """
         payload = {
             "query": query,
             "type": "vector",
@@ -34,15 +263,24 @@ class QueryClient:
             "minimum_score": minimum_score,
         }
         logger.info("Running vector search (via /search) for: %s", query)
-        resp = requests.post(url, json=payload, timeout=self.timeout)
-        resp.raise_for_status()
-        data = resp.json()
-        if isinstance(data, dict):
-            return data.get("results", [])
-        return data
+        if not source_ids:
+            return self._search(payload)
+
+        wanted = _source_id_set(source_ids)
+        limit = min(max(results * self.overfetch_factor, results), self.search_max_limit)
+        round_trips = 0
+        while True:
+            hits = self._search(dict(payload, limit=limit))
+            round_trips += 1
+            matched = [h for h in hits if h.get("parent_id") in wanted or h.get("id") in wanted]
+            if len(matched) >= results or len(hits) < limit or limit >= self.search_max_limit:
+                break
+            limit = min(limit * self.overfetch_factor, self.search_max_limit)
+        self._record_round_trips(round_trips)
+        logger.info("Scoped vector search: %d/%d hits from %d source(s) after %d round trip(s) (limit %d)", min(len(matched), results), results, len(wanted), round_trips, limit)
+        return matched[:results]
 
     def text_search(self, query: str, results: int = 10) -> List[Dict[str, Any]]:
-        url = f"{self.base}/search"
         payload = {
             "query": query,
             "type": "text",
@@ -51,211 +289,384 @@ class QueryClient:
             "search_notes": False,
         }
         logger.info("Running text search (via /search) for: %s", query)
-        resp = requests.post(url, json=payload, timeout=self.timeout)
-        resp.raise_for_status()
-        data = resp.json()
-        if isinstance(data, dict):
-            return data.get("results", [])
-        return data
+        return self._search(payload)
 
-    def ask(self, prompt: str, source_ids: Optional[List[str]] = None, model_override: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+    def hybrid_search(self, query: str, results: int = 10, minimum_score: float = 0.2, candidates: Optional[int] = None, k: int = 60) -> List[Dict[str, Any]]:
+        """Vector and text search run concurrently and merged with reciprocal rank fusion.
+
+        Each search fetches `candidates` hits (default 2 * results); hits are deduplicated per
+        (parent_id, id) and the top `results` are returned with "rrf_score", "vector_rank" and
+        "text_rank" (for the lists they appeared in). Exact product names that vector search ranks
+        poorly are lifted by the text ranking, and latency is that of the slower query.
+        """
+        fetch = candidates or results * 2
+        text_f = self._stage_pool().submit(tracing.wrap(self.text_search), query, fetch)
+        try:
+            vector_hits = self.vector_search(query, results=fetch, minimum_score=minimum_score)
+        except BaseException:
+            # surface the vector error, not the text query's; don't wait on a result we discard
+            text_f.cancel()
+            raise
+        text_hits = text_f.result()
+        merged = _rrf_merge({"vector": vector_hits, "text": text_hits}, k=k)
+        logger.info("Hybrid search: %d vector + %d text hits -> %d fused", len(vector_hits), len(text_hits), len(merged))
+        return merged[:results]
+
+    def ask(self, prompt: str, source_ids: Optional[List[str]] = None, model_override: Optional[str] = None, limit: int = 20, fan_out: bool = False, concurrency: int = 8) -> Dict[str, Any]:
         """High-level ask helper.
 
-        If `source_ids` is provided we perform a vector search and then client-side filter results to those sources.
-        Otherwise we call the ask/simple endpoint using default models fetched from /models/defaults.
+        If `source_ids` is provided the first source is asked through its chat session and the streamed
+        answer is collected (see ask_stream to consume chunks as they arrive). With fan_out=True every
+        listed source is asked concurrently instead (see ask_many). Otherwise we call the ask/simple endpoint using default models fetched from /models/defaults.
         """
 
+        if source_ids and fan_out:
+            return self.ask_many(prompt, source_ids, model_override=model_override, concurrency=concurrency)
         if source_ids:
             # Use the source-chat session endpoints (create session + stream messages)
-            # Pick the first provided source_id and create a session for it.
-            src = source_ids[0]
-            source_id = src if str(src).startswith("source:") else f"{src}"
+            with self.ask_stream(prompt, source_ids, model_override=model_override) as stream:
+                for _ in stream:
+                    pass
+            return {"search_results": [], "total": len(stream.chunks), "answer": stream.answer, "events": stream.events, "stream_stats": stream.stats()}
+
+        # default models (cached)
+        defaults = self.get_defaults()
+
+        ask_url = f"{self.base}/search/ask/simple"
+        ask_payload = _ask_simple_payload(prompt, defaults, model_override)
+
+        logger.info("Sending ask/simple request to backend (strategy=%s)", ask_payload.get("strategy_model"))
+        resp = self.transport.post(ask_url, json=ask_payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _open_source_stream(self, prompt: str, source_id: str, model_override: Optional[str]) -> SSEStream:
+        """Create a source chat session; return the SSE stream that POSTs the message when iterated."""
+        # Default models (cached) to use for session/message if no override provided
+        defaults = self.get_defaults()
+
+        strategy_model = model_override or defaults.get("default_transformation_model") or defaults.get("default_chat_model")
+
+        create_url = f"{self.base}/sources/{source_id}/chat/sessions"
+        payload = {"source_id": source_id, "title": f"query-{int(time())}", "model_override": strategy_model}
+        logger.info("Creating source chat session: %s -> %s", create_url, payload)
+        try:
+            cresp = self.transport.post(create_url, json=payload, timeout=self.timeout)
+            cresp.raise_for_status()
+            session = cresp.json()
+            session_id = session.get("id")
+        except Exception as e:
+            logger.error("Failed to create source chat session: %s %s", getattr(e, 'response', None), e)
+            raise
+
+        # Send message to session and stream the SSE response
+        stream_url = f"{self.base}/sources/{source_id}/chat/sessions/{session_id}/messages"
+        stream_payload = {"message": prompt}
+        # prefer explicit model_override, else use server default if available
+        if strategy_model:
+            stream_payload["model_override"] = strategy_model
 
-            # Fetch default models from server to use for session/message if no override provided
-            defaults = {}
+        def connect(headers: Dict[str, str]):
+            logger.info("Posting message (stream) to %s", stream_url)
+            metrics = getattr(self.transport, "metrics", None)
+            if metrics is not None and "Last-Event-ID" in headers:
+                metrics.record_retry("POST", stream_url)
+            r = self.transport.post(stream_url, json=stream_payload, headers=headers, stream=True, timeout=max(60, self.timeout))
             try:
-                durl = f"{self.base}/models/defaults"
-                logger.info("Fetching default models from %s", durl)
-                dresp = requests.get(durl, timeout=self.timeout)
-                dresp.raise_for_status()
-                defaults = dresp.json() or {}
+                r.raise_for_status()
             except Exception:
-                logger.info("Unable to fetch /models/defaults; proceeding without defaults")
+                logger.error("Streaming request failed: %s %s", r.status_code, r.text)
+                r.close()
+                raise
+            return r
+
+        return SSEStream(connect)
+
+    def ask_stream(self, prompt: str, source_ids: List[str], model_override: Optional[str] = None) -> AskStream:
+        """Stream the answer of a source-chat ask, yielding `ai_message` chunks as they arrive.
 
-            strategy_model = model_override or defaults.get("default_transformation_model") or defaults.get("default_chat_model")
+        Nothing is sent until iteration starts. The returned AskStream also exposes `answer`,
+        `events`, `ttft` (seconds to the first chunk) and `total_seconds` / `stats()`:
 
-            create_url = f"{self.base}/sources/{source_id}/chat/sessions"
-            payload = {"source_id": source_id, "title": f"query-{int(time())}", "model_override": strategy_model}
-            logger.info("Creating source chat session: %s -> %s", create_url, payload)
+            with qc.ask_stream("Are soakage pits shown?", [source_id]) as stream:
+                for chunk in stream:
+                    print(chunk, end="", flush=True)
+            print(stream.stats())
+        """
+        if not source_ids:
+            raise ValueError("ask_stream requires at least one source id")
+        # Pick the first provided source_id, as ask() does
+        src = source_ids[0]
+        source_id = src if str(src).startswith("source:") else f"{src}"
+        return AskStream(lambda: self._open_source_stream(prompt, source_id, model_override), _ai_content)
+
+    def _ask_one_source(self, prompt: str, source_id: str, model_override: Optional[str]) -> Dict[str, Any]:
+        """Stream one source's answer for ask_many (never raises)."""
+        result: Dict[str, Any] = {"source_id": source_id, "ok": False, "answer": "", "verdict": None, "stream_stats": None, "error": None}
+        with tracing.span("ask_source", source_id=source_id) as span:
             try:
-                cresp = requests.post(create_url, json=payload, timeout=self.timeout)
-                cresp.raise_for_status()
-                session = cresp.json()
-                session_id = session.get("id")
+                with self.ask_stream(prompt, [source_id], model_override=model_override) as stream:
+                    for _ in stream:
+                        pass
+                result.update(ok=True, answer=stream.answer, verdict=parse_verdict(stream.answer), stream_stats=stream.stats())
             except Exception as e:
-                logger.error("Failed to create source chat session: %s %s", getattr(e, 'response', None), e)
-                raise
+                logger.warning("Ask on %s failed: %s", source_id, e)
+                result["error"] = str(e)
+                span.set_status("ERROR", str(e))
+        return result
 
-            # Send message to session and stream SSE-like response (text lines)
-            stream_url = f"{self.base}/sources/{source_id}/chat/sessions/{session_id}/messages"
-            stream_payload = {"message": prompt}
-            # prefer explicit model_override, else use server default if available
-            if model_override:
-                stream_payload["model_override"] = model_override
-            elif strategy_model:
-                stream_payload["model_override"] = strategy_model
+    def ask_many(self, prompt: str, source_ids: List[str], model_override: Optional[str] = None, concurrency: int = 8) -> Dict[str, Any]:
+        """Ask `prompt` of every source in `source_ids`, streaming up to `concurrency` answers at once.
 
-            logger.info("Posting message (stream) to %s", stream_url)
-            events: List[Dict[str, Any]] = []
-            ai_chunks: List[str] = []
-            with requests.post(stream_url, json=stream_payload, stream=True, timeout=max(60, self.timeout)) as r:
-                try:
-                    r.raise_for_status()
-                except Exception:
-                    logger.error("Streaming request failed: %s %s", r.status_code, r.text)
-                    raise
-
-                for raw in r.iter_lines(decode_unicode=True):
-                    if not raw:
-                        continue
-                    line = raw.strip()
-                    if line.startswith("data:"):
-                        body = line[len("data:"):].strip()
-                    else:
-                        body = line
-                    try:
-                        ev = json.loads(body)
-                    except Exception:
-                        # plain text chunk
-                        events.append({"type": "text", "text": body})
-                        continue
-
-                    events.append(ev)
-                    ev_type = ev.get("type") or ev.get("event") or "message"
-                    if ev_type == "ai_message":
-                        content = ev.get("content") or ev.get("data") or ""
-                        ai_chunks.append(content)
-
-            answer_text = "".join(ai_chunks)
-            return {"search_results": [], "total": len(ai_chunks), "answer": answer_text, "events": events}
-
-        # fetch default models
-        defaults_url = f"{self.base}/models/defaults"
+        Each source gets its own source-chat session. One failing source does not fail the others.
+
+        Returns dict with keys:
+          - answers: per-source dicts in input order (source_id, ok, answer, verdict, stream_stats, error)
+          - answer: merged text, one "### <source_id>" section per answered source
+          - total: number of answered sources, search_results: [] (same shape as ask())
+          - summary: {sources, ok, failed, yes, no, undetermined, elapsed_s, ttft_s_min, ttft_s_max}
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        ids = list(dict.fromkeys(source_ids))
+        start = perf_counter()
+        if not ids:
+            answers: List[Dict[str, Any]] = []
+        else:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(ids)), thread_name_prefix="caller-ask") as pool:
+                answers = list(pool.map(tracing.wrap(lambda sid: self._ask_one_source(prompt, sid, model_override)), ids))
+        return _fan_out_result(answers, perf_counter() - start)
+
+    def ask_verdict(self, prompt: str, source_ids: List[str], model_override: Optional[str] = None, keep_reading: bool = False) -> Dict[str, Any]:
+        """Ask a YES/NO question and return as soon as the streamed answer's verdict is known.
+
+        With keep_reading=False the stream is closed once the verdict is decided (the backend stops
+        generating if it aborts on client disconnect). With keep_reading=True the rest of the
+        explanation is read on a background thread and `full_answer` is a Future resolving to it.
+
+        Returns dict with keys:
+          - verdict ("YES", "NO" or None if the answer did not open with one), answer (text read so far)
+          - verdict_s (seconds to verdict), complete (stream fully read), stream_stats, full_answer (Future or None)
+        """
+        stream = self.ask_stream(prompt, source_ids, model_override=model_override)
+        detector = VerdictDetector()
+        verdict_at = None
         try:
-            dresp = requests.get(defaults_url, timeout=self.timeout)
-            dresp.raise_for_status()
-            defaults = dresp.json()
-        except Exception:
-            defaults = {}
+            for chunk in stream:
+                if detector.feed(chunk) is not None:
+                    verdict_at = perf_counter()
+                    break
+            else:
+                if detector.finish() is not None:
+                    verdict_at = perf_counter()
+        except BaseException:
+            stream.close()
+            raise
 
-        strategy = defaults.get("default_transformation_model") or defaults.get("default_chat_model")
-        answer = defaults.get("default_chat_model")
-        final = defaults.get("default_chat_model")
+        complete = stream.finished_at is not None
+        verdict_s = round(verdict_at - stream.started_at, 4) if verdict_at is not None else None
+        if detector.verdict is None:
+            logger.info("Answer did not open with YES/NO (%d chars read)", len(stream.answer))
+        else:
+            logger.info("Verdict %s after %d chars (%ss)", detector.verdict, detector.decided_at, verdict_s)
+        full_answer: Optional[Future] = None
+        if not complete and keep_reading:
+            full_answer = Future()
 
-        ask_url = f"{self.base}/search/ask/simple"
-        ask_payload = {
-            "question": prompt,
-            "strategy_model": strategy,
-            "answer_model": answer,
-            "final_answer_model": final,
-        }
-        if model_override:
-            ask_payload["strategy_model"] = model_override
-            ask_payload["answer_model"] = model_override
-            ask_payload["final_answer_model"] = model_override
+            def drain():
+                try:
+                    for _ in stream:
+                        pass
+                    full_answer.set_result(stream.answer)
+                except BaseException as e:
+                    full_answer.set_exception(e)
+                finally:
+                    stream.close()
 
-        logger.info("Sending ask/simple request to backend (strategy=%s)", ask_payload.get("strategy_model"))
-        resp = requests.post(ask_url, json=ask_payload, timeout=self.timeout)
-        resp.raise_for_status()
-        return resp.json()
+            threading.Thread(target=drain, name="caller-verdict-drain", daemon=True).start()
+        elif not complete:
+            stream.close()
+        return {
+            "verdict": detector.verdict,
+            "answer": stream.answer,
+            "verdict_s": verdict_s,
+            "complete": complete,
+            "stream_stats": stream.stats(),
+            "full_answer": full_answer,
+        }
 
-    def notebook_ask(self, source_id: str, message: str, model_override: Optional[str] = None, notebook_id: Optional[str] = None, session_id: Optional[str] = None) -> Dict[str, Any]:
+    def notebook_ask(self, source_id: str, message: str, model_override: Optional[str] = None, notebook_id: Optional[str] = None, session_id: Optional[str] = None, new_session: bool = False) -> Dict[str, Any]:
         """
         Run the notebook (search->transform->chat) pipeline scoped to a single source.
         This replicates the frontend "Chat with Notebook" flow:
-          1. Fetch default models from /models/defaults
+          1. Fetch default models from /models/defaults (cached, see get_defaults)
           2. Create a temporary notebook (if notebook_id not provided)
           3. Link the source to the notebook
           4. Build context via POST /chat/context with context_config mapping source to 'full content'
+             (skipped when the context cache holds a build for the source's current `updated` version)
           5. Create a notebook chat session (if session_id not provided)
           6. Execute chat via POST /chat/execute with the built context and model_override
-        
+
+        When the notebook pool is enabled (config.notebook_pool) and no notebook_id is given,
+        steps 2 and 3 are served by a pooled notebook for this source, so repeat questions skip
+        those POSTs and no orphan notebooks are left behind. Each ask still opens its own chat
+        session (5), deleted once answered, so answers never see earlier questions, unless
+        config.notebook_pool_reuse_sessions pools the session too; new_session=True opens a fresh
+        session even then (evaluate_matrix uses it so no cell sees another cell's history).
+
+        Independent stages overlap: defaults (1) and session creation (5) run in the background
+        while the notebook is linked and its context built (3, 4); execute (6) waits for all three.
+
         Returns dict with keys:
           - notebook_id, session_id, messages (list), ai_answer (str, last AI message content)
+          - timings: seconds per stage that ran (defaults, notebook, link, context, session, execute) and total
         """
-        # 1) Fetch default models
-        defaults = {}
-        try:
-            durl = f"{self.base}/models/defaults"
-            logger.info("Fetching default models from %s", durl)
-            dresp = requests.get(durl, timeout=self.timeout)
-            dresp.raise_for_status()
-            defaults = dresp.json() or {}
-            logger.info("Server models: chat=%s, transformation=%s", defaults.get("default_chat_model"), defaults.get("default_transformation_model"))
-        except Exception as e:
-            logger.warning("Unable to fetch /models/defaults: %s", e)
-
-        # 2) Create notebook if not provided
-        if not notebook_id:
-            nb_url = f"{self.base}/notebooks"
-            nb_payload = {"name": f"temp-notebook-{int(time())}", "description": "Temporary notebook for source-scoped query"}
-            logger.info("Creating notebook: POST %s", nb_url)
-            nb_resp = requests.post(nb_url, json=nb_payload, timeout=self.timeout)
-            nb_resp.raise_for_status()
-            notebook_id = nb_resp.json().get("id")
-            logger.info("Created notebook: %s", notebook_id)
-
-        # 3) Link source to notebook
+        with tracing.span("notebook_ask", source_id=source_id) as span:
+            lease = None
+            if not notebook_id and self.notebook_pool is not None:
+                lease = self.notebook_pool.acquire([source_id])
+                notebook_id = lease.notebook_id
+                if not new_session:
+                    session_id = session_id or lease.session_id
+                span.set_attribute("caller.pooled", True)
+            try:
+                result = self._notebook_ask(source_id, message, model_override, notebook_id, session_id)
+                if lease is not None and session_id is None:
+                    # the session this ask opened is not reused: delete it now rather than piling up
+                    self.notebook_pool.retire_session(lease, result.get("session_id"))
+                return result
+            except Exception as e:
+                if lease is not None and getattr(getattr(e, "response", None), "status_code", None) == 404:
+                    # pooled notebook/session vanished server-side: drop it so the next ask starts clean
+                    self.notebook_pool.discard(lease)
+                    lease = None
+                raise
+            finally:
+                if lease is not None:
+                    self.notebook_pool.release(lease)
+
+    def _stage_pool(self) -> ThreadPoolExecutor:
+        if self._stage_executor is None:
+            with self._stage_lock:
+                if self._stage_executor is None:
+                    self._stage_executor = ThreadPoolExecutor(max_workers=self.stage_workers, thread_name_prefix="caller-nb-stage")
+        return self._stage_executor
+
+    def _create_notebook(self) -> str:
+        nb_url = f"{self.base}/notebooks"
+        nb_payload = {"name": f"temp-notebook-{int(time())}", "description": "Temporary notebook for source-scoped query"}
+        logger.info("Creating notebook: POST %s", nb_url)
+        nb_resp = self.transport.post(nb_url, json=nb_payload, timeout=self.timeout)
+        nb_resp.raise_for_status()
+        notebook_id = nb_resp.json().get("id")
+        logger.info("Created notebook: %s", notebook_id)
+        return notebook_id
+
+    def _link_source(self, notebook_id: str, source_id: str) -> None:
+        # skipped if this client already linked it
+        if self.notebook_pool is not None:
+            self.notebook_pool.link(notebook_id, source_id)
+            return
         link_url = f"{self.base}/notebooks/{notebook_id}/sources/{source_id}"
         logger.info("Linking source to notebook: POST %s", link_url)
-        lresp = requests.post(link_url, timeout=self.timeout)
+        lresp = self.transport.post(link_url, timeout=self.timeout)
         lresp.raise_for_status()
 
-        # 4) Build context via /chat/context (this runs transformation model)
-        context_config = {"sources": {source_id: "full content"}, "notes": {}}
-        ctx_url = f"{self.base}/chat/context"
-        ctx_payload = {"notebook_id": notebook_id, "context_config": context_config}
-        logger.info("Building notebook context: POST %s", ctx_url)
-        ctx_resp = requests.post(ctx_url, json=ctx_payload, timeout=max(30, self.timeout))
-        ctx_resp.raise_for_status()
-        context_data = ctx_resp.json()
-        built_context = context_data.get("context")
-        logger.info("Context built: token_count=%s char_count=%s", context_data.get("token_count"), context_data.get("char_count"))
-
-        # 5) Create notebook chat session if not provided
-        if not session_id:
-            sess_url = f"{self.base}/chat/sessions"
-            sess_payload = {"notebook_id": notebook_id, "title": f"nb-session-{int(time())}"}
-            logger.info("Creating notebook session: POST %s", sess_url)
-            sresp = requests.post(sess_url, json=sess_payload, timeout=self.timeout)
-            sresp.raise_for_status()
-            session_id = sresp.json().get("id")
-            logger.info("Created notebook session: %s", session_id)
-
-        # 6) Execute chat via /chat/execute with built context
-        exec_url = f"{self.base}/chat/execute"
-        exec_payload = {
-            "session_id": session_id,
-            "message": message,
-            "context": built_context,
-            "model_override": model_override or defaults.get("default_chat_model")
-        }
-        logger.info("Executing chat (POST %s) with chat_model=%s", exec_url, exec_payload.get("model_override"))
-        exec_resp = requests.post(exec_url, json=exec_payload, timeout=max(60, self.timeout))
-        exec_resp.raise_for_status()
-        resp_data = exec_resp.json()
+    def _discard_session(self, session_f: Future) -> None:
+        """Wait for a session creation started by a failed notebook_ask and delete what it created."""
+        try:
+            session_id = session_f.result()
+            resp = self.transport.delete(f"{self.base}/chat/sessions/{session_id}", timeout=self.timeout)
+            if not resp.ok and resp.status_code != 404:
+                logger.warning("Cleanup DELETE of session %s returned %s", session_id, resp.status_code)
+        except Exception as e:
+            logger.warning("Cleanup of notebook_ask session failed: %s", e)
+
+    def _create_session(self, notebook_id: str) -> str:
+        sess_url = f"{self.base}/chat/sessions"
+        sess_payload = {"notebook_id": notebook_id, "title": f"nb-session-{int(time())}"}
+        logger.info("Creating notebook session: POST %s", sess_url)
+        sresp = self.transport.post(sess_url, json=sess_payload, timeout=self.timeout)
+        sresp.raise_for_status()
+        session_id = sresp.json().get("id")
+        logger.info("Created notebook session: %s", session_id)
+        return session_id
+
+    def _notebook_ask(self, source_id: str, message: str, model_override: Optional[str], notebook_id: Optional[str], session_id: Optional[str]) -> Dict[str, Any]:
+        # Stage dependencies: execute <- (defaults, context, session); context <- link <- notebook;
+        # session <- notebook. Defaults and session creation run on the stage pool while this
+        # thread walks the notebook -> link -> context chain, so latency is the critical path.
+        timings: Dict[str, float] = {}
+        started = perf_counter()
+
+        def timed(stage: str, fn, *args):
+            t0 = perf_counter()
+            try:
+                with tracing.span(f"notebook_ask.{stage}"):
+                    return fn(*args)
+            finally:
+                timings[stage] = round(perf_counter() - t0, 4)
+
+        pool = self._stage_pool()
+        # stages submitted to the pool keep this thread's trace context
+        traced = tracing.wrap(timed)
+        # 1) Default models (served from the process-wide cache)
+        defaults_f = pool.submit(traced, "defaults", self.get_defaults)
+
+        session_f: Optional[Future] = None
+        try:
+            # 2) Create notebook if not provided
+            if not notebook_id:
+                notebook_id = timed("notebook", self._create_notebook)
+
+            # 5) Create notebook chat session if not provided (only needs the notebook)
+            session_f = pool.submit(traced, "session", self._create_session, notebook_id) if not session_id else None
+
+            # 3) Link source to notebook
+            timed("link", self._link_source, notebook_id, source_id)
+
+            # 4) Build context via /chat/context (this runs transformation model; cached per source version)
+            context_config = {"sources": {source_id: "full content"}, "notes": {}}
+            context_data = timed("context", self._build_context, notebook_id, context_config)
+            built_context = context_data.get("context")
+            logger.info("Context built: token_count=%s char_count=%s", context_data.get("token_count"), context_data.get("char_count"))
+
+            defaults = defaults_f.result()
+            if session_f is not None:
+                session_id = session_f.result()
+
+            # 6) Execute chat via /chat/execute with built context
+            exec_url = f"{self.base}/chat/execute"
+            exec_payload = {
+                "session_id": session_id,
+                "message": message,
+                "context": built_context,
+                "model_override": model_override or defaults.get("default_chat_model")
+            }
+            logger.info("Executing chat (POST %s) with chat_model=%s", exec_url, exec_payload.get("model_override"))
+            t0 = perf_counter()
+            with tracing.span("notebook_ask.execute"):
+                exec_resp = self.transport.post(exec_url, json=exec_payload, timeout=max(60, self.timeout))
+                exec_resp.raise_for_status()
+                resp_data = exec_resp.json()
+        except BaseException:
+            # don't leave stage work running behind the error: cancel what has not started, and
+            # delete a session that was (or is being) created so it is not orphaned on the server
+            defaults_f.cancel()
+            if session_f is not None and not session_f.cancel():
+                self._discard_session(session_f)
+            raise
+        timings["execute"] = round(perf_counter() - t0, 4)
+        timings["total"] = round(perf_counter() - started, 4)
 
         # Extract AI answer from messages
         msgs = resp_data.get("messages", [])
-        ai_answer = ""
-        if msgs:
-            last_msg = msgs[-1]
-            if last_msg.get("type") == "ai":
-                ai_answer = last_msg.get("content", "")
+        ai_answer = _last_ai_answer(msgs)
 
         return {
             "notebook_id": notebook_id,
             "session_id": session_id,
             "messages": msgs,
-            "ai_answer": ai_answer
+            "ai_answer": ai_answer,
+            "timings": timings,
         }
@@ -0,0 +1,49 @@
+import unicodedata
+from typing import Optional, List, Dict, Any
+
+from .cache import LRUCache, SqliteCache, TieredCache, make_key, MISSING
+
+# /search payload fields that change the result set; the query text is normalized separately
+KEY_FIELDS = ("type", "limit", "minimum_score", "search_sources", "search_notes")
+
+
+def normalize_query(query: str) -> str:
+    """NFC-normalize and collapse whitespace. Case is kept: embeddings are case-sensitive."""
+    return " ".join(unicodedata.normalize("NFC", query).split())
+
+
+class SearchCache:
+    """LRU/TTL cache of /search results with an optional SQLite tier shared across processes.
+
+    Keyed by API base URL, normalized query and the search parameters in KEY_FIELDS. Entries
+    expire after `ttl_seconds`: until then results may miss sources embedded since they were
+    cached (clear() after ingesting to see them at once). Off unless CallerConfig.search_cache_size is set.
+    """
+
+    def __init__(self, base: str, max_entries: int = 256, ttl_seconds: Optional[float] = 300.0, path: Optional[str] = None):
+        self.base = base.rstrip("/")
+        disk = SqliteCache(path, "search", ttl_seconds=ttl_seconds, max_entries=max_entries * 16) if path else None
+        self._cache = TieredCache(LRUCache(max_entries, ttl_seconds=ttl_seconds), disk)
+
+    def key(self, payload: Dict[str, Any]) -> str:
+        params = {f: payload.get(f) for f in KEY_FIELDS}
+        return make_key("search", self.base, normalize_query(payload.get("query", "")), params)
+
+    def get(self, payload: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        hits = self._cache.get(self.key(payload))
+        if hits is MISSING:
+            return None
+        # callers annotate hits in place (e.g. hybrid ranks); hand out copies
+        return [dict(h) for h in hits]
+
+    def put(self, payload: Dict[str, Any], hits: List[Dict[str, Any]]) -> None:
+        self._cache.set(self.key(payload), [dict(h) for h in hits])
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def close(self) -> None:
+        self._cache.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
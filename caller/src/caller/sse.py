@@ -0,0 +1,320 @@
+"""Incremental Server-Sent Events decoding.
+
+SSEDecoder works on raw bytes as they arrive off the socket and implements the
+text/event-stream framing: `data:` lines (several per event are joined with "\\n"),
+`event:`, `id:`, `retry:`, comment lines, and LF / CRLF / CR line endings, including
+ones split across reads. Event payloads stay bytes until asked for, and JSON is only
+parsed when `SSEEvent.json()` / `as_dict()` is called.
+
+For compatibility with the open-notebook chat endpoints (and the line-based reader this
+replaced), any other line that is not an SSE field or comment - bare NDJSON, or plain text
+without a `data:` prefix - is emitted as an event of its own; as_dict() turns plain text
+into {"type": "text", "text": ...}.
+
+SSEStream / AsyncSSEStream add reconnection: if the connection drops after the
+server has sent an event id, the request is re-issued with a `Last-Event-ID` header
+and decoding continues. Without an id there is nothing to resume from (and
+re-sending a chat message would ask the question twice), so the error is raised.
+"""
+import json
+import logging
+import time
+from typing import Optional, List, Dict, Any, Callable, Iterator, AsyncIterator
+
+import requests
+import urllib3
+
+logger = logging.getLogger("caller.sse")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+_BOM = b"\xef\xbb\xbf"
+# JSONDecoder.raw_decode on str skips json.loads' argument checks and bytes encoding sniffing
+_raw_decode = json.JSONDecoder().raw_decode
+
+
+class SSEEvent:
+    """One dispatched event. `data` is decoded text; `json()` parses (and caches) the payload."""
+
+    __slots__ = ("event", "id", "retry", "raw", "_data", "_json")
+
+    _UNSET = object()
+
+    def __init__(self, raw: bytes, event: str = "message", id: Optional[str] = None, retry: Optional[int] = None):
+        self.raw = raw
+        self.event = event
+        self.id = id
+        self.retry = retry
+        self._data: Optional[str] = None
+        self._json: Any = SSEEvent._UNSET
+
+    @property
+    def data(self) -> str:
+        if self._data is None:
+            self._data = self.raw.decode("utf-8", errors="replace")
+        return self._data
+
+    def json(self) -> Any:
+        """The payload parsed as JSON (raises ValueError if it is not JSON)."""
+        if self._json is SSEEvent._UNSET:
+            text = self.data.strip()
+            value, end = _raw_decode(text)
+            if end != len(text):
+                raise ValueError(f"extra data after JSON value at char {end}")
+            self._json = value
+        return self._json
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Payload as an event dict: the JSON object, or {"type": "text", "text": data} for plain text.
+
+        A non-default `event:` name is added as "event" when the object does not carry one.
+        """
+        try:
+            value = self.json()
+        except ValueError:
+            value = None
+        if not isinstance(value, dict):
+            return {"type": "text", "text": self.data.strip()}
+        if self.event != "message" and "event" not in value:
+            value = dict(value, event=self.event)
+        return value
+
+    def __repr__(self) -> str:
+        return f"SSEEvent(event={self.event!r}, id={self.id!r}, data={self.data[:60]!r})"
+
+
+class SSEDecoder:
+    """Incremental text/event-stream parser: feed(bytes) -> [SSEEvent, ...]."""
+
+    def __init__(self):
+        self._buf = b""
+        self._started = False
+        self._cr_pending = False
+        self._data: List[bytes] = []
+        self._event: Optional[str] = None
+        self.last_event_id: Optional[str] = None
+        self.retry: Optional[int] = None  # reconnection delay in ms, as sent by the server
+
+    def reset(self) -> None:
+        """Drop any partially received event (e.g. before reconnecting); keeps last_event_id/retry."""
+        self._buf = b""
+        self._cr_pending = False
+        self._data = []
+        self._event = None
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        if not chunk:
+            return []
+        buf = self._buf + chunk if self._buf else chunk
+        if not self._started:
+            if len(buf) < len(_BOM) and _BOM.startswith(buf):
+                self._buf = buf
+                return []
+            if buf.startswith(_BOM):
+                buf = buf[len(_BOM):]
+            self._started = True
+        if self._cr_pending:
+            # the previous read ended in CR: an LF at the start of this one completes a CRLF
+            self._cr_pending = False
+            if buf.startswith(b"\n"):
+                buf = buf[1:]
+        if b"\r" in buf:
+            self._cr_pending = buf.endswith(b"\r")
+            buf = buf.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        lines = buf.split(b"\n")
+        self._buf = lines.pop()
+        events: List[SSEEvent] = []
+        data = self._data
+        for line in lines:
+            # fast path for the two lines every event has; everything else goes through _line
+            if line[:5] == b"data:":
+                data.append(line[6:] if line[5:6] == b" " else line[5:])
+            elif not line:
+                if data:
+                    raw = data[0] if len(data) == 1 else b"\n".join(data)
+                    events.append(SSEEvent(raw, self._event or "message", self.last_event_id, self.retry))
+                    data.clear()
+                self._event = None
+            else:
+                self._line(line, events)
+        return events
+
+    def flush(self) -> List[SSEEvent]:
+        """End of stream: process a final unterminated line and dispatch a pending event."""
+        events: List[SSEEvent] = []
+        if self._buf:
+            line, self._buf = self._buf, b""
+            self._line(line, events)
+        self._dispatch(events)
+        return events
+
+    def _dispatch(self, events: List[SSEEvent]) -> None:
+        if self._data:
+            raw = self._data[0] if len(self._data) == 1 else b"\n".join(self._data)
+            events.append(SSEEvent(raw, self._event or "message", self.last_event_id, self.retry))
+            self._data.clear()
+        self._event = None
+
+    def _line(self, line: bytes, events: List[SSEEvent]) -> None:
+        if not line:
+            self._dispatch(events)
+            return
+        if line[0] == 0x3A:  # ":" comment / keep-alive
+            return
+        colon = line.find(b":")
+        if colon == -1:
+            field, value = line, b""
+        else:
+            field = line[:colon]
+            value = line[colon + 2:] if line[colon + 1:colon + 2] == b" " else line[colon + 1:]
+        if field == b"data":
+            self._data.append(value)
+        elif field == b"event":
+            self._event = value.decode("utf-8", errors="replace")
+        elif field == b"id":
+            if b"\0" not in value:
+                self.last_event_id = value.decode("utf-8", errors="replace")
+        elif field == b"retry":
+            if value.isdigit():
+                self.retry = int(value)
+        else:
+            # not an SSE field: a bare NDJSON or plain text line is an event by itself
+            body = line.strip()
+            if body:
+                self._dispatch(events)
+                events.append(SSEEvent(body, "message", self.last_event_id, self.retry))
+
+
+def iter_chunks(response, chunk_size: int = 64 << 10) -> Iterator[bytes]:
+    """Yield body bytes of a streaming requests.Response as soon as they arrive.
+
+    requests' iter_lines()/iter_content(n) block until n bytes are buffered, which holds back
+    small events on non-chunked responses; read1() returns whatever is available. Bodies sent
+    with Content-Encoding gzip/deflate are decoded (requests opens the raw stream undecoded).
+    """
+    read1 = getattr(getattr(response, "raw", None), "read1", None)
+    if read1 is None:
+        # urllib3 < 2: per-transfer-chunk reads are the best available
+        yield from response.iter_content(chunk_size=None)
+        return
+    while True:
+        data = read1(chunk_size, decode_content=True)
+        if not data:
+            return
+        yield data
+
+
+def iter_sse(response, decoder: Optional[SSEDecoder] = None) -> Iterator[SSEEvent]:
+    """Events of one streaming requests.Response (no reconnection)."""
+    decoder = decoder or SSEDecoder()
+    for chunk in iter_chunks(response):
+        yield from decoder.feed(chunk)
+    yield from decoder.flush()
+
+
+async def aiter_sse(response, decoder: Optional[SSEDecoder] = None) -> AsyncIterator[SSEEvent]:
+    """Events of one streaming httpx.Response (no reconnection)."""
+    decoder = decoder or SSEDecoder()
+    async for chunk in response.aiter_bytes():
+        for ev in decoder.feed(chunk):
+            yield ev
+    for ev in decoder.flush():
+        yield ev
+
+
+# connection drops while reading a requests/urllib3 body surface as any of these
+_STREAM_ERRORS = (requests.RequestException, urllib3.exceptions.HTTPError, OSError)
+
+
+class SSEStream:
+    """Iterable of SSEEvents that reconnects with Last-Event-ID after a dropped connection.
+
+    `connect(headers)` issues the request with the extra headers and returns a streaming
+    requests.Response (raising on an error status).
+    """
+
+    def __init__(self, connect: Callable[[Dict[str, str]], Any], max_reconnects: int = 3, default_retry_ms: int = 1000):
+        self.connect = connect
+        self.max_reconnects = max_reconnects
+        self.default_retry_ms = default_retry_ms
+        self.decoder = SSEDecoder()
+        self.reconnects = 0
+        self._response = None
+        self._closed = False
+
+    def __iter__(self) -> Iterator[SSEEvent]:
+        headers: Dict[str, str] = {}
+        while not self._closed:
+            try:
+                self._response = self.connect(headers)
+                yield from iter_sse(self._response, self.decoder)
+                return
+            except requests.HTTPError:
+                raise
+            except _STREAM_ERRORS as e:
+                last_id = self.decoder.last_event_id
+                if self._closed or last_id is None or self.reconnects >= self.max_reconnects:
+                    raise
+                self.reconnects += 1
+                delay = (self.decoder.retry if self.decoder.retry is not None else self.default_retry_ms) / 1000.0
+                logger.warning("SSE stream dropped (%s); reconnecting from id %s in %.1fs (%d/%d)", e, last_id, delay, self.reconnects, self.max_reconnects)
+                self.decoder.reset()
+                headers = {"Last-Event-ID": last_id}
+                time.sleep(delay)
+            finally:
+                self._close_response()
+
+    def _close_response(self) -> None:
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+
+    def close(self) -> None:
+        self._closed = True
+        self._close_response()
+
+
+class AsyncSSEStream:
+    """asyncio counterpart of SSEStream.
+
+    `connect(headers)` is a coroutine returning an un-entered async context manager that
+    yields a streaming httpx.Response (e.g. AsyncTransport.stream(...)); entering it should
+    raise on an error status.
+    """
+
+    def __init__(self, connect: Callable[[Dict[str, str]], Any], max_reconnects: int = 3, default_retry_ms: int = 1000):
+        self.connect = connect
+        self.max_reconnects = max_reconnects
+        self.default_retry_ms = default_retry_ms
+        self.decoder = SSEDecoder()
+        self.reconnects = 0
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[SSEEvent]:
+        import asyncio
+
+        import httpx
+
+        headers: Dict[str, str] = {}
+        while not self._closed:
+            try:
+                async with await self.connect(headers) as response:
+                    async for ev in aiter_sse(response, self.decoder):
+                        yield ev
+                return
+            except httpx.TransportError as e:
+                last_id = self.decoder.last_event_id
+                if self._closed or last_id is None or self.reconnects >= self.max_reconnects:
+                    raise
+                self.reconnects += 1
+                delay = (self.decoder.retry if self.decoder.retry is not None else self.default_retry_ms) / 1000.0
+                logger.warning("SSE stream dropped (%s); reconnecting from id %s in %.1fs (%d/%d)", e, last_id, delay, self.reconnects, self.max_reconnects)
+                self.decoder.reset()
+                headers = {"Last-Event-ID": last_id}
+                await asyncio.sleep(delay)
+
+    def close(self) -> None:
+        self._closed = True
@@ -0,0 +1,162 @@
+import logging
+import time
+from typing import Optional, List, Dict, Any, Callable, Awaitable
+
+from .sse import SSEEvent, SSEStream, AsyncSSEStream
+
+logger = logging.getLogger("caller.streaming")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+
+class _StreamStats:
+    """Event/chunk bookkeeping and timings shared by AskStream and AsyncAskStream."""
+
+    def __init__(self, content: Callable[[Dict[str, Any]], Optional[str]]):
+        self._content = content
+        self.events: List[Dict[str, Any]] = []
+        self.chunks: List[str] = []
+        self.started_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def _feed(self, sse: SSEEvent) -> Optional[str]:
+        """Record one event; return its ai_message text (None for other events)."""
+        ev = sse.as_dict()
+        self.events.append(ev)
+        content = self._content(ev)
+        if content is None:
+            return None
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            logger.info("First token after %.3fs", self.first_token_at - self.started_at)
+        self.chunks.append(content)
+        return content
+
+    def _finish(self) -> None:
+        if self.finished_at is None and self.started_at is not None:
+            self.finished_at = time.perf_counter()
+            logger.info("Stream finished: %d chunk(s) in %.3fs", len(self.chunks), self.finished_at - self.started_at)
+
+    @property
+    def answer(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Seconds from starting the ask (incl. session setup) to the first ai_message chunk."""
+        if self.first_token_at is None or self.started_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def total_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def stats(self) -> Dict[str, Any]:
+        ttft = self.ttft
+        total = self.total_seconds
+        return {
+            "ttft_s": round(ttft, 4) if ttft is not None else None,
+            "total_s": round(total, 4) if total is not None else None,
+            "chunks": len(self.chunks),
+            "chars": sum(len(c) for c in self.chunks),
+            "events": len(self.events),
+        }
+
+
+class AskStream(_StreamStats):
+    """Iterator over `ai_message` chunks of a streamed ask, yielding text as it arrives.
+
+    `open()` is called lazily on first iteration and must return an SSEStream.
+    After (or during) iteration: `answer`, `events`, `ttft`, `total_seconds`, `stats()`.
+    Use as a context manager (or call close()) to release the connection when stopping early.
+    """
+
+    def __init__(self, open: Callable[[], SSEStream], content):
+        super().__init__(content)
+        self._open = open
+        self._sse: Optional[SSEStream] = None
+        self._events = None
+
+    def __iter__(self) -> "AskStream":
+        return self
+
+    def __next__(self) -> str:
+        if self._events is None:
+            if self.finished_at is not None:
+                raise StopIteration
+            self.started_at = time.perf_counter()
+            self._sse = self._open()
+            self._events = iter(self._sse)
+        for sse in self._events:
+            content = self._feed(sse)
+            if content is not None:
+                return content
+        self.close()
+        raise StopIteration
+
+    def close(self) -> None:
+        self._finish()
+        if self._events is not None:
+            self._events.close()
+            self._events = None
+        if self._sse is not None:
+            self._sse.close()
+            self._sse = None
+
+    def __enter__(self) -> "AskStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AsyncAskStream(_StreamStats):
+    """asyncio counterpart of AskStream: `async for chunk in stream`.
+
+    `open()` is a coroutine returning an AsyncSSEStream.
+    """
+
+    def __init__(self, open: Callable[[], Awaitable[AsyncSSEStream]], content):
+        super().__init__(content)
+        self._open = open
+        self._sse: Optional[AsyncSSEStream] = None
+        self._events = None
+
+    def __aiter__(self) -> "AsyncAskStream":
+        return self
+
+    async def __anext__(self) -> str:
+        if self._events is None:
+            if self.finished_at is not None:
+                raise StopAsyncIteration
+            self.started_at = time.perf_counter()
+            self._sse = await self._open()
+            self._events = self._sse.__aiter__()
+        async for sse in self._events:
+            content = self._feed(sse)
+            if content is not None:
+                return content
+        await self.aclose()
+        raise StopAsyncIteration
+
+    async def aclose(self) -> None:
+        self._finish()
+        if self._events is not None:
+            events, self._events = self._events, None
+            await events.aclose()
+        if self._sse is not None:
+            self._sse.close()
+            self._sse = None
+
+    async def __aenter__(self) -> "AsyncAskStream":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
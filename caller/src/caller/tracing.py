@@ -0,0 +1,335 @@
+"""Trace spans for the client pipelines, OpenTelemetry-compatible and off by default.
+
+A span has W3C trace/span ids, a parent, a name, start/end times, attributes and a status, as in
+OpenTelemetry. The current span lives in a contextvar, so spans nest across function calls and
+asyncio tasks; `wrap()` carries the context into worker threads.
+
+Tracing is a no-op until an exporter is configured (CallerConfig.trace_path does it for
+Application): start_span() then returns a shared non-recording span and no header is added.
+With an exporter:
+
+- Application stages (upload, poll, notebook ask and its stages, ingest, evaluate) open spans
+- every HTTP request through Transport / AsyncTransport is a CLIENT span and carries a W3C
+  `traceparent` header, so backend traces can join the client's
+- finished spans go to the exporter: JsonFileExporter appends one JSON object per line,
+  InMemoryExporter keeps them in a list
+
+Group several calls into one trace with span():
+
+    tracing.configure(tracing.JsonFileExporter("trace.jsonl"))
+    with tracing.span("process_pdf", file=path):
+        src = app.register_and_process_file(local_path=path)["sources"][0]
+        app.uploader.poll_source_status(src["id"])
+        app.notebook_ask_with_source(src["id"], question)
+
+and break a trace down stage by stage with `python -m caller.tracing trace.jsonl`.
+"""
+import argparse
+import contextlib
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from typing import Optional, List, Dict, Any, Callable, Iterator
+
+from .instrumentation import endpoint_template
+
+INTERNAL = "INTERNAL"
+CLIENT = "CLIENT"
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class SpanContext:
+    """Identity of a span, as carried in a `traceparent` header."""
+
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+class Span(SpanContext):
+    """A recording span; end() hands it to the exporter it was started with."""
+
+    __slots__ = ("parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status", "status_message", "_exporter")
+
+    recording = True
+
+    def __init__(self, name: str, exporter, parent: Optional[SpanContext] = None, kind: str = INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+        super().__init__(parent.trace_id if parent is not None else os.urandom(16).hex(), os.urandom(8).hex())
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "UNSET"
+        self.status_message: Optional[str] = None
+        self._exporter = exporter
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        self.status = status
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+        self.set_status("ERROR", str(exc))
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self._exporter.export(self)
+
+    @property
+    def duration_s(self) -> Optional[float]:
+        return (self.end_ns - self.start_ns) / 1e9 if self.end_ns is not None else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """OTLP-style field names; attributes as a plain object."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": f"STATUS_CODE_{self.status}", "message": self.status_message},
+        }
+
+
+class _NoopSpan:
+    """Returned while tracing is off: accepts the Span calls and records nothing."""
+
+    recording = False
+    trace_id = span_id = parent_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class InMemoryExporter:
+    """Keeps finished spans in `spans` (e.g. to inspect a run programmatically)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def close(self) -> None:
+        pass
+
+
+class JsonFileExporter:
+    """Appends each finished span to `path` as one JSON object per line (Span.as_dict())."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.as_dict(), default=str)
+        with self._lock:
+            if self._fh is not None:
+                self._fh.write(line + "\n")
+                self._fh.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+_exporter = None
+_current: contextvars.ContextVar[Optional[SpanContext]] = contextvars.ContextVar("caller_current_span", default=None)
+
+
+def configure(exporter) -> None:
+    """Send finished spans to `exporter` (anything with export(span)); None turns tracing off."""
+    global _exporter
+    _exporter = exporter
+
+
+def get_exporter():
+    return _exporter
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+def current_span() -> Optional[SpanContext]:
+    return _current.get()
+
+
+def start_span(name: str, kind: str = INTERNAL, attributes: Optional[Dict[str, Any]] = None, parent: Optional[SpanContext] = None):
+    """Start a span (child of `parent` or of the current span) without making it current; call end()."""
+    exporter = _exporter
+    if exporter is None:
+        return NOOP_SPAN
+    return Span(name, exporter, parent if parent is not None else _current.get(), kind, attributes)
+
+
+@contextlib.contextmanager
+def span(name: str, parent: Optional[SpanContext] = None, **attributes: Any) -> Iterator[Any]:
+    """Run the block in a new current span; an exception marks it as an error and is re-raised."""
+    s = start_span(name, attributes=attributes, parent=parent)
+    if not s.recording:
+        yield s
+        return
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        s.end()
+
+
+@contextlib.contextmanager
+def use_span(s) -> Iterator[Any]:
+    """Make an already started span current for the block without ending it."""
+    if not s.recording:
+        yield s
+        return
+    token = _current.set(s)
+    try:
+        yield s
+    finally:
+        _current.reset(token)
+
+
+def inject(headers: Optional[Dict[str, str]], span_context: Optional[SpanContext] = None) -> Dict[str, str]:
+    """Copy of `headers` with a traceparent for `span_context` (default: current span), if any."""
+    out = dict(headers or {})
+    ctx = span_context if span_context is not None else _current.get()
+    if ctx is not None and ctx.span_id is not None:
+        out["traceparent"] = ctx.traceparent()
+    return out
+
+
+def extract(headers: Dict[str, str]) -> Optional[SpanContext]:
+    """Parent context from an incoming `traceparent` header (None if absent or malformed)."""
+    value = next((v for k, v in headers.items() if k.lower() == "traceparent"), None)
+    m = _TRACEPARENT.match(value.strip().lower()) if value else None
+    return SpanContext(m.group(1), m.group(2)) if m else None
+
+
+def wrap(fn: Callable) -> Callable:
+    """fn bound to a copy of the current context, so spans it opens on another thread nest here."""
+    if _exporter is None:
+        return fn
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+
+def start_http_span(method: str, url: str):
+    """CLIENT span "METHOD /template" for one HTTP request (OpenTelemetry HTTP attribute names)."""
+    if _exporter is None:
+        return NOOP_SPAN
+    route = endpoint_template(url)
+    return start_span(f"{method.upper()} {route}", kind=CLIENT, attributes={"http.request.method": method.upper(), "url.full": url, "http.route": route})
+
+
+def end_http_span(span, timing) -> None:
+    """Copy a finished RequestTiming onto its span and end it."""
+    if not span.recording:
+        return
+    if timing.status is not None:
+        span.set_attribute("http.response.status_code", timing.status)
+        if timing.status >= 400:
+            span.set_status("ERROR", f"HTTP {timing.status}")
+    if timing.error is not None:
+        span.set_attribute("error.type", timing.error)
+        span.set_status("ERROR", timing.error)
+    span.set_attributes({"http.request.body.size": timing.bytes_out, "http.response.body.size": timing.bytes_in})
+    for field in ("connect_s", "ttfb_s", "read_s"):
+        value = getattr(timing, field)
+        if value is not None:
+            span.set_attribute(f"caller.{field}", round(value, 6))
+    span.end()
+
+
+# ---- reading JSON span files ----
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def breakdown(spans: List[Dict[str, Any]], trace_id: Optional[str] = None) -> List[str]:
+    """Indented span tree(s) with durations and offsets from each trace's start."""
+    by_trace: Dict[str, List[Dict[str, Any]]] = {}
+    for s in spans:
+        if trace_id is None or s["traceId"] == trace_id:
+            by_trace.setdefault(s["traceId"], []).append(s)
+    lines: List[str] = []
+    for tid, members in by_trace.items():
+        ids = {s["spanId"] for s in members}
+        children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for s in sorted(members, key=lambda s: s["startTimeUnixNano"]):
+            parent = s["parentSpanId"] if s["parentSpanId"] in ids else None
+            children.setdefault(parent, []).append(s)
+        t0 = min(s["startTimeUnixNano"] for s in members)
+        lines.append(f"trace {tid}")
+
+        def walk(parent: Optional[str], depth: int) -> None:
+            for s in children.get(parent, []):
+                ms = (s["endTimeUnixNano"] - s["startTimeUnixNano"]) / 1e6
+                offset = (s["startTimeUnixNano"] - t0) / 1e6
+                error = " ERROR" if s["status"]["code"] == "STATUS_CODE_ERROR" else ""
+                lines.append(f"{'  ' * (depth + 1)}{s['name']:<{max(1, 48 - 2 * depth)}} {ms:>10.1f}ms  @{offset:>9.1f}ms{error}")
+                walk(s["spanId"], depth + 1)
+
+        walk(None, 0)
+    return lines
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m caller.tracing", description="Print span trees from a JSON lines span file.")
+    ap.add_argument("path")
+    ap.add_argument("--trace", help="only this trace id")
+    args = ap.parse_args(argv)
+    for line in breakdown(load_spans(args.path), args.trace):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
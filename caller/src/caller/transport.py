@@ -0,0 +1,167 @@
+import logging
+import weakref
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import default_config
+from . import tracing
+from .instrumentation import RequestMetrics, RequestTiming, TIMED_POOL_CLASSES, body_size, reset_connect_time, take_connect_time
+
+logger = logging.getLogger("caller.transport")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+
+class Transport:
+    """Pooled HTTP transport shared by PdfUploader, QueryClient and Application.
+
+    Wraps a single `requests.Session` whose connection pools are sized from CallerConfig:
+    - pool_connections: number of per-host pools kept alive
+    - pool_maxsize: max keep-alive connections per host
+    - pool_block: block when a host's pool is exhausted instead of opening throwaway connections
+    - keep_alive: when False, ask the server to close the connection after every request
+    - max_retries: retries of failed connection attempts; a request that reached the server is never re-sent
+    - request_metrics: time every request into `metrics` (a RequestMetrics; see caller.instrumentation)
+    - request_metrics_log_seconds: log the per-endpoint timing summary this often
+
+    While tracing is on (caller.tracing) every request is a CLIENT span and sends its `traceparent`.
+
+    Build one per process (Application does this) and pass it to every client so that
+    all requests reuse the same TCP connections.
+    """
+
+    def __init__(self, config=default_config, metrics: Optional[RequestMetrics] = None):
+        self.config = config
+        self.timeout = config.timeout_seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize,
+            pool_block=config.pool_block,
+            # an int here would also retry read errors, re-sending requests the server may have handled
+            max_retries=Retry(total=config.max_retries, connect=config.max_retries, read=0, status=0),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not config.keep_alive:
+            self.session.headers["Connection"] = "close"
+        self.metrics = metrics if metrics is not None else (RequestMetrics() if config.request_metrics else None)
+        self._owns_metrics_log = False
+        if self.metrics is not None:
+            # timed connection classes report how long new connections take to open
+            adapter.poolmanager.pool_classes_by_scheme = dict(TIMED_POOL_CLASSES)
+            if config.request_metrics_log_seconds and metrics is None:
+                self.metrics.start_summary_log(config.request_metrics_log_seconds)
+                self._owns_metrics_log = True
+        self.closed = False
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request through the pooled session (default timeout from config)."""
+        kwargs.setdefault("timeout", self.timeout)
+        span = tracing.start_http_span(method, url)
+        if span.recording:
+            kwargs["headers"] = tracing.inject(kwargs.get("headers"), span)
+        elif self.metrics is None:
+            return self.session.request(method, url, **kwargs)
+        return self._timed_request(method, url, span, **kwargs)
+
+    def _record(self, timing: RequestTiming, span) -> None:
+        if self.metrics is not None:
+            self.metrics.record(timing)
+        tracing.end_http_span(span, timing)
+
+    def _timed_request(self, method: str, url: str, span, stream: bool = False, **kwargs: Any) -> requests.Response:
+        # Always send with stream=True so header arrival (TTFB) and the body read are timed
+        # separately; non-streaming callers get the body read here, as requests would.
+        timing = self.metrics.begin(method, url) if self.metrics is not None else RequestTiming(method, url)
+        reset_connect_time()
+        try:
+            resp = self.session.request(method, url, stream=True, **kwargs)
+        except Exception as e:
+            timing.connect_s = take_connect_time()
+            timing.error = type(e).__name__
+            timing.total_s = timing.elapsed()
+            self._record(timing, span)
+            raise
+        timing.ttfb_s = timing.elapsed()
+        timing.connect_s = take_connect_time()
+        timing.status = resp.status_code
+        timing.bytes_out = body_size(resp.request.body)
+
+        raw = resp.raw
+        recorded = []
+
+        def finish(error: Optional[str] = None, bytes_in: Optional[int] = None) -> None:
+            # holds no reference to resp, so it can run as resp's finalizer
+            if recorded:
+                return
+            recorded.append(True)
+            timing.total_s = timing.elapsed()
+            timing.read_s = timing.total_s - timing.ttfb_s
+            tell = getattr(raw, "tell", None)
+            timing.bytes_in = tell() if tell is not None else (bytes_in or 0)
+            timing.error = error
+            self._record(timing, span)
+
+        if stream:
+            # recorded at whichever comes first: the body read to the end (urllib3 releases the
+            # connection then), close(), or the response being garbage collected unclosed, so a
+            # streamed response nobody closes does not stay counted as in flight
+            resp_ref = weakref.ref(resp)
+            release_conn = getattr(raw, "release_conn", None)
+
+            def close_and_record() -> None:
+                finish()
+                r = resp_ref()
+                if r is not None:
+                    requests.Response.close(r)
+
+            def release_and_record() -> None:
+                finish()
+                release_conn()
+
+            resp.close = close_and_record
+            if release_conn is not None:
+                raw.release_conn = release_and_record
+            weakref.finalize(resp, finish)
+            return resp
+        try:
+            resp.content
+        except Exception as e:
+            finish(type(e).__name__)
+            raise
+        finish(bytes_in=len(resp._content or b""))
+        return resp
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections. Safe to call more than once."""
+        if not self.closed:
+            logger.info("Closing pooled HTTP transport")
+            if self._owns_metrics_log:
+                self.metrics.stop_summary_log()
+            self.session.close()
+            self.closed = True
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,79 @@
+import re
+from typing import Optional
+
+# leading decoration the models put before the verdict: markdown, quotes, bullets, "Answer:" labels
+_VERDICT = re.compile(
+    r"""^[\s*_#>`"'\-:.(\[]*
+        (?:(?:final\s+)?(?:answer|verdict|response)\s*(?:is)?\s*[:\-]?[\s*_`"'(\[]*)?
+        (yes|no)
+        (?=[^a-z0-9]|$)""",
+    re.IGNORECASE | re.VERBOSE,
+)
+# a prefix that can still grow into a match (used to give up early on e.g. "Based on the drawings...")
+_OPEN_PREFIX = re.compile(r"""^[\s*_#>`"'\-:.(\[]*(?:(?:final\s+)?(?:answer|verdict|response)?\s*(?:is)?\s*[:\-]?[\s*_`"'(\[]*)?[a-z]{0,8}$""", re.IGNORECASE)
+_OPENERS = ("yes", "no", "answer", "verdict", "response", "final", "is")
+
+YES = "YES"
+NO = "NO"
+
+
+class VerdictDetector:
+    """Incrementally reads a streamed answer and decides its leading YES/NO verdict.
+
+    feed() chunks as they arrive; it returns "YES"/"NO" as soon as the verdict word is complete
+    (a following non-letter has arrived, so "No" inside "Nothing" is not mistaken for a verdict).
+    `undetermined` becomes True once the text can no longer start with a verdict; finish()
+    settles a verdict that ends the stream exactly ("YES").
+    """
+
+    def __init__(self, max_chars: int = 200):
+        self.max_chars = max_chars
+        self.text = ""
+        self.verdict: Optional[str] = None
+        self.undetermined = False
+        self.decided_at: Optional[int] = None  # characters received when the verdict was known
+
+    @property
+    def done(self) -> bool:
+        return self.verdict is not None or self.undetermined
+
+    def feed(self, chunk: str) -> Optional[str]:
+        if self.done:
+            return self.verdict
+        self.text += chunk
+        m = _VERDICT.match(self.text)
+        if m and m.end() < len(self.text):
+            return self._decide(m.group(1))
+        if not m and not self._can_still_match():
+            self.undetermined = True
+        return None
+
+    def finish(self) -> Optional[str]:
+        """End of stream: accept a verdict that is the last thing received."""
+        if not self.done:
+            m = _VERDICT.match(self.text)
+            if m:
+                return self._decide(m.group(1))
+            self.undetermined = True
+        return self.verdict
+
+    def _decide(self, word: str) -> str:
+        self.verdict = YES if word.lower() == "yes" else NO
+        self.decided_at = len(self.text)
+        return self.verdict
+
+    def _can_still_match(self) -> bool:
+        if len(self.text) > self.max_chars:
+            return False
+        m = _OPEN_PREFIX.match(self.text)
+        if not m:
+            return False
+        tail = re.search(r"[a-z]*$", self.text, re.IGNORECASE).group(0).lower()
+        return not tail or any(o.startswith(tail) for o in _OPENERS)
+
+
+def parse_verdict(text: str) -> Optional[str]:
+    """The leading YES/NO verdict of a complete answer, or None."""
+    detector = VerdictDetector()
+    detector.feed(text)
+    return detector.finish()
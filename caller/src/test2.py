@@ -4,6 +4,8 @@ from typing import Dict, Any, List, Optional
 import requests
 from time import time
 
+from caller.sse import iter_sse
+
 # use the package config if available
 try:
     from caller.config import default_config
@@ -49,26 +51,18 @@ def send_message_stream(source_id: str, session_id: str, message: str, model_ove
     if model_override:
         payload["model_override"] = model_override
     LOG.info("POST (stream) %s -> %s", url, json.dumps(payload))
-    # streaming SSE-like response; use stream=True and iterate lines
+    # streaming SSE response; use stream=True and decode events as they arrive
     with requests.post(url, json=payload, stream=True, timeout=60) as r:
         try:
             r.raise_for_status()
         except Exception:
             LOG.error("Streaming request failed: %s %s", r.status_code, r.text)
             raise
-        for raw in r.iter_lines(decode_unicode=True):
-            if not raw:
-                continue
-            # SSE lines often start with "data: "
-            line = raw.strip()
-            if line.startswith("data:"):
-                body = line[len("data:"):].strip()
-            else:
-                body = line
+        for sse in iter_sse(r):
             try:
-                ev = json.loads(body)
-            except Exception:
-                LOG.info("STREAM TEXT: %s", body)
+                ev = sse.json()
+            except ValueError:
+                LOG.info("STREAM TEXT: %s", sse.data)
                 continue
             # print structured events
             ev_type = ev.get("type") or ev.get("event") or "message"
@@ -12,6 +12,7 @@ from typing import Optional
 import requests
 
 from caller.app import Application
+from caller.sse import iter_sse
 
 LOG = logging.getLogger("caller.test")
 logging.basicConfig(level=logging.INFO)
@@ -25,19 +26,12 @@ def _stream_post(url: str, payload: dict, timeout: int = 60):
         except Exception:
             LOG.error("Request failed %s: %s", r.status_code, r.text)
             raise
-        for raw in r.iter_lines(decode_unicode=True):
-            if not raw:
-                continue
-            line = raw.strip()
-            if line.startswith("data:"):
-                body = line[len("data:"):].strip()
-            else:
-                body = line
+        for sse in iter_sse(r):
             try:
-                ev = json.loads(body)
+                ev = sse.json()
                 LOG.info("EVENT: %s", json.dumps(ev, ensure_ascii=False)[:2000])
-            except Exception:
-                LOG.info("STREAM: %s", body)
+            except ValueError:
+                LOG.info("STREAM: %s", sse.data)
 
 
 def main():
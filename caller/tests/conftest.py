@@ -0,0 +1,26 @@
+"""Shared fixtures: a FakeBackend per test and a client config/transport pointed at it."""
+import pytest
+
+from caller import CallerConfig
+from caller.fake_backend import FakeBackend, FakeBackendConfig
+from caller.transport import Transport
+
+# upload chunk size the fake backend asks chunked uploads to use
+CHUNK = 64 << 10
+
+
+@pytest.fixture
+def backend():
+    with FakeBackend(FakeBackendConfig(upload_chunk_size=CHUNK)) as b:
+        yield b
+
+
+@pytest.fixture
+def config(backend, tmp_path):
+    return CallerConfig(api_base_url=backend.url, upload_state_dir=str(tmp_path / "uploads"))
+
+
+@pytest.fixture
+def transport(config):
+    with Transport(config) as t:
+        yield t
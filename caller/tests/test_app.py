@@ -0,0 +1,43 @@
+"""Application / AsyncApplication start-up and clean-up of the exporters they start."""
+import socket
+import threading
+from dataclasses import replace
+
+import pytest
+
+from caller import Application, AsyncApplication, tracing
+
+
+def _metrics_threads() -> int:
+    return sum(t.name == "caller-metrics-exporter" and t.is_alive() for t in threading.enumerate())
+
+
+@pytest.fixture
+def busy_port():
+    with socket.create_server(("127.0.0.1", 0)) as sock:
+        yield sock.getsockname()[1]
+
+
+@pytest.mark.parametrize("make_app", [Application, AsyncApplication], ids=["sync", "async"])
+def test_bad_trace_path_fails_before_the_metrics_exporter_starts(make_app, config, tmp_path):
+    if make_app is AsyncApplication:
+        pytest.importorskip("httpx")
+    before = _metrics_threads()
+
+    # a directory cannot be opened as the trace file
+    with pytest.raises(OSError):
+        make_app(replace(config, metrics_port=0, trace_path=str(tmp_path)))
+
+    assert _metrics_threads() == before
+    assert tracing.get_exporter() is None
+
+
+@pytest.mark.parametrize("make_app", [Application, AsyncApplication], ids=["sync", "async"])
+def test_metrics_port_in_use_undoes_tracing(make_app, config, tmp_path, busy_port):
+    if make_app is AsyncApplication:
+        pytest.importorskip("httpx")
+
+    with pytest.raises(OSError):
+        make_app(replace(config, metrics_port=busy_port, trace_path=str(tmp_path / "trace.jsonl")))
+
+    assert tracing.get_exporter() is None
@@ -0,0 +1,54 @@
+"""Source catalog refreshes (caller.catalog) through PdfUploader.find_source_for_file."""
+from caller import PdfUploader
+from caller.catalog import normalize_filename
+
+
+def test_catalog_refresh_is_incremental_from_the_watermark(backend, config, transport):
+    backend.add_sources(20)
+    uploader = PdfUploader(config, transport=transport)
+    calls = []
+    list_sources = uploader.list_sources
+
+    def recording_list_sources(**kwargs):
+        calls.append(kwargs)
+        return list_sources(**kwargs)
+
+    uploader.list_sources = recording_list_sources
+    uploader.catalog.page_size = 5
+
+    assert uploader.find_source_for_file("document-000003.pdf")["title"] == "document-000003.pdf"
+    assert calls == [{}]
+
+    backend.add_sources(2, prefix="new")
+    uploader.catalog._refreshed_at = 0.0
+    assert uploader.find_source_for_file("new-000021.pdf") is not None
+    # one newest-first page reaches the watermark; the 20 older sources are not listed again
+    assert calls[1:] == [{"limit": 5, "offset": 0, "sort_by": "updated", "sort_order": "desc"}]
+
+
+def test_catalog_falls_back_to_full_reload_when_listing_is_unsorted(backend, config, transport):
+    backend.add_sources(3)
+    uploader = PdfUploader(config, transport=transport)
+    list_sources = uploader.list_sources
+    full_reloads = []
+
+    def oldest_first(**kwargs):
+        if not kwargs:
+            full_reloads.append(True)
+        sources = list_sources(**kwargs)
+        # a server that ignores sort_order
+        return sorted(sources, key=lambda s: s["updated"]) if sources is not None else None
+
+    uploader.list_sources = oldest_first
+    assert uploader.find_source_for_file("document-000000.pdf") is not None
+
+    backend.add_sources(1, prefix="new")
+    uploader.catalog._refreshed_at = 0.0
+    assert uploader.find_source_for_file("new-000003.pdf") is not None
+    assert len(full_reloads) == 2
+
+
+def test_normalize_filename_strips_server_copy_suffixes():
+    assert normalize_filename("/app/data/uploads/Site Plan (5).PDF") == "site plan.pdf"
+    assert normalize_filename("plan (2) (3).pdf") == "plan (2).pdf"
+    assert normalize_filename("README") == "readme"
@@ -0,0 +1,147 @@
+"""Resumable chunked uploads (caller.chunked_upload) against the fake backend."""
+import json
+import os
+
+import pytest
+import requests
+
+from caller.chunked_upload import ChunkedUploader, ChunkedUploadError
+from caller.transport import Transport
+
+CHUNK = 64 << 10  # the backend fixture's upload_chunk_size
+
+
+class FlakyTransport:
+    """Transport wrapper that fails chosen requests with a ConnectionError.
+
+    `fail(method, url, after_send)` returns True to fail the call; with after_send the real
+    request is sent first, so the server commits it and only the response is lost.
+    """
+
+    def __init__(self, transport: Transport, fail):
+        self.transport = transport
+        self.fail = fail
+        self.metrics = transport.metrics
+
+    def _call(self, method: str, url: str, **kwargs):
+        if self.fail(method, url, False):
+            raise requests.ConnectionError(f"connection dropped before {method} {url}")
+        resp = self.transport.request(method, url, **kwargs)
+        if self.fail(method, url, True):
+            raise requests.ConnectionError(f"connection dropped after {method} {url}")
+        return resp
+
+    def get(self, url, **kwargs):
+        return self._call("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._call("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self._call("PUT", url, **kwargs)
+
+
+def _write(path, size: int) -> str:
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def test_chunk_put_connection_drop_resyncs_and_completes(backend, config, transport, tmp_path):
+    path = _write(tmp_path / "plans.pdf", 4 * CHUNK)
+    dropped = {"put": 0, "resync": 0}
+
+    def fail(method, url, after_send):
+        # the second chunk reaches the server but its ack is lost; the first resync fails too
+        if method == "PUT" and after_send and dropped["put"] == 0 and backend.request_counts().get("PUT /sources/uploads/{id}") == 2:
+            dropped["put"] += 1
+            return True
+        if method == "GET" and not after_send and dropped["put"] and not dropped["resync"]:
+            dropped["resync"] += 1
+            return True
+        return False
+
+    uploader = ChunkedUploader(FlakyTransport(transport, fail), backend.url, 10, config.upload_state_dir)
+    resp = uploader.upload(path, {"title": "plans.pdf", "async_processing": False})
+
+    assert resp.ok and resp.json()["title"] == "plans.pdf"
+    assert dropped == {"put": 1, "resync": 1}
+    counts = backend.request_counts()
+    # the resync never reached the server; the re-sent second chunk is refused with 409 and the
+    # client continues from the offset in that response
+    assert "GET /sources/uploads/{id}" not in counts
+    assert counts["PUT /sources/uploads/{id}"] == 5
+    assert not os.listdir(config.upload_state_dir)
+
+
+def test_interrupted_chunked_upload_resumes_at_committed_offset(backend, config, transport, tmp_path):
+    path = _write(tmp_path / "plans.pdf", 5 * CHUNK)
+
+    def fail(method, url, after_send):
+        return method == "PUT" and not after_send and backend.request_counts().get("PUT /sources/uploads/{id}", 0) >= 2
+
+    broken = ChunkedUploader(FlakyTransport(transport, fail), backend.url, 10, config.upload_state_dir, chunk_retries=1)
+    with pytest.raises(requests.ConnectionError):
+        broken.upload(path, {"title": "plans.pdf"})
+    assert len(os.listdir(config.upload_state_dir)) == 1
+
+    backend.reset_counts()
+    resp = ChunkedUploader(transport, backend.url, 10, config.upload_state_dir).upload(path, {"title": "plans.pdf"})
+
+    assert resp.ok
+    counts = backend.request_counts()
+    assert "POST /sources/uploads" not in counts
+    assert counts["GET /sources/uploads/{id}"] == 1
+    assert counts["PUT /sources/uploads/{id}"] == 3
+    assert not os.listdir(config.upload_state_dir)
+
+
+class ScriptedPutTransport:
+    """Sends everything to the real transport except PUTs, answered with `put_reply(headers)`."""
+
+    def __init__(self, transport: Transport, put_reply):
+        self.transport = transport
+        self.put_reply = put_reply
+        self.metrics = transport.metrics
+        self.puts = 0
+
+    def get(self, url, **kwargs):
+        return self.transport.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.transport.post(url, **kwargs)
+
+    def put(self, url, headers=None, **kwargs):
+        self.puts += 1
+        status, body = self.put_reply(headers)
+        resp = requests.Response()
+        resp.status_code = status
+        resp._content = json.dumps(body).encode("utf-8")
+        resp.url = url
+        return resp
+
+
+def _start_offset(headers) -> int:
+    return int(headers["Content-Range"].split()[1].split("-")[0])
+
+
+def test_chunk_retries_must_be_positive(config, transport):
+    with pytest.raises(ValueError):
+        ChunkedUploader(transport, config.api_base_url, 10, config.upload_state_dir, chunk_retries=0)
+
+
+def test_conflict_naming_the_same_offset_gives_up_after_chunk_retries(config, transport, tmp_path):
+    path = _write(tmp_path / "plans.pdf", 2 * CHUNK)
+    scripted = ScriptedPutTransport(transport, lambda headers: (409, {"offset": _start_offset(headers)}))
+
+    with pytest.raises(ChunkedUploadError, match="no progress"):
+        ChunkedUploader(scripted, config.api_base_url, 10, config.upload_state_dir, chunk_retries=3).upload(path, {"title": "plans.pdf"})
+    assert scripted.puts == 3
+
+
+def test_offset_past_the_file_size_is_an_error(config, transport, tmp_path):
+    path = _write(tmp_path / "plans.pdf", 2 * CHUNK)
+    scripted = ScriptedPutTransport(transport, lambda headers: (200, {"offset": 10 * CHUNK}))
+
+    with pytest.raises(ChunkedUploadError, match="past the file size"):
+        ChunkedUploader(scripted, config.api_base_url, 10, config.upload_state_dir).upload(path, {"title": "plans.pdf"})
+    assert scripted.puts == 1
@@ -0,0 +1,55 @@
+"""Built /chat/context responses cached by source version (caller.context_cache)."""
+from dataclasses import replace
+
+from caller import QueryClient
+from caller.context_cache import ContextCache
+
+
+def _touch(backend, source_id: str) -> None:
+    """Simulate an edit/reprocess: bump the source's `updated` timestamp."""
+    with backend._lock:
+        backend.sources[source_id]["updated"] = backend._now()
+
+
+def test_context_is_built_once_per_source_version(backend, config, transport):
+    source_id = backend.add_sources(1)[0]
+    qc = QueryClient(replace(config, context_cache_size=8), transport=transport)
+
+    qc.notebook_ask(source_id, "first?")
+    qc.notebook_ask(source_id, "second?")
+    assert backend.request_counts()["POST /chat/context"] == 1
+
+    _touch(backend, source_id)
+    qc.notebook_ask(source_id, "after the edit?")
+    assert backend.request_counts()["POST /chat/context"] == 2
+    assert qc.context_cache.stats()["hits"] == 1
+    qc.close()
+
+
+def test_cache_is_opt_in(backend, config, transport):
+    source_id = backend.add_sources(1)[0]
+    qc = QueryClient(config, transport=transport)
+
+    qc.notebook_ask(source_id, "first?")
+    qc.notebook_ask(source_id, "second?")
+
+    assert qc.context_cache is None
+    counts = backend.request_counts()
+    assert counts["POST /chat/context"] == 2
+    assert "GET /sources/{id}" not in counts
+    qc.close()
+
+
+def test_disk_tier_is_shared_across_instances(tmp_path):
+    path = str(tmp_path / "context.sqlite3")
+    context_config = {"sources": {"source:1": "full content"}, "notes": {}}
+    versions = {"source:1": "2026-01-01T00:00:00+00:00"}
+
+    writer = ContextCache(path=path)
+    writer.put(context_config, versions, {"context": "text", "token_count": 3, "char_count": 4, "notebook_id": "n:1"})
+    writer.close()
+
+    reader = ContextCache(path=path)
+    assert reader.get(context_config, versions) == {"context": "text", "token_count": 3, "char_count": 4}
+    assert reader.get(context_config, {"source:1": "2026-02-01T00:00:00+00:00"}) is None
+    reader.close()
@@ -0,0 +1,45 @@
+"""Content-hash upload dedup (caller.dedup)."""
+import hashlib
+import os
+from dataclasses import replace
+
+from caller import PdfUploader
+from caller.dedup import ContentHashIndex, file_sha256
+
+
+def test_same_bytes_under_another_name_are_not_uploaded_again(backend, config, transport, tmp_path):
+    uploader = PdfUploader(replace(config, hash_index_path=str(tmp_path / "hashes.sqlite3")), transport=transport)
+    data = os.urandom(4096)
+    (tmp_path / "plan.pdf").write_bytes(data)
+    (tmp_path / "plan-copy.pdf").write_bytes(data)
+    (tmp_path / "other.pdf").write_bytes(os.urandom(4096))
+
+    first = uploader.upload_file_and_process(str(tmp_path / "plan.pdf"))
+    copy = uploader.upload_file_and_process(str(tmp_path / "plan-copy.pdf"))
+    other = uploader.upload_file_and_process(str(tmp_path / "other.pdf"))
+
+    assert copy["sources"][0]["id"] == first["sources"][0]["id"]
+    assert other["sources"][0]["id"] != first["sources"][0]["id"]
+    counts = backend.request_counts()
+    assert counts["POST /sources"] == 2
+    # the index answers without listing /sources
+    assert "GET /sources" not in counts
+    uploader.close()
+
+
+def test_index_persists_across_instances_and_forgets_deleted_sources(tmp_path):
+    path = str(tmp_path / "hashes.sqlite3")
+    blob = tmp_path / "plan.pdf"
+    blob.write_bytes(b"%PDF-1.7 plan")
+    digest = file_sha256(str(blob), chunk_size=4)
+    assert digest == hashlib.sha256(b"%PDF-1.7 plan").hexdigest()
+
+    first = ContentHashIndex(path)
+    first.record(digest, "source:1", title="plan.pdf", size=13)
+    first.close()
+
+    second = ContentHashIndex(path)
+    assert second.lookup(digest)["source_id"] == "source:1"
+    assert second.forget("source:1") == 1
+    assert second.lookup(digest) is None and len(second) == 0
+    second.close()
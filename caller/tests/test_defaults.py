@@ -0,0 +1,108 @@
+"""The process-wide /models/defaults cache (caller.defaults)."""
+import asyncio
+import threading
+import time
+
+from caller import QueryClient
+from caller.defaults import ModelDefaultsCache, defaults_cache_for
+
+MODELS = {"default_chat_model": "model:chat", "default_transformation_model": "model:transformation"}
+
+
+class CountingFetch:
+    """fetch() for the cache: slow, counted, and failing while `fail` is set."""
+
+    def __init__(self, delay: float = 0.05, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("backend down")
+        return dict(MODELS)
+
+    async def coroutine(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return dict(MODELS)
+
+
+def _run_threads(n: int, fn) -> list:
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(fn())) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+
+def test_query_clients_share_one_fetch(backend, config, transport):
+    clients = [QueryClient(config, transport=transport) for _ in range(3)]
+
+    for qc in clients:
+        assert qc.get_defaults()["default_chat_model"] == "model:fake-chat"
+
+    assert backend.request_counts()["GET /models/defaults"] == 1
+
+
+def test_concurrent_misses_make_a_single_fetch():
+    cache, fetch = ModelDefaultsCache(), CountingFetch()
+
+    results = _run_threads(20, lambda: cache.get(fetch))
+
+    assert fetch.calls == 1 and all(r == MODELS for r in results)
+
+
+def test_failed_fetch_is_not_retried_by_every_waiter():
+    cache, fetch = ModelDefaultsCache(retry_after_seconds=0.3), CountingFetch(delay=0.1, fail=True)
+
+    results = _run_threads(10, lambda: cache.get(fetch))
+    assert fetch.calls == 1 and results == [{}] * 10
+    assert cache.get(fetch) == {} and fetch.calls == 1
+
+    time.sleep(0.35)
+    fetch.fail = False
+    assert cache.get(fetch) == MODELS and fetch.calls == 2
+
+
+def test_expired_value_is_served_while_the_backend_is_down():
+    cache, fetch = ModelDefaultsCache(ttl_seconds=60), CountingFetch(fail=True)
+    cache.store(MODELS)
+    cache.invalidate()
+
+    assert cache.get(fetch) == MODELS and fetch.calls == 1
+
+
+def test_refresh_ahead_returns_the_cached_value_and_refreshes_in_the_background():
+    cache, fetch = ModelDefaultsCache(ttl_seconds=10, refresh_ahead=0.5), CountingFetch(delay=0.2)
+    cache.store({"default_chat_model": "model:old"})
+    cache._fetched_at -= 6
+
+    started = time.perf_counter()
+    assert cache.get(fetch) == {"default_chat_model": "model:old"}
+    assert time.perf_counter() - started < 0.1
+    deadline = time.monotonic() + 2
+    while cache.peek() != MODELS and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.peek() == MODELS and fetch.calls == 1
+
+
+def test_async_callers_share_one_fetch():
+    cache, fetch = ModelDefaultsCache(), CountingFetch()
+
+    async def main():
+        return await asyncio.gather(*(cache.aget(fetch.coroutine) for _ in range(20)))
+
+    assert asyncio.run(main()) == [MODELS] * 20 and fetch.calls == 1
+
+
+def test_defaults_cache_for_honours_ttl():
+    short = defaults_cache_for("http://defaults.test/api", ttl_seconds=1)
+
+    assert short.ttl_seconds == 1
+    assert defaults_cache_for("http://defaults.test/api/", ttl_seconds=1) is short
+    assert defaults_cache_for("http://defaults.test/api", ttl_seconds=300).ttl_seconds == 300
@@ -0,0 +1,63 @@
+"""Question x source evaluation runs with a resumable results manifest (caller.evaluate)."""
+from dataclasses import replace
+
+from caller import QueryClient
+from caller.evaluate import evaluate_matrix
+from caller.manifest import Manifest
+
+QUESTIONS = {"pits": "Are soakage pits shown?", "exit": "Is there a fire exit?"}
+
+
+def test_rerun_retries_failed_pairs_and_skips_answered_ones(backend, config, transport, tmp_path):
+    source_ids = backend.add_sources(2)
+    qc = QueryClient(config, transport=transport)
+    results_path = str(tmp_path / "results.jsonl")
+
+    backend.config.error_endpoints = ["/chat/execute"]
+    backend.config.error_rate = 1.0
+    first = evaluate_matrix(qc, QUESTIONS, source_ids, concurrency=2, results_path=results_path)
+    assert first["summary"]["failed"] == 4
+
+    backend.config.error_rate = 0.0
+    second = evaluate_matrix(qc, QUESTIONS, source_ids, concurrency=2, results_path=results_path)
+    assert second["ok"] and second["summary"]["asked"] == 4 and second["summary"]["yes"] == 4
+
+    backend.reset_counts()
+    third = evaluate_matrix(qc, QUESTIONS, source_ids, concurrency=2, results_path=results_path)
+    assert third["summary"]["skipped"] == 4 and all(r["skipped"] for r in third["results"])
+    assert "POST /chat/execute" not in backend.request_counts()
+
+
+def test_repeated_source_ids_are_asked_once(backend, config, transport):
+    source_id = backend.add_sources(1)[0]
+    qc = QueryClient(config, transport=transport)
+
+    run = evaluate_matrix(qc, QUESTIONS, [source_id, source_id])
+
+    assert run["summary"]["pairs"] == 2 and len(run["results"]) == 2
+    assert backend.request_counts()["POST /chat/execute"] == 2
+
+
+def test_every_pair_gets_its_own_session_and_the_context_is_built_once_per_source(backend, config, transport):
+    source_ids = backend.add_sources(2)
+    qc = QueryClient(replace(config, notebook_pool=True, notebook_pool_reuse_sessions=True, context_cache_size=8), transport=transport)
+
+    run = evaluate_matrix(qc, QUESTIONS, source_ids, concurrency=2)
+
+    assert len({r["session_id"] for r in run["results"]}) == 4
+    assert backend.request_counts()["POST /chat/context"] == 2
+    qc.close()
+
+
+def test_manifest_write_failure_is_recorded_on_the_result(backend, config, transport, tmp_path, monkeypatch):
+    source_id = backend.add_sources(1)[0]
+    qc = QueryClient(config, transport=transport)
+
+    def disk_full(self, key, record):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(Manifest, "put", disk_full)
+    run = evaluate_matrix(qc, QUESTIONS, [source_id], results_path=str(tmp_path / "results.jsonl"))
+
+    assert len(run["results"]) == 2
+    assert all(r["ok"] and r["manifest_error"] == "No space left on device" for r in run["results"])
@@ -0,0 +1,73 @@
+"""Hybrid (vector + text) search with reciprocal rank fusion, sync and async clients."""
+import asyncio
+import time
+
+import pytest
+
+from caller import AsyncQueryClient, QueryClient
+
+
+class VectorDown(Exception):
+    pass
+
+
+def test_hybrid_search_fuses_both_rankings(backend, config, transport):
+    backend.add_sources(5)
+    qc = QueryClient(config, transport=transport)
+
+    hits = qc.hybrid_search("soakage pits", results=3)
+
+    assert len(hits) == 3
+    assert all("rrf_score" in h for h in hits)
+    assert backend.request_counts()["POST /search"] == 2
+
+
+def test_vector_failure_cancels_the_text_query(config, transport):
+    qc = QueryClient(config, transport=transport)
+
+    def slow_text_search(query, results=10):
+        time.sleep(0.5)
+        return []
+
+    def failing_vector_search(query, results=10, minimum_score=0.2):
+        raise VectorDown("vector index unavailable")
+
+    qc.text_search = slow_text_search
+    qc.vector_search = failing_vector_search
+    started = time.perf_counter()
+    with pytest.raises(VectorDown):
+        qc.hybrid_search("soakage pits")
+    # the error surfaces at once instead of after the text query
+    assert time.perf_counter() - started < 0.4
+
+
+def test_async_vector_failure_cancels_the_text_query(config):
+    pytest.importorskip("httpx")
+    cancelled = []
+
+    async def main():
+        qc = AsyncQueryClient(config)
+
+        async def slow_text_search(query, results=10):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(query)
+                raise
+
+        async def failing_vector_search(query, results=10, minimum_score=0.2):
+            await asyncio.sleep(0.01)
+            raise VectorDown("vector index unavailable")
+
+        qc.text_search = slow_text_search
+        qc.vector_search = failing_vector_search
+        try:
+            with pytest.raises(VectorDown):
+                await qc.hybrid_search("soakage pits")
+            await asyncio.sleep(0)
+            # cancelled by hybrid_search itself, not by asyncio.run() tearing the loop down
+            assert cancelled == ["soakage pits"]
+        finally:
+            await qc.close()
+
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""Directory ingest with a resumable manifest (caller.ingest)."""
+import os
+from pathlib import Path
+
+from caller import PdfUploader
+from caller.ingest import ingest_tree
+
+
+def _write(path, size: int) -> str:
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def test_ingest_manifest_resume_skips_done_files_and_retries_failures(backend, config, transport, tmp_path):
+    root = tmp_path / "plans"
+    root.mkdir()
+    for n in range(3):
+        _write(root / f"plan-{n}.pdf", 1024)
+    uploader = PdfUploader(config, transport=transport)
+
+    backend.config.error_endpoints = ["/sources"]
+    backend.config.error_rate = 1.0
+    first = ingest_tree(uploader, str(root), workers=2)
+    assert first["summary"]["failed"] == 3
+
+    backend.config.error_rate = 0.0
+    second = ingest_tree(uploader, str(root), workers=2)
+    assert second["ok"] and second["summary"]["uploaded"] == 3
+
+    _write(root / "plan-3.pdf", 1024)
+    backend.reset_counts()
+    third = ingest_tree(uploader, str(root), workers=2)
+    assert third["summary"]["skipped"] == 3 and third["summary"]["uploaded"] == 1
+    assert backend.request_counts()["POST /sources"] == 1
+
+
+def test_file_vanishing_after_listing_is_recorded_as_failed(backend, config, transport, tmp_path, monkeypatch):
+    root = tmp_path / "plans"
+    root.mkdir()
+    _write(root / "plan-0.pdf", 1024)
+    ghost = root / "gone.pdf"
+    glob = Path.glob
+    is_file = Path.is_file
+    # the ghost is listed (and looked like a file) but is deleted before ingest stats it
+    monkeypatch.setattr(Path, "glob", lambda self, pattern: [*glob(self, pattern), ghost])
+    monkeypatch.setattr(Path, "is_file", lambda self: self == ghost or is_file(self))
+
+    run = ingest_tree(PdfUploader(config, transport=transport), str(root))
+
+    assert run["summary"]["uploaded"] == 1 and run["summary"]["failed"] == 1
+    failed = next(r for r in run["results"] if r["status"] == "failed")
+    assert failed["path"] == str(ghost) and failed["error"]
@@ -0,0 +1,83 @@
+"""OpenMetrics rendering and the /metrics endpoint (caller.metrics_exporter)."""
+import re
+import urllib.error
+import urllib.request
+from dataclasses import replace
+
+import pytest
+
+from caller import Application
+from caller.instrumentation import LatencyHistogram
+from caller.metrics_exporter import CONTENT_TYPE, MetricsExporter, _histogram_samples, render
+
+
+def _samples(text: str) -> dict:
+    """{"name{labels}": value} for every sample line."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, _, value = line.rpartition(" ")
+            out[key] = float(value)
+    return out
+
+
+def test_render_formats_families_and_escapes_labels():
+    text = render([
+        ("caller_things", "counter", "Things.", [("_total", {"path": 'a"b\\c\nd'}, 3.0)]),
+        ("caller_ratio", "gauge", "A ratio.", [("", {}, 0.25)]),
+    ])
+
+    assert text.splitlines() == [
+        "# TYPE caller_things counter",
+        "# HELP caller_things Things.",
+        'caller_things_total{path="a\\"b\\\\c\\nd"} 3',
+        "# TYPE caller_ratio gauge",
+        "# HELP caller_ratio A ratio.",
+        "caller_ratio 0.25",
+        "# EOF",
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = LatencyHistogram()
+    for seconds in (0.003, 0.02, 0.02, 3.0):
+        hist.record(seconds)
+
+    buckets = {labels["le"]: v for suffix, labels, v in _histogram_samples(hist, {}) if suffix == "_bucket"}
+
+    assert buckets["0.005"] == 1
+    assert buckets["0.025"] == 3
+    assert buckets["2.5"] == 3
+    assert buckets["5.0"] == 4 and buckets["+Inf"] == 4
+    counts = list(buckets.values())
+    assert counts == sorted(counts)
+
+
+def test_application_serves_request_and_cache_metrics(backend, config, transport):
+    backend.add_sources(2)
+    app = Application(replace(config, metrics_port=0, search_cache_size=8), transport=transport)
+    try:
+        app.qc.vector_search("soakage pits")
+        app.qc.vector_search("soakage pits")
+
+        with urllib.request.urlopen(app.exporter.url, timeout=5) as resp:
+            assert resp.headers["Content-Type"] == CONTENT_TYPE
+            text = resp.read().decode("utf-8")
+    finally:
+        app.close()
+
+    assert text.endswith("# EOF\n")
+    samples = _samples(text)
+    assert samples['caller_requests_total{method="POST",endpoint="/search",status="200"}'] == 1
+    assert samples['caller_request_duration_seconds_count{method="POST",endpoint="/search"}'] == 1
+    assert samples['caller_cache_lookups_total{cache="search",result="hit"}'] == 1
+    assert samples['caller_cache_lookups_total{cache="search",result="miss"}'] == 1
+    assert samples["caller_poller_queue_depth"] == 0
+    assert re.search(r"^# TYPE caller_requests_in_flight gauge$", text, re.M)
+
+
+def test_unknown_path_is_404():
+    with MetricsExporter(port=0) as exporter:
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(exporter.url.replace("/metrics", "/other"), timeout=5)
+    assert err.value.code == 404
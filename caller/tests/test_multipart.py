@@ -0,0 +1,38 @@
+"""Streaming multipart upload bodies (caller.multipart) through PdfUploader."""
+import os
+
+from caller import PdfUploader
+from caller.multipart import MultipartFileEncoder
+
+MIB = 1 << 20
+
+
+def test_progress_follows_chunk_size_not_the_transport_read_size(backend, config, transport, tmp_path):
+    path = tmp_path / "plans.pdf"
+    path.write_bytes(os.urandom(4 * MIB))
+    calls = []
+    uploader = PdfUploader(config, transport=transport)
+    uploader.upload_chunk_size = MIB
+
+    result = uploader.upload_file_and_process(str(path), chunked=False, progress=lambda sent, total, rate: calls.append((sent, total)))
+
+    assert result["ok"]
+    total = calls[-1][1]
+    assert calls[-1][0] == total and total > 4 * MIB
+    # one call per MiB read (requests pulls 16 KiB at a time) plus the final one
+    assert len(calls) == 5
+    assert all(b - a >= MIB for (a, _), (b, _) in zip(calls, calls[1:-1]))
+
+
+def test_encoded_body_is_a_valid_multipart_form(tmp_path):
+    path = tmp_path / "plans.pdf"
+    path.write_bytes(b"%PDF-1.4 fake")
+
+    with MultipartFileEncoder(str(path), fields={"title": "plans.pdf"}, chunk_size=4) as body:
+        data = b"".join(body)
+
+    assert len(data) == len(body) == body.bytes_sent
+    assert data.startswith(f"--{body.boundary}\r\n".encode())
+    assert b'name="title"\r\n\r\nplans.pdf\r\n' in data
+    assert b'filename="plans.pdf"\r\nContent-Type: application/pdf\r\n\r\n%PDF-1.4 fake\r\n' in data
+    assert data.endswith(f"--{body.boundary}--\r\n".encode())
@@ -0,0 +1,75 @@
+"""Pooled notebooks for QueryClient.notebook_ask (caller.notebook_pool)."""
+from dataclasses import replace
+
+from caller import QueryClient
+
+
+def _client(config, transport, **overrides):
+    return QueryClient(replace(config, notebook_pool=True, **overrides), transport=transport)
+
+
+def test_pool_is_opt_in(config, transport):
+    assert QueryClient(config, transport=transport).notebook_pool is None
+
+
+def test_pooled_asks_share_a_notebook_and_delete_their_sessions(backend, config, transport):
+    source_id = backend.add_sources(1)[0]
+    qc = _client(config, transport)
+
+    answers = [qc.notebook_ask(source_id, f"question {n}?") for n in range(3)]
+
+    assert len({a["notebook_id"] for a in answers}) == 1
+    assert len({a["session_id"] for a in answers}) == 3
+    counts = backend.request_counts()
+    assert counts["POST /notebooks"] == 1
+    assert counts["POST /notebooks/{id}/sources/{source_id}"] == 1
+    # each per-ask session is gone as soon as its answer is back, not when the notebook is evicted
+    assert counts["DELETE /chat/sessions/{id}"] == 3
+    assert not backend.sessions
+
+    qc.close()
+    assert not backend.notebooks
+
+
+def test_caller_supplied_session_is_not_deleted(backend, config, transport):
+    source_id = backend.add_sources(1)[0]
+    qc = _client(config, transport)
+    first = qc.notebook_ask(source_id, "first?")
+    session_id = qc._create_session(first["notebook_id"])
+
+    result = qc.notebook_ask(source_id, "second?", session_id=session_id)
+
+    assert result["session_id"] == session_id
+    assert session_id in backend.sessions
+    qc.close()
+
+
+def test_reused_session_survives_until_close(backend, config, transport):
+    source_id = backend.add_sources(1)[0]
+    qc = _client(config, transport, notebook_pool_reuse_sessions=True)
+
+    answers = [qc.notebook_ask(source_id, f"question {n}?") for n in range(3)]
+    fresh = qc.notebook_ask(source_id, "on its own?", new_session=True)
+
+    assert len({a["session_id"] for a in answers}) == 1
+    assert fresh["session_id"] != answers[0]["session_id"]
+    assert list(backend.sessions) == [answers[0]["session_id"]]
+    qc.close()
+    assert not backend.sessions and not backend.notebooks
+
+
+def test_concurrent_leases_get_separate_notebooks_and_idle_ones_are_evicted(backend, config, transport):
+    source_id = backend.add_sources(1)[0]
+    pool = _client(config, transport).notebook_pool
+
+    first = pool.acquire([source_id])
+    second = pool.acquire([source_id])
+    assert first.notebook_id != second.notebook_id
+    pool.release(first)
+
+    assert pool.evict_idle(max_idle=0) == 1
+    assert list(backend.notebooks) == [second.notebook_id]
+    assert pool.stats()["leases"] == 1
+    pool.release(second)
+    pool.close()
+    assert not backend.notebooks
@@ -0,0 +1,70 @@
+"""Background status polling for many sources (caller.poller)."""
+import os
+import time
+
+import pytest
+
+from caller import PdfUploader
+from caller.poller import StatusPoller
+
+
+def _upload(uploader, tmp_path, n: int) -> list:
+    ids = []
+    for i in range(n):
+        path = tmp_path / f"plan-{i}.pdf"
+        path.write_bytes(os.urandom(1024))
+        ids.append(uploader.upload_file_and_process(str(path))["sources"][0]["id"])
+    return ids
+
+
+def test_tracked_sources_resolve_once_processed(backend, config, transport, tmp_path):
+    backend.config.processing_seconds = 0.3
+    uploader = PdfUploader(config, transport=transport)
+    source_ids = _upload(uploader, tmp_path, 3)
+
+    with StatusPoller(uploader, initial_interval=0.05, max_rate=100) as poller:
+        futures = [poller.track(sid) for sid in source_ids]
+        assert poller.track(source_ids[0]) is futures[0]
+        results = [f.result(timeout=5) for f in futures]
+
+    assert [r["status"] for r in results] == ["completed"] * 3
+    assert poller.pending() == 0
+
+
+def test_status_requests_respect_max_rate(backend, config, transport, tmp_path):
+    backend.config.processing_seconds = 0.5
+    uploader = PdfUploader(config, transport=transport)
+    source_ids = _upload(uploader, tmp_path, 4)
+    backend.reset_counts()
+
+    started = time.monotonic()
+    with StatusPoller(uploader, initial_interval=0.0, backoff=1.0, max_rate=20) as poller:
+        for f in [poller.track(sid) for sid in source_ids]:
+            f.result(timeout=5)
+    elapsed = time.monotonic() - started
+
+    polls = backend.request_counts()["GET /sources/{id}/status"]
+    assert polls == poller.requests_made
+    assert polls <= 20 * elapsed + 1
+
+
+def test_unchanged_status_backs_off(backend, config, transport, tmp_path):
+    backend.config.processing_seconds = 0.6
+    uploader = PdfUploader(config, transport=transport)
+    source_id = _upload(uploader, tmp_path, 1)[0]
+
+    with StatusPoller(uploader, initial_interval=0.05, backoff=2.0, max_interval=1.0, max_rate=100) as poller:
+        poller.track(source_id).result(timeout=5)
+
+    # 0.05 + 0.1 + 0.2 + 0.4 covers 0.6s: a handful of polls, not one per initial_interval
+    assert poller.requests_made <= 6
+
+
+def test_source_that_never_finishes_times_out(backend, config, transport, tmp_path):
+    backend.config.processing_seconds = 30
+    uploader = PdfUploader(config, transport=transport)
+    source_id = _upload(uploader, tmp_path, 1)[0]
+
+    with StatusPoller(uploader, initial_interval=0.05, max_rate=100) as poller:
+        with pytest.raises(TimeoutError):
+            poller.track(source_id, timeout=0.2).result(timeout=5)
@@ -0,0 +1,105 @@
+"""/search results cache (caller.search_cache) and closing its SQLite tier."""
+import asyncio
+import sqlite3
+import time
+from dataclasses import replace
+
+import pytest
+
+from caller import Application, AsyncApplication, QueryClient
+from caller.search_cache import SearchCache
+
+PAYLOAD = {"query": "soakage  pits", "type": "vector", "limit": 10, "minimum_score": 0.2}
+
+
+def test_repeated_search_is_served_from_cache(backend, config, transport):
+    backend.add_sources(3)
+    qc = QueryClient(replace(config, search_cache_size=16), transport=transport)
+
+    first = qc.vector_search("soakage pits")
+    # whitespace differences normalize to the same key
+    second = qc.vector_search("soakage   pits")
+
+    assert first == second
+    assert backend.request_counts()["POST /search"] == 1
+    assert qc.search_cache.stats()["hits"] == 1
+    qc.close()
+
+
+def test_entries_expire_after_ttl():
+    cache = SearchCache("http://api", ttl_seconds=0.05)
+    cache.put(PAYLOAD, [{"id": "a"}])
+    assert cache.get(PAYLOAD) == [{"id": "a"}]
+    time.sleep(0.1)
+    assert cache.get(PAYLOAD) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SearchCache("http://api", max_entries=2, ttl_seconds=None)
+    queries = [dict(PAYLOAD, query=q) for q in ("a", "b", "c")]
+    cache.put(queries[0], [{"id": "a"}])
+    cache.put(queries[1], [{"id": "b"}])
+    cache.get(queries[0])
+    cache.put(queries[2], [{"id": "c"}])
+
+    assert cache.get(queries[1]) is None
+    assert cache.get(queries[0]) == [{"id": "a"}]
+    assert cache.get(queries[2]) == [{"id": "c"}]
+
+
+def test_disk_tier_is_shared_and_promotion_keeps_the_original_age(tmp_path):
+    path = str(tmp_path / "search.sqlite3")
+    writer = SearchCache("http://api", ttl_seconds=0.3, path=path)
+    writer.put(PAYLOAD, [{"id": "a"}])
+    time.sleep(0.2)
+
+    reader = SearchCache("http://api", ttl_seconds=0.3, path=path)
+    assert reader.get(PAYLOAD) == [{"id": "a"}]
+    assert reader.stats()["disk_hits"] == 1
+    time.sleep(0.15)
+    # promoted into memory with its disk age, so it still expires on the writer's schedule
+    assert reader.get(PAYLOAD) is None
+    writer.close()
+    reader.close()
+
+
+def test_hits_are_copies():
+    cache = SearchCache("http://api")
+    cache.put(PAYLOAD, [{"id": "a"}])
+    cache.get(PAYLOAD)[0]["rrf_score"] = 1.0
+    assert cache.get(PAYLOAD) == [{"id": "a"}]
+
+
+def _sqlite_config(config, tmp_path):
+    return replace(config, search_cache_size=16, search_cache_path=str(tmp_path / "search.sqlite3"), hash_index_path=str(tmp_path / "hashes.sqlite3"))
+
+
+def _assert_closed(conn):
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_application_close_closes_sqlite_handles(config, transport, tmp_path):
+    app = Application(_sqlite_config(config, tmp_path), transport=transport)
+    search_conn = app.qc.search_cache._cache.disk._conn
+    hash_conn = app.uploader.hash_index._conn
+
+    app.close()
+
+    _assert_closed(search_conn)
+    _assert_closed(hash_conn)
+
+
+def test_async_application_close_closes_sqlite_handles(config, tmp_path):
+    pytest.importorskip("httpx")
+
+    async def main():
+        app = AsyncApplication(_sqlite_config(config, tmp_path))
+        search_conn = app.qc.search_cache._cache.disk._conn
+        hash_conn = app.uploader.hash_index._conn
+        await app.close()
+        return search_conn, hash_conn
+
+    search_conn, hash_conn = asyncio.run(main())
+    _assert_closed(search_conn)
+    _assert_closed(hash_conn)
@@ -0,0 +1,34 @@
+"""SSE decoding and reconnection (caller.sse) through QueryClient.ask_stream."""
+from caller import QueryClient
+from caller.fake_backend import DEFAULT_ANSWER
+from caller.sse import SSEDecoder
+
+
+def _ask(transport, config, backend):
+    source_id = backend.add_sources(1)[0]
+    qc = QueryClient(config, transport=transport)
+    with qc.ask_stream("Are soakage pits shown?", [source_id]) as stream:
+        answer = "".join(stream)
+    return answer, stream
+
+
+def test_sse_reconnects_with_last_event_id(backend, config, transport):
+    backend.config.sse_drop_after = 3
+    answer, _ = _ask(transport, config, backend)
+
+    # resumed after event 3: no token is lost or repeated
+    assert answer == DEFAULT_ANSWER
+    assert backend.request_counts()["POST /sources/{id}/chat/sessions/{session_id}/messages"] == 2
+
+
+def test_sse_gzip_encoded_stream_is_decoded(backend, config, transport):
+    backend.config.sse_gzip = True
+    answer, _ = _ask(transport, config, backend)
+
+    assert answer == DEFAULT_ANSWER
+
+
+def test_sse_plain_text_lines_are_events():
+    events = SSEDecoder().feed(b'data: {"type": "ai_message", "content": "hi"}\n\nplain words\n{"type": "x"}\n')
+
+    assert [e.as_dict() for e in events] == [{"type": "ai_message", "content": "hi"}, {"type": "text", "text": "plain words"}, {"type": "x"}]
@@ -0,0 +1,43 @@
+"""Pooled HTTP transport (caller.transport)."""
+import socket
+import threading
+from dataclasses import replace
+
+import pytest
+import requests
+
+from caller.transport import Transport
+
+
+def test_max_retries_covers_connect_errors_only(config):
+    with Transport(replace(config, max_retries=3)) as transport:
+        retry = transport.session.get_adapter(config.api_base_url).max_retries
+    assert (retry.total, retry.connect, retry.read, retry.status) == (3, 3, 0, 0)
+
+
+def test_request_dropped_after_sending_is_not_resent(config):
+    server = socket.create_server(("127.0.0.1", 0))
+    server.settimeout(0.5)
+    requests_seen = []
+
+    def accept_and_drop():
+        # read the request, then close without answering: a read error on the client
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            with conn:
+                requests_seen.append(conn.recv(65536))
+
+    thread = threading.Thread(target=accept_and_drop, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.getsockname()[1]}/api/sources"
+    try:
+        with Transport(replace(config, max_retries=3)) as transport:
+            with pytest.raises(requests.ConnectionError):
+                transport.get(url, timeout=5)
+    finally:
+        thread.join()
+        server.close()
+    assert len(requests_seen) == 1
@@ -0,0 +1,57 @@
+"""Streamed YES/NO verdicts (caller.verdict, QueryClient.ask_verdict)."""
+import pytest
+
+from caller import QueryClient
+from caller.fake_backend import DEFAULT_ANSWER
+from caller.verdict import VerdictDetector, parse_verdict
+
+
+def test_ask_verdict_stops_reading_after_the_verdict(backend, config, transport):
+    backend.config.sse_tokens_per_s = 20
+    source_id = backend.add_sources(1)[0]
+    qc = QueryClient(config, transport=transport)
+
+    result = qc.ask_verdict("Are soakage pits shown?", [source_id])
+
+    assert result["verdict"] == "YES"
+    assert result["complete"] is False
+    assert result["answer"] != DEFAULT_ANSWER and DEFAULT_ANSWER.startswith(result["answer"])
+    assert transport.metrics.in_flight == 0
+
+
+@pytest.mark.parametrize(
+    "text, verdict",
+    [
+        ("YES. The plan shows two pits.", "YES"),
+        ("no", "NO"),
+        ("**Yes** - see sheet 3", "YES"),
+        ("> Answer: No, there is none.", "NO"),
+        ("Final verdict is: YES", "YES"),
+        ("Nothing on the drawings suggests it.", None),
+        ("Yesterday's revision removed it.", None),
+        ("Based on the drawings, yes.", None),
+    ],
+)
+def test_parse_verdict(text, verdict):
+    assert parse_verdict(text) == verdict
+
+
+def test_detector_waits_for_the_end_of_the_verdict_word():
+    detector = VerdictDetector()
+    assert detector.feed("**N") is None
+    assert detector.feed("o") is None
+    assert not detector.done
+    assert detector.feed("**, the") == "NO"
+    assert detector.decided_at == len("**No**, the")
+
+
+def test_detector_gives_up_once_no_verdict_can_follow():
+    detector = VerdictDetector()
+    assert detector.feed("The ") is None
+    assert detector.undetermined and detector.finish() is None
+
+
+def test_verdict_ending_the_stream_is_settled_by_finish():
+    detector = VerdictDetector()
+    assert detector.feed("yes") is None
+    assert detector.finish() == "YES"